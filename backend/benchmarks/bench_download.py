@@ -0,0 +1,154 @@
+"""Concurrent download throughput and server memory per connection.
+
+Serves one generated file from a uvicorn subprocess through two routes:
+`/new` is services.storage.file_serving (ranges, ETags, 256 KiB reads or
+sendfile where the server offers it) and `/old` the plain FileResponse the
+endpoints used before. Scenarios, each with N concurrent clients:
+  full    whole-file downloads
+  seek    a player's 1 MiB range reads at random offsets (/old has no ranges,
+          so each seek costs a whole download)
+  revalid a cached client revalidating with If-None-Match (/old has no
+          content ETag, so it re-sends the file)
+It reports aggregate MB/s, requests/s and the server's peak RSS growth per
+connection while the transfers run.
+
+    python backend/benchmarks/bench_download.py [size_mb] [clients,...]
+"""
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+SERVED = os.getenv("BENCH_DOWNLOAD_FILE", "")
+PORT = int(os.getenv("BENCH_DOWNLOAD_PORT", "8765"))
+SEEKS_PER_CLIENT = 20
+
+if SERVED:
+    # Imported by uvicorn in the server process
+    from fastapi import FastAPI, Request
+    from fastapi.responses import FileResponse
+
+    from services.pipeline.checkpoint import digest_file
+    from services.storage.file_serving import serve_file
+
+    app = FastAPI()
+    _SHA = digest_file(SERVED)
+
+    @app.get("/new")
+    async def new(request: Request):
+        return serve_file(request, SERVED, _SHA, "video/mp4", filename="translated.mp4")
+
+    @app.get("/old")
+    async def old():
+        return FileResponse(SERVED, media_type="video/mp4", filename="translated.mp4")
+
+
+def _rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+class _PeakRss:
+    def __init__(self, pid: int):
+        self.pid, self.peak, self._stop = pid, 0, threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_kb(self.pid))
+            time.sleep(0.01)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def _client(http, route: str, scenario: str, size: int, etag: str) -> int:
+    base = f"http://127.0.0.1:{PORT}/{route}"
+    got = 0
+    if scenario == "full":
+        async with http.stream("GET", base) as r:
+            async for chunk in r.aiter_raw():
+                got += len(chunk)
+    elif scenario == "seek":
+        for _ in range(SEEKS_PER_CLIENT):
+            start = random.randrange(0, size - (1 << 20))
+            async with http.stream("GET", base, headers={"Range": f"bytes={start}-{start + (1 << 20) - 1}"}) as r:
+                async for chunk in r.aiter_raw():
+                    got += len(chunk)
+    else:
+        for _ in range(SEEKS_PER_CLIENT):
+            async with http.stream("GET", base, headers={"If-None-Match": etag}) as r:
+                async for chunk in r.aiter_raw():
+                    got += len(chunk)
+    return got
+
+
+async def _scenario(route: str, scenario: str, clients: int, size: int, etag: str, pid: int):
+    import httpx
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as http:
+        idle = _rss_kb(pid)
+        t0 = time.perf_counter()
+        with _PeakRss(pid) as rss:
+            sent = await asyncio.gather(*(_client(http, route, scenario, size, etag) for _ in range(clients)))
+        wall = time.perf_counter() - t0
+    requests = clients * (1 if scenario == "full" else SEEKS_PER_CLIENT)
+    return sum(sent), wall, requests, max(0, rss.peak - idle) / clients
+
+
+def run(size_mb: float, client_counts):
+    work = tempfile.mkdtemp(prefix="bench_download_")
+    path = os.path.join(work, "translated.mp4")
+    with open(path, "wb") as f:
+        for _ in range(int(size_mb)):
+            f.write(os.urandom(1 << 20))
+    size = os.path.getsize(path)
+    env = dict(os.environ, BENCH_DOWNLOAD_FILE=path, PYTHONPATH=BACKEND)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "bench_download:app", "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+         "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        import httpx
+        for _ in range(100):
+            try:
+                etag = httpx.get(f"http://127.0.0.1:{PORT}/new", headers={"Range": "bytes=0-0"}).headers["etag"]
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("server did not start")
+        print(f"file: {size / 1e6:.0f} MB", flush=True)
+        for scenario in ("full", "seek", "revalid"):
+            for clients in client_counts:
+                for route in ("old", "new"):
+                    sent, wall, requests, per_conn = asyncio.run(_scenario(route, scenario, clients, size, etag, server.pid))
+                    print(f"{scenario:7s} {route} x{clients:3d}: {sent / wall / 1e6:8.1f} MB/s  {requests / wall:7.1f} req/s  "
+                          f"{sent / requests / 1e6:7.2f} MB/req  peak RSS +{per_conn:7.0f} KiB/conn", flush=True)
+    finally:
+        server.terminate()
+        server.wait()
+        os.remove(path)
+        os.rmdir(work)
+
+
+if __name__ == "__main__":
+    mb = float(sys.argv[1]) if len(sys.argv) > 1 else 16
+    counts = [int(c) for c in (sys.argv[2] if len(sys.argv) > 2 else "1,8").split(",")]
+    run(mb, counts)
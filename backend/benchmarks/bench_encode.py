@@ -0,0 +1,66 @@
+"""Re-encode throughput (frames per second): moviepy write_videofile vs. the chunked encoder by worker count.
+
+The source stands in for Wav2Lip output: 720p, keyframe every 2 s, with a
+separate synthesized audio track to mux. "moviepy" is the old re-encode path
+(one libx264 fed frame by frame through a Python pipe); "chunked N" is
+services.media.encoder with N parallel ffmpeg processes, by default for
+N = 1, 2, 4, ... up to the core count. Every run uses the same profile.
+
+    python backend/benchmarks/bench_encode.py [video|seconds] [profile]
+"""
+import os
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from services.media import encoder  # noqa: E402
+from services.media.ffmpeg import run_ffmpeg  # noqa: E402
+from services.media.probe import probe  # noqa: E402
+
+
+def _make_sources(seconds: float):
+    work = tempfile.mkdtemp(prefix="bench_encode_")
+    video, audio = os.path.join(work, "src.mp4"), os.path.join(work, "tts.wav")
+    run_ffmpeg(["-f", "lavfi", "-i", "testsrc2=size=1280x720:rate=25", "-t", str(seconds),
+                "-c:v", "libx264", "-preset", "ultrafast", "-g", "50", video])
+    run_ffmpeg(["-f", "lavfi", "-i", "sine=frequency=220:sample_rate=24000", "-t", str(seconds), audio])
+    return video, audio
+
+
+def _moviepy(video: str, audio: str, out: str, profile: str):
+    import moviepy.editor as mp
+    clip = mp.VideoFileClip(video).set_audio(mp.AudioFileClip(audio))
+    clip.write_videofile(out, codec="libx264", audio_codec="aac", fps=clip.fps, preset=encoder.PROFILES[profile]["preset"],
+                         ffmpeg_params=["-crf", str(encoder.PROFILES[profile]["crf"])], verbose=False, logger=None)
+    clip.close()
+
+
+def run(video: str, audio: str, profile: str):
+    info = probe(video)
+    frames = info["duration"] * (info["fps"] or 25)
+    cores = os.cpu_count() or 1
+    print(f"source: {info['duration']:.0f}s {info['width']}x{info['height']} ({frames:.0f} frames), "
+          f"{cores} cores, profile {profile}")
+    out = os.path.join(os.path.dirname(video), "out.mp4")
+    runs = [("moviepy", None)] + [(f"chunked {n}", n) for n in sorted({1, 2, 4, 8, 16, cores}) if n <= max(2, cores)]
+    for name, workers in runs:
+        t0 = time.perf_counter()
+        if workers is None:
+            _moviepy(video, audio, out, profile)
+        else:
+            encoder.encode(video, audio, out, profile=profile, workers=workers, media=info)
+        wall = time.perf_counter() - t0
+        print(f"{name:10s}: {wall:6.2f}s  {frames / wall:6.1f} fps")
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else "60"
+    profile = sys.argv[2] if len(sys.argv) > 2 else "balanced"
+    if os.path.exists(arg):
+        _, audio = _make_sources(probe(arg)["duration"])
+        run(arg, audio, profile)
+    else:
+        run(*_make_sources(float(arg)), profile)
@@ -0,0 +1,80 @@
+"""Source-audio extraction per job: moviepy -> temp WAV -> decode (before) vs. ffmpeg pipe -> NumPy (after).
+
+"before" is the old path: VideoFileClip writes a 16 kHz WAV into a fresh
+mkdtemp() and faster-whisper then decodes that file again. "after" streams
+PCM from ffmpeg into a preallocated array (a memmap past
+EXTRACT_MEMMAP_SECONDS) that is handed to faster-whisper as-is. Each mode
+runs in a fresh interpreter; peak RSS covers the interpreter and, separately,
+its largest child (ffmpeg); disk writes come from /proc/self/io and include
+reaped children.
+
+    python backend/benchmarks/bench_extract.py [video|minutes]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+def _write_bytes() -> int:
+    with open("/proc/self/io") as f:
+        return int(next(line for line in f if line.startswith("write_bytes")).split()[1])
+
+
+def _child(mode: str, video: str, seconds: float):
+    work = tempfile.mkdtemp(prefix="bench_extract_")
+    w0, t0 = _write_bytes(), time.perf_counter()
+    if mode == "before":
+        import moviepy.editor as mp
+        from faster_whisper import decode_audio
+        wav = os.path.join(tempfile.mkdtemp(), "audio.wav")
+        clip = mp.VideoFileClip(video)
+        clip.audio.write_audiofile(wav, fps=16000, nbytes=2, codec="pcm_s16le", verbose=False, logger=None)
+        clip.close()
+        samples = decode_audio(wav, sampling_rate=16000)
+    else:
+        from services.audio.extract import extract
+        samples = extract(video, work, seconds).samples
+    os.sync()
+    wall = time.perf_counter() - t0
+    print(json.dumps({
+        "wall": wall,
+        "samples": int(len(samples)),
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "child_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "written_mb": (_write_bytes() - w0) / 1e6,
+    }))
+
+
+def _make_video(minutes: float) -> str:
+    from services.media.ffmpeg import run_ffmpeg
+    out = os.path.join(tempfile.mkdtemp(prefix="bench_src_"), "src.mp4")
+    run_ffmpeg(["-f", "lavfi", "-i", "testsrc=size=320x240:rate=25", "-f", "lavfi", "-i", "sine=frequency=220:sample_rate=44100",
+                "-t", str(minutes * 60), "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest", out])
+    return out
+
+
+def run(video: str):
+    from services.media.probe import probe
+    seconds = probe(video)["duration"]
+    print(f"source: {seconds:.0f}s")
+    for mode in ("before", "after"):
+        out = subprocess.run([sys.executable, __file__, "--child", mode, video, str(seconds)],
+                             capture_output=True, text=True, check=True, cwd=BACKEND)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode:6s}: {r['wall']:6.2f}s  peak RSS {r['rss_mb']:6.1f} MB (ffmpeg {r['child_rss_mb']:5.1f} MB)  "
+              f"disk writes {r['written_mb']:7.1f} MB  samples={r['samples']}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3], float(sys.argv[4]))
+    else:
+        arg = sys.argv[1] if len(sys.argv) > 1 else "10"
+        run(arg if os.path.exists(arg) else _make_video(float(arg)))
@@ -0,0 +1,134 @@
+"""Glass-to-ear latency of /live_translate/ws on a synthetic, real-time audio feed.
+
+A voiced signal (harmonics with vibrato) is sent as 100 ms PCM16 chunks at
+real-time pace: N "phrases" of 1.5-3 s separated by 0.8 s pauses. Latency is
+measured client-side, from sending the last voiced chunk of a phrase to
+receiving its audio, and compared with the 2 s target.
+
+--stub swaps Whisper/translation/gTTS for sleeps of typical duration (no
+model download or network needed); without it the real engines run, which
+only makes sense with a speech recording:
+
+    python backend/benchmarks/bench_live_ws.py --stub [phrases]
+    python backend/benchmarks/bench_live_ws.py speech.wav
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+os.environ.setdefault("STORAGE_DIR", tempfile.mkdtemp(prefix="bench_storage_"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+SR = 16000
+CHUNK = int(SR * 0.1)
+STUB_SECONDS = {"stt": 0.35, "translate": 0.15, "tts": 0.45}
+
+
+def _voice(seconds: float, f0: float) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    phase = 2 * np.pi * np.cumsum(f0 + 10 * np.sin(2 * np.pi * 5 * t)) / SR
+    return (0.2 * sum(np.sin(k * phase) / k for k in range(1, 6))).astype(np.float32)
+
+
+def _synthetic_feed(phrases: int):
+    """(audio, [end sample of each phrase])."""
+    parts, ends, n = [np.zeros(int(0.5 * SR), np.float32)], [], int(0.5 * SR)
+    for i in range(phrases):
+        speech = _voice(1.5 + (i % 4) * 0.5, 120 + 20 * (i % 3))
+        parts += [speech, np.zeros(int(0.8 * SR), np.float32)]
+        n += len(speech)
+        ends.append(n)
+        n += int(0.8 * SR)
+    return np.concatenate(parts), ends
+
+
+def _install_stubs():
+    async def transcribe(samples, model_size=None):
+        await asyncio.sleep(STUB_SECONDS["stt"])
+        return "hello there", [(0.0, len(samples) / SR, "hello there")], "en"
+
+    async def translate(text, target_language, src_lang=None):
+        await asyncio.sleep(STUB_SECONDS["translate"])
+        return "hola"
+
+    async def synthesize(lines, lang, **kwargs):
+        await asyncio.sleep(STUB_SECONDS["tts"])
+        path = os.path.join(tempfile.gettempdir(), "bench_live_stub.mp3")
+        with open(path, "wb") as f:
+            f.write(b"\xff\xfb" + b"\x00" * 1000)
+        return path
+
+    main._transcribe_local_whisper = transcribe
+    main._translate_text = translate
+    main._synthesize_tts = synthesize
+
+
+def run(audio: np.ndarray, phrase_ends):
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2")
+    sent_at = {}
+    received = []
+    with TestClient(main.app) as client, client.websocket_connect("/live_translate/ws?lang=es&src=en") as ws:
+        assert ws.receive_json()["type"] == "ready"
+
+        def reader():
+            while True:
+                msg = ws.receive()
+                if msg.get("text"):
+                    data = json.loads(msg["text"])
+                    if data["type"] == "done":
+                        return
+                    if data["type"] == "phrase" and not data.get("audio_bytes"):
+                        received.append((time.perf_counter(), data))
+                    pending.append(data)
+                elif msg.get("bytes") is not None:
+                    received.append((time.perf_counter(), pending.pop()))
+
+        pending = []
+        t = threading.Thread(target=reader, daemon=True)
+        t.start()
+        start = time.perf_counter()
+        for i in range(0, len(pcm), CHUNK):
+            target = start + i / SR
+            time.sleep(max(0.0, target - time.perf_counter()))
+            ws.send_bytes(pcm[i:i + CHUNK].tobytes())
+            end = i + CHUNK
+            for idx, pe in enumerate(phrase_ends):
+                if idx not in sent_at and end >= pe:
+                    sent_at[idx] = time.perf_counter()
+        ws.send_text(json.dumps({"type": "stop"}))
+        t.join(timeout=30)
+
+    latencies = []
+    for at, data in received:
+        # One endpoint per pause, so phrase ids follow the feed's phrases
+        idx = data["id"]
+        if idx in sent_at:
+            latencies.append((idx, (at - sent_at[idx]) * 1000, data["timings"]))
+    for idx, ms, timings in latencies:
+        print(f"phrase {idx:2d}: glass-to-ear {ms:7.0f} ms  (server {timings})")
+    values = sorted(ms for _, ms, _ in latencies)
+    if values:
+        p50 = values[len(values) // 2]
+        p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+        print(f"p50 {p50:.0f} ms, p90 {p90:.0f} ms, target < 2000 ms: {'met' if p90 < 2000 else 'missed'}")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--stub"]
+    if "--stub" in sys.argv:
+        _install_stubs()
+    if args and os.path.exists(args[0]):
+        from services.media.ffmpeg import decode_pcm
+        audio = decode_pcm(args[0], SR)
+        run(audio, [len(audio)])
+    else:
+        run(*_synthetic_feed(int(args[0]) if args else 6))
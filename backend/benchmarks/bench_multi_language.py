@@ -0,0 +1,90 @@
+"""Cost of the Nth target language of one source vs. the first (POST /upload_multi).
+
+Submits one source for N languages through the API and reports each job's
+processing time and whether its analysis (audio extraction + STT) came from
+the per-source analysis cache. STT is stubbed with a sleep proportional to
+the audio (STT_RTF) and TTS with a synthetic track, so the comparison
+isolates what the cache skips and needs neither models nor network.
+
+    python backend/benchmarks/bench_multi_language.py [video|seconds] [languages]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# Stub cost per second of audio (roughly small int8 Whisper on one core)
+STT_RTF = 0.15
+
+
+def _make_video(seconds: float) -> str:
+    from services.media.ffmpeg import run_ffmpeg
+    out = os.path.join(tempfile.mkdtemp(prefix="bench_src_"), "src.mp4")
+    run_ffmpeg(["-f", "lavfi", "-i", "testsrc=size=320x240:rate=25", "-f", "lavfi", "-i", "sine=frequency=220:sample_rate=44100",
+                "-t", str(seconds), "-c:v", "libx264", "-preset", "ultrafast", "-g", "50",
+                "-c:a", "aac", "-shortest", out])
+    return out
+
+
+def run(video: str, languages: str):
+    os.environ["STORAGE_DIR"] = tempfile.mkdtemp(prefix="bench_multi_")
+    os.environ.setdefault("DB_BACKEND", "memory")
+    os.environ["PREVIEW_FIRST"] = "false"
+    os.environ["WINDOWED_RENDER"] = "false"
+    os.environ["AUTO_DELETE"] = "false"
+    # One job at a time, so every job's time is its own work
+    os.environ["JOB_WORKERS"] = "1"
+    import numpy as np
+    import soundfile as sf
+    from fastapi.testclient import TestClient
+    import main
+
+    async def stt(audio, model_size=None):
+        seconds = len(audio) / 16000
+        await asyncio.sleep(STT_RTF * seconds)
+        segs = [(t, min(t + 2.5, seconds), f"line {t:.0f}") for t in np.arange(0.0, seconds - 0.5, 3.0)]
+        return " ".join(s[2] for s in segs), segs, "en"
+
+    async def translate(texts, target_language, src_lang=None):
+        return list(texts)
+
+    async def tts(lines, lang, segments=None, voice_sample=None, out_dir=None, progress=None):
+        end = max(en for (_, en, _) in segments)
+        path = os.path.join(out_dir, "tts_track.wav")
+        t = np.arange(int(end * main.TTS_SAMPLE_RATE)) / main.TTS_SAMPLE_RATE
+        sf.write(path, (0.1 * np.sin(2 * np.pi * 200 * t)).astype(np.float32), main.TTS_SAMPLE_RATE)
+        return path
+
+    main._transcribe_local_whisper = stt
+    main._translate_segments = translate
+    main._synthesize_tts = tts
+    main.HAS_LOCAL_WHISPER = True
+
+    with TestClient(main.app) as client, open(video, "rb") as f:
+        r = client.post("/upload_multi", files={"file": ("src.mp4", f, "video/mp4")},
+                        data={"target_languages": languages, "user_id": "bench"})
+        r.raise_for_status()
+        group = r.json()["group_id"]
+        while True:
+            status = client.get(f"/groups/{group}").json()
+            if all(j["status"] in ("completed", "failed") for j in status["jobs"]):
+                break
+            time.sleep(0.1)
+    print(f"source: {main.media_probe.probe(video)['duration']:.0f}s, STT stub RTF {STT_RTF}")
+    for i, j in enumerate(status["jobs"], 1):
+        m = j["metrics"] or {}
+        print(f"#{i} {j['target_language']:3s}: {m.get('processing_seconds', float('nan')):6.2f}s  "
+              f"analysis {m.get('analysis_seconds', float('nan')):6.2f}s ({m.get('analysis_cache', '-')})  [{j['status']}]")
+    s = status["summary"] or {}
+    if s.get("nth_vs_first") is not None:
+        print(f"first {s['first_seconds']:.2f}s, later mean {s['later_mean_seconds']:.2f}s: Nth costs {s['nth_vs_first']:.0%} of the first")
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else "60"
+    langs = sys.argv[2] if len(sys.argv) > 2 else "hi,es,fr,de"
+    run(arg if os.path.exists(arg) else _make_video(float(arg)), langs)
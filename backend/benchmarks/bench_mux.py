@@ -0,0 +1,57 @@
+"""Mux benchmark: stream-copy remux vs. moviepy libx264 re-encode.
+
+Generates a synthetic source video (default 60 s at 1920x1080) and a
+replacement audio track, then reports wall time and CPU seconds (this process
+plus ffmpeg children) per minute of source video for both mux paths.
+
+    python backend/benchmarks/bench_mux.py [seconds] [WxH]
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("STORAGE_DIR", tempfile.mkdtemp(prefix="bench_storage_"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from services.media import ffmpeg as ffm  # noqa: E402
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + kids.ru_utime + kids.ru_stime
+
+
+def _make_inputs(tmp: str, seconds: float, size: str):
+    video = os.path.join(tmp, "source.mp4")
+    audio = os.path.join(tmp, "tts.wav")
+    ffm.run_ffmpeg([
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate=30:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+        "-c:v", "libx264", "-preset", "veryfast", "-g", "60", "-c:a", "aac", "-shortest", video,
+    ])
+    ffm.run_ffmpeg(["-f", "lavfi", "-i", f"sine=frequency=660:duration={seconds}", "-ar", "44100", audio])
+    return video, audio
+
+
+def _measure(label: str, fn, seconds: float, *args):
+    cpu0, t0 = _cpu_seconds(), time.perf_counter()
+    fn(*args)
+    wall, cpu = time.perf_counter() - t0, _cpu_seconds() - cpu0
+    per_min = 60.0 / seconds
+    print(f"{label:<10} wall/min={wall * per_min:8.2f}s  cpu/min={cpu * per_min:8.2f}s")
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    size = sys.argv[2] if len(sys.argv) > 2 else "1920x1080"
+    tmp = tempfile.mkdtemp(prefix="bench_mux_")
+    video, audio = _make_inputs(tmp, seconds, size)
+    print(f"source: {seconds:.0f}s {size}")
+    _measure("copy", main._remux_copy_sync, seconds, video, audio,
+             os.path.join(tmp, "copy_preview.mp4"), os.path.join(tmp, "copy_final.mp4"))
+    _measure("reencode", main._mux_with_video_sync, seconds, video, audio,
+             os.path.join(tmp, "re_preview.mp4"), os.path.join(tmp, "re_final.mp4"))
@@ -0,0 +1,101 @@
+"""One-line subtitle edit on a finished job: PATCH /jobs/{id}/segments vs. the full pipeline.
+
+Runs a whole-file job on a long source, then edits one translated line and
+reports both wall times. STT is stubbed with a sleep proportional to the
+audio (STT_RTF); TTS clips are synthetic tones with a fixed per-clip latency
+(CLIP_SECONDS, about a gTTS round trip), so only the number of clips each
+path synthesizes differs. Stretching, timeline assembly and the muxes are
+the real ones.
+
+    python backend/benchmarks/bench_segment_edit.py [video|minutes]
+"""
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# Stub costs: STT per second of audio, TTS per synthesized clip
+STT_RTF = 0.05
+CLIP_SECONDS = 0.3
+
+
+def _make_video(minutes: float) -> str:
+    from services.media.ffmpeg import run_ffmpeg
+    out = os.path.join(tempfile.mkdtemp(prefix="bench_src_"), "src.mp4")
+    run_ffmpeg(["-f", "lavfi", "-i", "testsrc=size=320x240:rate=25", "-f", "lavfi", "-i", "sine=frequency=220:sample_rate=44100",
+                "-t", str(minutes * 60), "-c:v", "libx264", "-preset", "ultrafast", "-g", "50",
+                "-c:a", "aac", "-shortest", out])
+    return out
+
+
+def run(video: str):
+    os.environ["STORAGE_DIR"] = tempfile.mkdtemp(prefix="bench_edit_")
+    os.environ.setdefault("DB_BACKEND", "memory")
+    os.environ["PREVIEW_FIRST"] = "false"
+    os.environ["WINDOWED_RENDER"] = "false"
+    os.environ["AUTO_DELETE"] = "false"
+    import numpy as np
+    import soundfile as sf
+    import main
+    from services.media.probe import probe
+
+    async def stt(audio, model_size=None):
+        seconds = len(audio) / 16000
+        await asyncio.sleep(STT_RTF * seconds)
+        segs = [(t, min(t + 2.5, seconds), f"line {t:.0f}") for t in np.arange(0.0, seconds - 0.5, 3.0)]
+        return " ".join(s[2] for s in segs), segs, "en"
+
+    async def translate(texts, target_language, src_lang=None):
+        return [f"{t} ({target_language})" for t in texts]
+
+    clips = {"n": 0}
+    clip_dir = tempfile.mkdtemp(prefix="bench_clips_")
+
+    @contextlib.asynccontextmanager
+    async def tts_clip(text, language, engine, ext, synth, *args, voice_hash="", limiter=None):
+        clips["n"] += 1
+        # Named before the await: concurrent clips must not share a file
+        path = os.path.join(clip_dir, f"{clips['n']}.wav")
+        await asyncio.sleep(CLIP_SECONDS)
+        t = np.arange(int(0.06 * len(text) * main.TTS_SAMPLE_RATE)) / main.TTS_SAMPLE_RATE
+        sf.write(path, (0.1 * np.sin(2 * np.pi * (150 + len(text)) * t)).astype(np.float32), main.TTS_SAMPLE_RATE)
+        yield path
+
+    main._transcribe_local_whisper = stt
+    main._translate_segments = translate
+    main._tts_clip = tts_clip
+    main.HAS_LOCAL_WHISPER = True
+
+    job_dir = os.path.join(main.STORAGE_DIR, "job")
+    os.makedirs(job_dir)
+    job = {
+        "job_id": "job", "user_id": "bench", "status": "queued", "progress": 0.0, "created_at": "",
+        "target_language": "hi", "media": probe(video), "queued_at": time.time(),
+        "paths": {"source": video, "preview": os.path.join(job_dir, "preview.mp4"),
+                  "output": os.path.join(job_dir, "translated.mp4"), "srt": os.path.join(job_dir, "subtitles.srt"),
+                  "vtt": os.path.join(job_dir, "subtitles.vtt"), "voice": ""},
+    }
+    main.JOBS["job"] = job
+
+    async def go():
+        t0 = time.perf_counter()
+        await main._process_job("job")
+        full, full_clips = time.perf_counter() - t0, clips["n"]
+        t0 = time.perf_counter()
+        res = await main.patch_segments("job", main.SegmentPatch(segments=[main.SegmentEdit(index=7, text="a corrected line")]))
+        return full, full_clips, time.perf_counter() - t0, clips["n"] - full_clips, res
+
+    full, full_clips, edit, edit_clips, res = asyncio.run(go())
+    print(f"source: {job['media']['duration']:.0f}s, {len(res['segments'])} segments  [{job['status']}]")
+    print(f"full pipeline: {full:7.2f}s  ({full_clips} clips synthesized)")
+    print(f"one-line edit: {edit:7.2f}s  ({edit_clips} clip synthesized, changed {res['changed']})")
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else "30"
+    run(arg if os.path.exists(arg) else _make_video(float(arg)))
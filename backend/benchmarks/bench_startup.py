@@ -0,0 +1,86 @@
+"""API cold start: import time per module and time until /health answers.
+
+"lazy" is the current main.py; "eager" first imports the heavy engines the
+way main.py used to at module import (moviepy, gtts, openai, googletrans,
+faster-whisper, TTS when installed). Each run is a fresh interpreter.
+
+    python backend/benchmarks/bench_startup.py [top_n]
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EAGER = "import importlib, importlib.util\n" \
+        "for m in ('moviepy.editor', 'gtts', 'openai', 'googletrans', 'faster_whisper', 'TTS.api'):\n" \
+        "    if importlib.util.find_spec(m.split('.')[0]):\n" \
+        "        importlib.import_module(m)\n"
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["STORAGE_DIR"] = tempfile.mkdtemp(prefix="bench_storage_")
+    return env
+
+
+def import_times(prelude: str = ""):
+    """(total seconds, [(cumulative seconds, module)]) for top-level imports made by `import main`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", prelude + "import main"],
+        cwd=BACKEND, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        indent = len(name) - len(name.lstrip())
+        module = name.strip()
+        if module == "site" or module.startswith("encodings"):
+            continue
+        # Indent 1 = imported by the -c snippet itself (main and the eager prelude), 3 = by those
+        if indent <= 3:
+            rows.append((int(cumulative) / 1e6, module, indent))
+    total = sum(s for s, _, indent in rows if indent == 1)
+    return total, [(s, m) for s, m, _ in rows]
+
+
+def time_to_health(prelude: str = "") -> float:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    code = prelude + f"import uvicorn\nuvicorn.run('main:app', host='127.0.0.1', port={port}, log_level='warning')\n"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", code], cwd=BACKEND, env=_env(),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - t0
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError("server exited before answering /health")
+                time.sleep(0.02)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run(top_n: int):
+    for label, prelude in (("eager", EAGER), ("lazy", "")):
+        total, rows = import_times(prelude)
+        print(f"[{label}] import total {total:.2f}s, time to /health {time_to_health(prelude):.2f}s")
+        for seconds, name in sorted(rows, reverse=True)[:top_n]:
+            print(f"    {seconds:6.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 8)
@@ -0,0 +1,89 @@
+"""Load test: /jobs/{id} poll latency while N jobs are in flight.
+
+Blocking stages are replaced with sleep-based stand-ins (native code such as
+ffmpeg, ctranslate2 and numpy releases the GIL the same way), so the numbers
+reflect event-loop availability rather than machine speed.
+
+    python backend/benchmarks/bench_status_latency.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("STORAGE_DIR", tempfile.mkdtemp(prefix="bench_storage_"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+import main  # noqa: E402
+
+STAGE_SECONDS = float(os.getenv("BENCH_STAGE_SECONDS", "0.5"))
+POLLS = int(os.getenv("BENCH_POLLS", "200"))
+
+
+def _blocking(result=None):
+    def fn(*args, **kwargs):
+        time.sleep(STAGE_SECONDS)
+        return result
+    return fn
+
+
+def _patch_stages(tmp_dir: str):
+    main.HAS_MEDIA = True
+    main._extract_audio_sync = _blocking(os.path.join(tmp_dir, "audio.wav"))
+    main._transcribe_local_whisper_sync = _blocking(("hello world", [(0.0, 1.0, "hello world")], "en"))
+    main._gtts_save = _blocking()
+    main._load_segment_samples = _blocking(np.zeros(2400, dtype=np.float32))
+    main._mux_with_video_sync = _blocking()
+    main._remux_copy_sync = _blocking()
+    main._video_duration_sync = _blocking(1)
+
+    async def _translate(text, target_language, src_lang=None):
+        return text
+    main._translate_text = _translate
+
+
+async def _run(in_flight: int, client: httpx.AsyncClient) -> list:
+    ids = []
+    for _ in range(in_flight):
+        job_id = f"bench-{in_flight}-{len(ids)}"
+        job_dir = os.path.join(main.STORAGE_DIR, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        main.JOBS[job_id] = {
+            "job_id": job_id, "user_id": "bench", "status": "queued", "progress": 0.0,
+            "created_at": "", "target_language": "es",
+            "paths": {k: os.path.join(job_dir, k) for k in ("source", "preview", "output", "srt", "vtt", "voice")},
+        }
+        ids.append(job_id)
+    tasks = [asyncio.create_task(main._process_job(j)) for j in ids]
+    main.JOBS.setdefault("probe", {"job_id": "probe", "status": "queued", "progress": 0.0, "paths": {}})
+    lat = []
+    for _ in range(POLLS):
+        t0 = time.perf_counter()
+        r = await client.get("/jobs/probe")
+        lat.append(time.perf_counter() - t0)
+        assert r.status_code == 200
+        await asyncio.sleep(0.005)
+    for t in tasks:
+        t.cancel()
+    return lat
+
+
+async def main_async():
+    _patch_stages(tempfile.mkdtemp())
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'in_flight':>9} {'p50_ms':>8} {'p99_ms':>8} {'max_ms':>8}")
+        for n in (0, 1, 4, 16):
+            lat = sorted(await _run(n, client))
+            p50 = statistics.median(lat) * 1000
+            p99 = lat[int(len(lat) * 0.99) - 1] * 1000
+            print(f"{n:>9} {p50:>8.2f} {p99:>8.2f} {lat[-1] * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
@@ -0,0 +1,64 @@
+"""Time-stretch engines compared on seconds of audio processed per CPU-second.
+
+The input is a synthetic voiced signal (harmonics with vibrato and a syllable
+envelope). "librosa@44.1k" is the old path: phase vocoder at 44.1 kHz.
+CPU time includes child processes, so the ffmpeg `atempo` engine is charged
+for its subprocess.
+
+    python backend/benchmarks/bench_time_stretch.py [seconds] [repeats]
+"""
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio import time_stretch as ts  # noqa: E402
+
+RATES = (0.8, 1.25, 1.6)
+
+
+def _voice(seconds: float, sr: int) -> np.ndarray:
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 140 + 15 * np.sin(2 * np.pi * 5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    y = sum(np.sin(k * phase) / k for k in range(1, 8))
+    env = np.clip(np.sin(2 * np.pi * 3 * t), 0, None)
+    return (0.2 * y * env).astype(np.float32)
+
+
+def _cpu() -> float:
+    c = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + c.ru_utime + c.ru_stime
+
+
+def run(seconds: float, repeats: int):
+    cases = [("librosa@44.1k", "librosa", 44100)] + [(f"{name}@24k", name, 24000) for name in ("librosa", "atempo", "wsola")]
+    print(f"{seconds:.0f}s input, rates {RATES}, {repeats} repeat(s)")
+    for label, engine, sr in cases:
+        y = _voice(seconds, sr)
+        fn = ts.ENGINES[engine]
+        fn(y[:sr], sr, 1.25)  # warm-up (numba / process spawn)
+        c0, w0 = _cpu(), time.perf_counter()
+        for _ in range(repeats):
+            for rate in RATES:
+                out = fn(y, sr, rate)
+                assert abs(len(out) / sr - seconds / rate) < 0.1, (label, rate, len(out) / sr)
+        cpu, wall = _cpu() - c0, time.perf_counter() - w0
+        audio = seconds * len(RATES) * repeats
+        print(f"{label:14s}: {audio / max(cpu, 1e-9):8.1f} audio-s per CPU-s  (wall {wall:6.2f}s)")
+
+    y = _voice(seconds, 24000)
+    c0 = _cpu()
+    out = ts.stretch_to_duration(y, 24000, seconds * 1.03)
+    print(f"no-op path (3% off, tolerance {os.getenv('STRETCH_TOLERANCE', '0.05')}): "
+          f"{(_cpu() - c0) * 1000:.2f} ms CPU, untouched={out is y}")
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    run(seconds, repeats)
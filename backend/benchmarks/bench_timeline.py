@@ -0,0 +1,64 @@
+"""Segment assembly: moviepy clip concatenation vs. the NumPy AudioTimeline.
+
+Each path runs in a fresh interpreter so peak RSS is its own. Inputs are N
+synthetic 2 s MP3 segments spaced 3 s apart (so gaps matter).
+
+    python backend/benchmarks/bench_timeline.py [segments]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.media import ffmpeg as ffm  # noqa: E402
+
+SR = 24000
+
+
+def _moviepy(paths, out_dir):
+    import moviepy.editor as mp
+    from moviepy.audio.AudioClip import concatenate_audioclips
+    clips = []
+    for p in paths:
+        clips.append(mp.AudioFileClip(p))
+        clips.append(mp.AudioClip(lambda t: 0, duration=0.08, fps=44100))
+    out = os.path.join(out_dir, "moviepy.mp3")
+    concatenate_audioclips(clips).write_audiofile(out, fps=44100, nbytes=2, codec="mp3", verbose=False, logger=None)
+    for c in clips:
+        c.close()
+
+
+def _timeline(paths, out_dir):
+    from services.audio.timeline import AudioTimeline
+    tl = AudioTimeline(len(paths) * 3.0, sr=SR)
+    for i, p in enumerate(paths):
+        tl.place(i * 3.0, ffm.decode_pcm(p, SR))
+    tl.write(os.path.join(out_dir, "timeline.wav"))
+
+
+def _child(mode: str, src_dir: str):
+    paths = sorted(os.path.join(src_dir, f) for f in os.listdir(src_dir) if f.endswith(".mp3"))
+    t0 = time.perf_counter()
+    (_moviepy if mode == "moviepy" else _timeline)(paths, tempfile.mkdtemp(prefix="bench_tl_out_"))
+    wall = time.perf_counter() - t0
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:<9} wall={wall:7.2f}s  peak_rss={rss_mb:7.1f}MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    src = tempfile.mkdtemp(prefix="bench_tl_src_")
+    first = os.path.join(src, "seg_0000.mp3")
+    ffm.run_ffmpeg(["-f", "lavfi", "-i", "sine=frequency=300:duration=2", "-ar", str(SR), first])
+    for i in range(1, n):
+        os.link(first, os.path.join(src, f"seg_{i:04d}.mp3"))
+    print(f"segments={n}")
+    for mode in ("moviepy", "timeline"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, src], check=True)
@@ -0,0 +1,99 @@
+"""Segment translation against a local stub server: per-segment loop vs. batched API.
+
+The stub speaks the LibreTranslate and MyMemory wire formats and adds a fixed
+per-request latency, so the numbers count round trips rather than MT speed.
+
+    python backend/benchmarks/bench_translate_batch.py [segments] [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("STORAGE_DIR", tempfile.mkdtemp(prefix="bench_storage_"))
+os.environ.setdefault("LIBRETRANSLATE_URL", "http://stub")
+os.environ.setdefault("MYMEMORY_URL", "http://stub")
+os.environ.setdefault("TRANSLATE_PROVIDERS", "libre")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+
+import main  # noqa: E402
+from services.ai import translation_batch as tb  # noqa: E402
+from services.cache.translation_memory import TranslationMemory  # noqa: E402
+
+LATENCY = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+stub = FastAPI()
+REQUESTS = {"count": 0}
+
+
+def _fresh_memory():
+    # Start each phase cold so neither path is served from the translation memory
+    main.TRANSLATION_MEMORY = TranslationMemory(os.path.join(tempfile.mkdtemp(prefix="bench_tm_"), "tm.db"))
+
+
+def _fake(text: str, target: str) -> str:
+    return f"[{target}] {text}"
+
+
+@stub.post("/translate")
+async def libre(request: Request):
+    REQUESTS["count"] += 1
+    body = await request.json()
+    await asyncio.sleep(LATENCY)
+    q = body["q"]
+    if isinstance(q, list):
+        return {"translatedText": [_fake(t, body["target"]) for t in q]}
+    return {"translatedText": _fake(q, body["target"])}
+
+
+@stub.get("/get")
+async def mymemory(q: str, langpair: str):
+    REQUESTS["count"] += 1
+    await asyncio.sleep(LATENCY)
+    return {"responseData": {"translatedText": "\n".join(_fake(t, langpair.split("|")[1]) for t in q.split("\n"))}}
+
+
+class _EchoGoogle:
+    """Stands in for googletrans: echoes the source, which both paths treat as a miss."""
+
+    class _Result:
+        def __init__(self, text):
+            self.text = text
+            self.lang = "en"
+
+    def translate(self, text, *a, **k):
+        return self._Result(text)
+
+    def detect(self, text, *a, **k):
+        return self._Result(text)
+
+
+async def run(n: int):
+    tb.set_http_client(httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub"))
+    tb._translator = _EchoGoogle()
+    texts = [f"This is segment number {i} of the talk." for i in range(n)]
+
+    _fresh_memory()
+    REQUESTS["count"] = 0
+    t0 = time.perf_counter()
+    serial = [await main._translate_text(t, "es", src_lang="en") for t in texts]
+    serial_s, serial_req = time.perf_counter() - t0, REQUESTS["count"]
+
+    _fresh_memory()
+    REQUESTS["count"] = 0
+    t0 = time.perf_counter()
+    batched = await main._translate_segments(texts, "es", src_lang="en")
+    batch_s, batch_req = time.perf_counter() - t0, REQUESTS["count"]
+
+    assert serial == batched, "batched output differs from per-segment output"
+    print(f"segments={n} latency={LATENCY * 1000:.0f}ms")
+    print(f"per-segment: {serial_s:7.2f}s  {serial_req:5d} requests")
+    print(f"batched    : {batch_s:7.2f}s  {batch_req:5d} requests")
+    await tb.close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
@@ -0,0 +1,56 @@
+"""Per-job TTS wall time: serial (fan-out 1) vs. concurrent segment rendering.
+
+gTTS is replaced by a stand-in that sleeps for a fixed network latency and
+copies a real 2 s MP3, so the decode, stretch and assembly stages do real work.
+
+    python backend/benchmarks/bench_tts_parallel.py [segments] [latency_ms]
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("STORAGE_DIR", tempfile.mkdtemp(prefix="bench_storage_"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from services.cache.tts_cache import TTSClipCache  # noqa: E402
+from services.media import ffmpeg as ffm  # noqa: E402
+from services.pipeline.ratelimit import AsyncRateLimiter  # noqa: E402
+
+LATENCY = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.3
+SAMPLE = os.path.join(tempfile.mkdtemp(prefix="bench_tts_"), "sample.mp3")
+
+
+def _fake_gtts(text: str, lang: str, out_path: str) -> str:
+    time.sleep(LATENCY)
+    shutil.copyfile(SAMPLE, out_path)
+    return out_path
+
+
+async def _job(n: int, fanout: int) -> float:
+    main.TTS_FANOUT = fanout
+    main.TTS_CACHE = TTSClipCache(tempfile.mkdtemp(prefix="bench_tts_cache_"))
+    segments = [(i * 2.5, i * 2.5 + 2.2, f"segment {i}") for i in range(n)]
+    t0 = time.perf_counter()
+    out = await main._synthesize_tts([s[2] for s in segments], "es", segments=segments)
+    assert out.endswith("tts_track.wav"), "per-segment path fell back to single-shot"
+    return time.perf_counter() - t0
+
+
+async def run(n: int):
+    ffm.run_ffmpeg(["-f", "lavfi", "-i", "sine=frequency=300:duration=2", "-ar", "24000", SAMPLE])
+    main._gtts_save = _fake_gtts
+    main.GTTS_LIMITER = AsyncRateLimiter(1000)
+    await _job(2, 1)  # warm up librosa/numba and moviepy before timing
+    serial = await _job(n, 1)
+    parallel = await _job(n, int(os.getenv("TTS_FANOUT", "8")))
+    print(f"segments={n} latency={LATENCY * 1000:.0f}ms cpus={os.cpu_count()}")
+    print(f"serial  : {serial:7.2f}s")
+    print(f"parallel: {parallel:7.2f}s  ({serial / parallel:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
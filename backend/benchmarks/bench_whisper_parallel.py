@@ -0,0 +1,77 @@
+"""Local Whisper throughput (audio-seconds per wall-second) vs. worker processes.
+
+"single" is the old path: one in-process model over the whole file. The
+parallel rows VAD-split the audio and decode chunks on 1..N workers; pool
+start-up and model loads are excluded (the pool is warmed first).
+
+Without an input file a ~2 minute track is built from gTTS sentences with
+pauses between them (needs network).
+
+    python backend/benchmarks/bench_whisper_parallel.py [audio] [max_workers] [model_size]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.whisper_parallel import ParallelTranscriber  # noqa: E402
+from services.media import ffmpeg as ffm  # noqa: E402
+
+SENTENCES = [
+    "Welcome back to the channel, today we are looking at the translation pipeline.",
+    "First the audio is extracted from the video and transcribed.",
+    "Then every segment is translated and synthesized in the target language.",
+    "Finally the new voice track is muxed back into the original video.",
+]
+
+
+def _build_track(out_dir: str, seconds: float = 120.0) -> np.ndarray:
+    from gtts import gTTS
+    clips = []
+    for i, s in enumerate(SENTENCES):
+        p = os.path.join(out_dir, f"s{i}.mp3")
+        gTTS(text=s, lang="en").save(p)
+        clips.append(ffm.decode_pcm(p, 16000))
+    parts, total, i = [], 0.0, 0
+    while total < seconds:
+        clip = clips[i % len(clips)]
+        gap = np.zeros(int(16000 * (1.0 + (i % 3))), dtype=np.float32)
+        parts += [clip, gap]
+        total += (len(clip) + len(gap)) / 16000
+        i += 1
+    return np.concatenate(parts)
+
+
+def run(audio: np.ndarray, max_workers: int, size: str):
+    seconds = len(audio) / 16000
+    print(f"{seconds:.0f}s of audio, model={size}, cpus={os.cpu_count()}")
+    from faster_whisper import WhisperModel
+    model = WhisperModel(size, device="cpu", compute_type="int8")
+    t0 = time.perf_counter()
+    segs, _ = model.transcribe(audio, beam_size=1)
+    n = len(list(segs))
+    wall = time.perf_counter() - t0
+    print(f"single     : {seconds / wall:7.1f} audio-s/s  ({n} segments)")
+    del model
+    for workers in range(1, max_workers + 1):
+        tr = ParallelTranscriber(workers, size)
+        tr.warm()
+        t0 = time.perf_counter()
+        text, segs, lang = tr.transcribe(audio)
+        wall = time.perf_counter() - t0
+        tr.shutdown()
+        print(f"workers={workers:2d}: {seconds / wall:7.1f} audio-s/s  ({len(segs)} segments, lang={lang})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] != "-":
+        audio = ffm.decode_pcm(sys.argv[1], 16000)
+    else:
+        audio = _build_track(tempfile.mkdtemp(prefix="bench_whisper_"))
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1)
+    size = sys.argv[3] if len(sys.argv) > 3 else os.getenv("WHISPER_MODEL_SIZE", "tiny")
+    run(audio, max_workers, size)
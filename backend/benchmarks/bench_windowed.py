@@ -0,0 +1,124 @@
+"""Whole-file vs. windowed (HLS) render of a long source: time to first output and peak memory.
+
+"whole" runs the regular job pipeline (WINDOWED_RENDER=false); "windowed"
+renders keyframe-aligned WINDOW_SECONDS windows and publishes HLS segments.
+STT, translation and TTS are stubbed (a sleep proportional to the audio
+plus a synthetic track), so the numbers isolate decode, scheduling, mux and
+memory behaviour and need neither models nor network. Each mode runs in a
+fresh interpreter; peak RSS is the interpreter's own.
+
+    python backend/benchmarks/bench_windowed.py [video|minutes]
+"""
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# Stub cost per second of audio (roughly tiny int8 Whisper on one core)
+STT_RTF = 0.05
+
+
+def _child(mode: str, video: str):
+    os.environ["STORAGE_DIR"] = tempfile.mkdtemp(prefix="bench_windowed_")
+    os.environ["WINDOWED_RENDER"] = "true" if mode == "windowed" else "false"
+    os.environ["WINDOWED_MIN_SECONDS"] = "0"
+    os.environ["PREVIEW_FIRST"] = "false"
+    os.environ["AUTO_DELETE"] = "false"
+    import numpy as np
+    import soundfile as sf
+    import main
+    from services.media.probe import probe
+
+    async def stt(audio, model_size=None):
+        seconds = len(audio) / 16000
+        await asyncio.sleep(STT_RTF * seconds)
+        segs = [(t, min(t + 2.5, seconds), f"line {t:.0f}") for t in np.arange(0.0, seconds - 0.5, 3.0)]
+        return " ".join(s[2] for s in segs), segs, "en"
+
+    async def translate(texts, target_language, src_lang=None):
+        return list(texts)
+
+    async def tts(lines, lang, segments=None, voice_sample=None, out_dir=None):
+        end = max(en for (_, en, _) in segments)
+        path = os.path.join(out_dir, "tts_track.wav")
+        t = np.arange(int(end * main.TTS_SAMPLE_RATE)) / main.TTS_SAMPLE_RATE
+        sf.write(path, (0.1 * np.sin(2 * np.pi * 200 * t)).astype(np.float32), main.TTS_SAMPLE_RATE)
+        return path
+
+    main._transcribe_local_whisper = stt
+    main._translate_segments = translate
+    main._synthesize_tts = tts
+    main.HAS_LOCAL_WHISPER = True
+
+    job_dir = os.path.join(main.STORAGE_DIR, "job")
+    os.makedirs(job_dir)
+    job = {
+        "job_id": "job", "user_id": "bench", "status": "queued", "progress": 0.0, "created_at": "",
+        "target_language": "hi", "media": probe(video), "queued_at": time.time(),
+        "paths": {"source": video, "preview": os.path.join(job_dir, "preview.mp4"),
+                  "output": os.path.join(job_dir, "translated.mp4"), "srt": os.path.join(job_dir, "subtitles.srt"),
+                  "vtt": os.path.join(job_dir, "subtitles.vtt"), "voice": ""},
+    }
+    main.JOBS["job"] = job
+    first = {}
+
+    async def watch():
+        # First moment something is playable: a listed HLS segment, or the final file
+        while "t" not in first:
+            if (job.get("windows") or {}).get("ready") or os.path.exists(job["paths"]["output"]):
+                first["t"] = time.perf_counter()
+            await asyncio.sleep(0.02)
+
+    async def go():
+        t0 = time.perf_counter()
+        watcher = asyncio.ensure_future(watch())
+        await main._process_job("job")
+        done = time.perf_counter()
+        if mode == "windowed":
+            await main.download("job")
+        watcher.cancel()
+        return t0, done, time.perf_counter()
+
+    t0, done, downloadable = asyncio.run(go())
+    print(json.dumps({
+        "status": job["status"],
+        "first_output": first.get("t", done) - t0,
+        "complete": done - t0,
+        "downloadable": downloadable - t0,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def _make_video(minutes: float) -> str:
+    from services.media.ffmpeg import run_ffmpeg
+    out = os.path.join(tempfile.mkdtemp(prefix="bench_src_"), "src.mp4")
+    run_ffmpeg(["-f", "lavfi", "-i", "testsrc=size=320x240:rate=25", "-f", "lavfi", "-i", "sine=frequency=220:sample_rate=44100",
+                "-t", str(minutes * 60), "-c:v", "libx264", "-preset", "ultrafast", "-g", "50",
+                "-c:a", "aac", "-shortest", out])
+    return out
+
+
+def run(video: str):
+    from services.media.probe import probe
+    print(f"source: {probe(video)['duration']:.0f}s")
+    for mode in ("whole", "windowed"):
+        out = subprocess.run([sys.executable, __file__, "--child", mode, video],
+                             capture_output=True, text=True, check=True, cwd=BACKEND)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode:8s}: first output {r['first_output']:6.2f}s  complete {r['complete']:6.2f}s  "
+              f"downloadable {r['downloadable']:6.2f}s  peak RSS {r['rss_mb']:6.1f} MB  [{r['status']}]")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+    else:
+        arg = sys.argv[1] if len(sys.argv) > 1 else "10"
+        run(arg if os.path.exists(arg) else _make_video(float(arg)))
@@ -0,0 +1,54 @@
+"""Per-job XTTS time: reload-per-job (old behaviour) vs. shared registry + latent cache.
+
+Requires the optional TTS package (torch) and a voice sample:
+
+    python backend/benchmarks/bench_xtts.py path/to/voice.wav [segments] [jobs]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("STORAGE_DIR", tempfile.mkdtemp(prefix="bench_storage_"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from services.ai import xtts as xtts_engine  # noqa: E402
+from services.ai.model_registry import MODELS  # noqa: E402
+
+SENTENCES = [
+    "Welcome back to the channel.",
+    "Today we will look at how the pipeline works.",
+    "Thanks for watching, see you next time.",
+]
+
+
+async def _job(voice: str, n_segments: int) -> float:
+    segments = [(i * 3.0, i * 3.0 + 2.5, SENTENCES[i % len(SENTENCES)]) for i in range(n_segments)]
+    t0 = time.perf_counter()
+    await main._synthesize_tts([s[2] for s in segments], "es", segments=segments, voice_sample=voice)
+    return time.perf_counter() - t0
+
+
+async def run(voice: str, n_segments: int, jobs: int):
+    if not main.HAS_XTTS:
+        print("TTS (Coqui XTTS) is not installed; nothing to measure.")
+        return
+    key = ("xtts", xtts_engine.model_name())
+    cold = []
+    for _ in range(jobs):
+        MODELS.evict(key)
+        xtts_engine._latents.clear()
+        cold.append(await _job(voice, n_segments))
+    warm = [await _job(voice, n_segments) for _ in range(jobs)]
+    print(f"segments/job={n_segments}")
+    print(f"reload per job : {sum(cold) / len(cold):7.2f}s/job")
+    print(f"shared registry: {sum(warm) / len(warm):7.2f}s/job")
+
+
+if __name__ == "__main__":
+    voice = sys.argv[1]
+    n_segments = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    jobs = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    asyncio.run(run(voice, n_segments, jobs))
@@ -2,44 +2,80 @@ import os
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
+import sys
 import tempfile
 import shutil
+import time
+import json
+import hashlib
+import contextlib
+import re
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-import httpx
-try:
-    # Optional: real media handling
-    import moviepy.editor as mp
-    from gtts import gTTS
-    HAS_MEDIA = True
-except Exception:
-    HAS_MEDIA = False
-try:
-    # Optional: Coqui XTTS voice cloning (requires torch installed)
-    from TTS.api import TTS as CoquiTTS  # type: ignore
-    HAS_XTTS = True
-except Exception:
-    HAS_XTTS = False
-try:
-    # Optional: real STT + translation
-    from openai import OpenAI
-    from googletrans import Translator
-    HAS_OPENAI = True
-except Exception:
-    HAS_OPENAI = False
-try:
-    # Local STT (no API key)
-    from faster_whisper import WhisperModel  # type: ignore
-    HAS_LOCAL_WHISPER = True
-except Exception:
-    HAS_LOCAL_WHISPER = False
-
-# Simple in-memory stores for demo
-JOBS: Dict[str, dict] = {}
+
+# Sibling packages (services/, models/) must import both when started as
+# `uvicorn backend.main:app` from the repo root and `uvicorn main:app` from backend/.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from services.pipeline.executor import STAGES  # noqa: E402
+from services.pipeline.job_queue import JobQueue, QueueFull  # noqa: E402
+from services.pipeline.ratelimit import AsyncRateLimiter  # noqa: E402
+from services.pipeline import checkpoint  # noqa: E402
+from services.pipeline.checkpoint import StageManifest  # noqa: E402
+from services.pipeline.events import EventHub  # noqa: E402
+from services.media import ffmpeg as ffm  # noqa: E402
+from services.media import probe as media_probe  # noqa: E402
+from services.media import hls  # noqa: E402
+from services.media import encoder  # noqa: E402
+from services.media.audio_splice import replace_audio_span  # noqa: E402
+from services.audio.timeline import AudioTimeline  # noqa: E402
+from services.audio.extract import ExtractedAudio, extract as extract_audio, extract_window  # noqa: E402
+from services.audio.time_stretch import stretch_to_duration  # noqa: E402
+from services.ai import xtts as xtts_engine  # noqa: E402
+from services.ai.model_registry import MODELS  # noqa: E402
+from services.ai.whisper_parallel import ParallelTranscriber  # noqa: E402
+from services.ai.wav2lip_worker import Wav2LipWorker  # noqa: E402
+from services.ai import whisper_models  # noqa: E402
+from services.ai import translation_batch as tb  # noqa: E402
+from services.cache.translation_memory import TranslationMemory, normalize as tm_normalize  # noqa: E402
+from services.cache.tts_cache import TTSClipCache  # noqa: E402
+from services.cache.analysis_cache import AnalysisCache  # noqa: E402
+from services.storage.file_serving import ContentHashes, serve_file  # noqa: E402
+from models.db import InMemoryDB, SQLiteDB  # noqa: E402
+from services import lazy  # noqa: E402
+from services.live.session import LiveSession, latency_stats as live_latency_stats  # noqa: E402
+
+# Optional engines. Availability is probed from import specs only; the heavy
+# modules (moviepy, openai, faster-whisper, torch via TTS) are imported by the
+# stage that first needs them, so the API answers /health without them. A flag
+# turns off if that first import fails (see _engine_import_failed).
+HAS_MEDIA = lazy.available("moviepy") and lazy.available("gtts")  # real media handling
+HAS_XTTS = lazy.available("TTS")  # Coqui XTTS voice cloning (requires torch installed)
+HAS_OPENAI = lazy.available("openai") and lazy.available("googletrans")  # real STT + translation
+HAS_LOCAL_WHISPER = lazy.available("faster_whisper")  # local STT (no API key)
+mp = lazy.LazyModule("moviepy.editor")
+gTTS = lazy.LazyAttr("gtts", "gTTS")
+OpenAI = lazy.LazyAttr("openai", "OpenAI")
+# Engine flag each optional package backs. A package whose first real import fails
+# (a broken install or missing shared library passes the spec probe) switches its
+# engine off for the rest of the process, so later jobs take the mock/fallback path
+_ENGINE_FLAGS = {"moviepy": "HAS_MEDIA", "gtts": "HAS_MEDIA", "TTS": "HAS_XTTS", "openai": "HAS_OPENAI",
+                 "googletrans": "HAS_OPENAI", "faster_whisper": "HAS_LOCAL_WHISPER"}
+
+
+def _engine_import_failed(name: str, error: str):
+    flag = _ENGINE_FLAGS.get(name.split(".")[0])
+    if flag:
+        globals()[flag] = False
+
+
+lazy.on_failure(_engine_import_failed)
+# Imported in the background at startup with EAGER_IMPORTS=true
+HEAVY_MODULES = ["moviepy.editor", "gtts", "openai", "googletrans", "faster_whisper", "TTS.api"]
 
 # Map to gTTS language codes where they differ
 GTTS_LANG_MAP = {
@@ -56,12 +92,53 @@ GTTS_LANG_MAP = {
     # Note: gTTS does not have a dedicated "no" (Norwegian) code; will fallback to 'en'
 }
     # Some may be unsupported by gTTS: as, brx, doi, ks, gom, mai, mni, sa, sat, sd
-USERS: Dict[str, dict] = {}
-HISTORY: Dict[str, list] = {}
 
 APP_ENV = os.getenv("APP_ENV", "development")
-STORAGE_DIR = os.getenv("STORAGE_DIR", os.path.join("backend", "storage"))
+# Default next to this file, whichever directory the server is started from
+STORAGE_DIR = os.getenv("STORAGE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage"))
 LIPSYNC_BACKEND = os.getenv("AI_LIPSYNC_BACKEND", "mock").lower()
+# copy: stream-copy the video and only encode the new audio; reencode: always libx264
+MUX_MODE = os.getenv("MUX_MODE", "copy").lower()
+# libx264 profiles (services.media.encoder.PROFILES) for re-encoded finals and previews
+ENCODE_PROFILE = os.getenv("ENCODE_PROFILE", "balanced")
+PREVIEW_ENCODE_PROFILE = os.getenv("PREVIEW_ENCODE_PROFILE", "fast")
+PREVIEW_SECONDS = float(os.getenv("PREVIEW_SECONDS", "5"))
+# Publish the preview from a pass over the first PREVIEW_SECONDS before the full render
+# (not with Wav2Lip: a quick pass cannot lipsync, so the full mux renders that preview)
+PREVIEW_FIRST = os.getenv("PREVIEW_FIRST", "true").lower() == "true" and LIPSYNC_BACKEND != "wav2lip"
+# Sources at least WINDOWED_MIN_SECONDS long are rendered in keyframe-aligned windows of
+# about WINDOW_SECONDS, published as HLS while the job runs; WINDOW_PARALLEL windows at a time
+WINDOWED_RENDER = os.getenv("WINDOWED_RENDER", "true").lower() == "true"
+WINDOWED_MIN_SECONDS = float(os.getenv("WINDOWED_MIN_SECONDS", "300"))
+WINDOW_SECONDS = float(os.getenv("WINDOW_SECONDS", "30"))
+WINDOW_PARALLEL = max(1, int(os.getenv("WINDOW_PARALLEL", str(os.cpu_count() or 2))))
+# Segments rendered concurrently per job, and the request rate allowed against gTTS
+TTS_FANOUT = max(1, int(os.getenv("TTS_FANOUT", "8")))
+GTTS_LIMITER = AsyncRateLimiter(float(os.getenv("TTS_REMOTE_RATE_PER_SEC", "4")))
+TTS_SAMPLE_RATE = int(os.getenv("TTS_SAMPLE_RATE", "24000"))
+DB_BACKEND = os.getenv("DB_BACKEND", "sqlite").lower()
+# Upload `priority` is clamped to 0..JOB_PRIORITY_MAX (callers are not authenticated, so
+# the default 0 ignores it; raise it only where every client is trusted)
+JOB_PRIORITY_MAX = max(0, int(os.getenv("JOB_PRIORITY_MAX", "0")))
+
+# Job/user/history stores. With DB_BACKEND=sqlite, jobs are persisted so the
+# queue can pick unfinished work back up after a restart. The stores and caches
+# below touch the disk only from _open_storage (startup), never at import.
+DB = SQLiteDB(os.path.join(STORAGE_DIR, "jobs.db")) if DB_BACKEND == "sqlite" else InMemoryDB()
+JOBS: Dict[str, dict] = DB.jobs
+USERS: Dict[str, dict] = DB.users
+HISTORY: Dict[str, list] = DB.history
+CACHE_DIR = os.path.join(STORAGE_DIR, "_cache")
+# Reused translations of recurring segments (intros, outros, disclaimers)
+TRANSLATION_MEMORY = TranslationMemory(os.path.join(CACHE_DIR, "translation_memory.db"))
+# Synthesized segment clips keyed by (text, language, engine, voice-sample hash)
+TTS_CACHE = TTSClipCache(os.path.join(CACHE_DIR, "tts"))
+# Per source video (content hash): stored upload, audio, probe, transcripts, face track
+ANALYSIS = AnalysisCache(os.path.join(CACHE_DIR, "analysis"))
+# Content digests of served outputs (ETags), registered as jobs produce them
+CONTENT_HASHES = ContentHashes()
+# nginx internal location aliasing STORAGE_DIR; when set, file bodies are left to nginx (X-Accel-Redirect)
+ACCEL_REDIRECT_PREFIX = os.getenv("ACCEL_REDIRECT_PREFIX", "")
 
 # CORS configuration
 if APP_ENV.lower() == "development":
@@ -73,11 +150,8 @@ else:
         CORS_ORIGINS = ["*"]  # Fallback for production
 
 AUTO_DELETE = os.getenv("AUTO_DELETE", "true").lower() == "true"
-
-# Ensure storage directory exists
-os.makedirs(STORAGE_DIR, exist_ok=True)
-
-os.makedirs(STORAGE_DIR, exist_ok=True)
+# A completed job's files are deleted this long after it finished
+AUTO_DELETE_SECONDS = 600
 
 app = FastAPI(title=os.getenv("APP_NAME", "Human Video Translator API"))
 app.add_middleware(
@@ -109,6 +183,16 @@ class JobStatusResponse(BaseModel):
     status: str
     progress: float
     message: Optional[str] = None
+    queue_position: Optional[int] = None
+    eta_seconds: Optional[float] = None
+    metrics: Optional[dict] = None
+    media: Optional[dict] = None
+    # True once /preview serves a file, possibly well before the job completes
+    preview_ready: bool = False
+    # Windowed renders: playlist URL and windows published so far
+    hls: Optional[dict] = None
+    # Versioned (?v=<etag>), long-cacheable URLs of the outputs whose digests are known
+    downloads: Optional[dict] = None
 
 
 SUPPORTED_LANGUAGES = [
@@ -222,9 +306,145 @@ LANG_LABELS = {
 }
 
 
+# Push channel for job progress (GET /jobs/{id}/events, GET /dashboard/{user}/events)
+EVENTS = EventHub()
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def _report(job: dict, progress: Optional[float] = None, message: Optional[str] = None, **detail):
+    """Set a job's progress/message and push them to its subscribers (free when there are none).
+    `detail` carries the fine-grained part (stage, done/total, frames, ...)."""
+    if progress is not None:
+        job["progress"] = progress
+    if message is not None:
+        job["message"] = message
+    EVENTS.publish(f"job:{job['job_id']}", "progress",
+                   {"status": job["status"], "progress": job.get("progress", 0.0), "message": job.get("message"), **detail})
+
+
+def _report_stage(job: dict, stage: str, state: str, **detail):
+    """Stage transition: started, completed (with seconds) or reused (from a checkpoint)."""
+    EVENTS.publish(f"job:{job['job_id']}", "stage", {"stage": stage, "state": state, **detail})
+
+
+def _report_status(job: dict):
+    # Status transitions (queued/processing/completed/failed), also to the owner's dashboard stream
+    data = {"job_id": job["job_id"], "status": job["status"], "progress": job.get("progress", 0.0),
+            "message": job.get("message"), "target_language": job.get("target_language")}
+    EVENTS.publish(f"job:{job['job_id']}", "status", data)
+    EVENTS.publish(f"user:{job.get('user_id') or 'guest'}", "job", data)
+
+
+# Bounded job queue: uploads are admitted here instead of each spawning its own task
+JOB_QUEUE = JobQueue(DB, lambda job_id: _process_job(job_id), on_change=_report_status)
+
+
+def _open_storage():
+    os.makedirs(STORAGE_DIR, exist_ok=True)
+    for store in (DB, TRANSLATION_MEMORY, TTS_CACHE, ANALYSIS):
+        store.open()
+
+
+@app.on_event("startup")
+async def _start_job_queue():
+    # Before the queue starts: it resumes the jobs the database holds
+    await STAGES.run("io", _open_storage)
+    await JOB_QUEUE.start()
+    # Auto-delete timers do not survive a restart: restored jobs get theirs back with the
+    # time they had left, then sources no kept job references go
+    if AUTO_DELETE:
+        for job in list(JOBS.values()):
+            if job.get("status") == "completed" and not job.get("files_deleted"):
+                # Jobs stored before completed_at existed: estimate it, or delete them now
+                job.setdefault("completed_at", (job.get("started_at") or 0)
+                               + (job.get("metrics") or {}).get("processing_seconds", 0))
+                _schedule_auto_delete(job)
+    await _release_analysis()
+
+
+@app.on_event("startup")
+async def _warm_models():
+    # Load in the background so /health answers while multi-GB weights load
+    if HAS_XTTS and os.getenv("XTTS_PRELOAD", "false").lower() == "true":
+        asyncio.create_task(STAGES.run("tts", xtts_engine.load_model))
+    if HAS_LOCAL_WHISPER and os.getenv("WHISPER_PRELOAD", "false").lower() == "true":
+        if _WHISPER_POOL is not None:
+            asyncio.create_task(STAGES.run("stt", _WHISPER_POOL.warm))
+        else:
+            asyncio.create_task(STAGES.run("stt", whisper_models.load_model))
+    if _LIPSYNC_WORKER is not None and os.getenv("WAV2LIP_PRELOAD", "false").lower() == "true":
+        _LIPSYNC_WORKER.start()
+    if os.getenv("EAGER_IMPORTS", "false").lower() == "true":
+        asyncio.create_task(STAGES.run("io", _import_heavy_modules))
+
+
+def _import_heavy_modules():
+    for name in HEAVY_MODULES:
+        if lazy.available(name.split(".")[0]):
+            try:
+                lazy.load(name)
+            except Exception:
+                pass
+
+
+@app.on_event("shutdown")
+async def _shutdown_stage_pools():
+    await JOB_QUEUE.stop()
+    await tb.close_http_client()
+    if _WHISPER_POOL is not None:
+        _WHISPER_POOL.shutdown()
+    if _LIPSYNC_WORKER is not None:
+        _LIPSYNC_WORKER.shutdown()
+    STAGES.shutdown(wait=False)
+
+
 @app.get("/health")
 async def health():
-    return {"status": "ok", "time": datetime.utcnow().isoformat() + "Z"}
+    return {
+        "status": "ok",
+        "time": datetime.utcnow().isoformat() + "Z",
+        "stages": STAGES.stats(),
+        "queue": JOB_QUEUE.stats(),
+        "events": EVENTS.stats(),
+        "live": live_latency_stats(),
+    }
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness (as opposed to /health liveness): 503 until the queue runs and any
+    models requested with XTTS_PRELOAD / WHISPER_PRELOAD are resident."""
+    whisper_resident = [m["key"] for m in MODELS.stats() if m["key"][0] == "whisper"]
+    engines = {
+        "media": {"available": HAS_MEDIA, "imported": "moviepy.editor" in sys.modules},
+        "openai": {"available": HAS_OPENAI, "imported": "openai" in sys.modules},
+        "whisper": {
+            "available": HAS_LOCAL_WHISPER,
+            "imported": "faster_whisper" in sys.modules,
+            "models": whisper_resident,
+            "pool_warmed": _WHISPER_POOL.warmed if _WHISPER_POOL is not None else None,
+        },
+        "xtts": {
+            "available": HAS_XTTS,
+            "imported": "TTS.api" in sys.modules,
+            "model_loaded": MODELS.loaded(("xtts", xtts_engine.model_name())),
+        },
+        "lipsync": _LIPSYNC_WORKER.stats() if _LIPSYNC_WORKER is not None else {"backend": LIPSYNC_BACKEND},
+    }
+    waiting = []
+    if not JOB_QUEUE.started:
+        waiting.append("job_queue")
+    if HAS_XTTS and os.getenv("XTTS_PRELOAD", "false").lower() == "true" and not engines["xtts"]["model_loaded"]:
+        waiting.append("xtts")
+    if HAS_LOCAL_WHISPER and os.getenv("WHISPER_PRELOAD", "false").lower() == "true":
+        warm = _WHISPER_POOL.warmed if _WHISPER_POOL is not None else bool(whisper_resident)
+        if not warm:
+            waiting.append("whisper")
+    if _LIPSYNC_WORKER is not None and os.getenv("WAV2LIP_PRELOAD", "false").lower() == "true" and not _LIPSYNC_WORKER.ready:
+        waiting.append("lipsync")
+    body = {"ready": not waiting, "waiting_for": waiting, "engines": engines, "imports": lazy.loaded(),
+            "import_failures": lazy.failed()}
+    return JSONResponse(body, status_code=200 if not waiting else 503)
 
 
 @app.post("/auth/mock-login", response_model=LoginResponse)
@@ -253,39 +473,168 @@ async def upload_video(
     target_language: str = Form(...),
     user_id: str = Form(...),
     voice_sample: UploadFile | None = File(None),
+    priority: int = Form(0),
+    quality: str = Form("standard"),
 ):
     if target_language not in SUPPORTED_LANGUAGES:
         raise HTTPException(status_code=400, detail="Unsupported target language")
+    _check_quality(quality)
+    # Reserves the slot, so uploads stored concurrently cannot overshoot JOB_QUEUE_MAX
+    _admit_or_429(1)
 
     job_id = str(uuid.uuid4())
     job_dir = os.path.join(STORAGE_DIR, job_id)
-    os.makedirs(job_dir, exist_ok=True)
+    try:
+        os.makedirs(job_dir, exist_ok=True)
+        key, src_path, media = await _store_source(file, job_dir)
+        voice_path = await _store_voice_sample(voice_sample, job_dir)
+        job = _new_job(job_id, job_dir, user_id, target_language, quality, src_path, key, media, voice_path)
+    except BaseException:
+        JOB_QUEUE.release(1)
+        raise
+    position = JOB_QUEUE.submit(job, priority=_clamp_priority(priority), reserved=True)
+
+    return UploadResponse(job_id=job_id, message=f"Upload received. Queued at position {position}.")
+
+
+class MultiUploadJob(BaseModel):
+    job_id: str
+    target_language: str
+
+
+class MultiUploadResponse(BaseModel):
+    group_id: str
+    jobs: List[MultiUploadJob]
+    message: str
 
-    src_path = os.path.join(job_dir, f"source_{file.filename}")
-    # Stream copy instead of reading whole file into memory
-    import shutil
-    file.file.seek(0)
-    with open(src_path, "wb") as f:
-        shutil.copyfileobj(file.file, f, length=1024 * 1024)
 
-    voice_path = None
-    if voice_sample is not None:
-        voice_path = os.path.join(job_dir, f"voice_{voice_sample.filename}")
-        import shutil as _sh
+@app.post("/upload_multi", response_model=MultiUploadResponse)
+async def upload_video_multi(
+    file: UploadFile = File(...),
+    target_languages: str = Form(...),
+    user_id: str = Form(...),
+    voice_sample: UploadFile | None = File(None),
+    priority: int = Form(0),
+    quality: str = Form("standard"),
+):
+    """One source, many target languages (comma-separated). The source is stored and
+    analysed once; each language job only translates, synthesizes and muxes."""
+    languages = list(dict.fromkeys(l.strip() for l in target_languages.split(",") if l.strip()))
+    if not languages:
+        raise HTTPException(status_code=400, detail="target_languages is empty")
+    unsupported = [l for l in languages if l not in SUPPORTED_LANGUAGES]
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"Unsupported target language(s): {', '.join(unsupported)}")
+    _check_quality(quality)
+    _admit_or_429(len(languages))
+
+    group_id = str(uuid.uuid4())
+    staging = os.path.join(STORAGE_DIR, f"_upload_{group_id}")
+    submitted = 0
+    try:
+        os.makedirs(staging, exist_ok=True)
+        key, src_path, media = await _store_source(file, staging)
+        voice_path = await _store_voice_sample(voice_sample, staging)
+        jobs = []
+        for lang in languages:
+            job_id = str(uuid.uuid4())
+            job_dir = os.path.join(STORAGE_DIR, job_id)
+            os.makedirs(job_dir, exist_ok=True)
+            job_voice = None
+            if voice_path:
+                # Each job owns (and auto-deletes) its copy of the small voice sample
+                job_voice = os.path.join(job_dir, os.path.basename(voice_path))
+                shutil.copyfile(voice_path, job_voice)
+            job = _new_job(job_id, job_dir, user_id, lang, quality, src_path, key, media, job_voice)
+            job["group_id"] = group_id
+            JOB_QUEUE.submit(job, priority=_clamp_priority(priority), reserved=True)
+            submitted += 1
+            jobs.append(MultiUploadJob(job_id=job_id, target_language=lang))
+    finally:
+        # Slots reserved for languages that never got a job
+        JOB_QUEUE.release(len(languages) - submitted)
+        shutil.rmtree(staging, ignore_errors=True)
+    return MultiUploadResponse(group_id=group_id, jobs=jobs,
+                               message=f"Upload received. {len(jobs)} language jobs queued.")
+
+
+def _check_quality(quality: str):
+    if quality not in whisper_models.QUALITY_TIERS:
+        raise HTTPException(status_code=400, detail=f"quality must be one of {', '.join(whisper_models.QUALITY_TIERS)}")
+
+
+def _clamp_priority(priority: int) -> int:
+    return min(max(priority, 0), JOB_PRIORITY_MAX)
+
+
+def _admit_or_429(count: int):
+    # Reject before storing anything when the queue is saturated; otherwise the slots are
+    # reserved until JOB_QUEUE.submit(..., reserved=True) or JOB_QUEUE.release
+    try:
+        JOB_QUEUE.admit(count)
+    except QueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail={"message": "Too many jobs queued. Try again later.", "queue_position": e.position, "eta_seconds": e.eta_seconds},
+            headers={"Retry-After": str(int(e.eta_seconds))},
+        )
+
+
+async def _store_source(file: UploadFile, staging_dir: str) -> tuple:
+    """Store an uploaded source once per content: (content hash, stored path, media probe).
+    The upload is hashed while it is copied; a source seen before is not stored again and
+    its probe comes from the analysis cache."""
+    staging_path = os.path.join(staging_dir, f"source_{uuid.uuid4().hex}")
+
+    def copy_and_hash() -> str:
+        h = hashlib.sha256()
+        file.file.seek(0)
+        with open(staging_path, "wb") as f:
+            for block in iter(lambda: file.file.read(1024 * 1024), b""):
+                h.update(block)
+                f.write(block)
+        return h.hexdigest()
+
+    key = await STAGES.run("io", copy_and_hash)
+    src_path = await STAGES.run("io", ANALYSIS.store_source, key, staging_path, file.filename or "source.mp4")
+    # Probed once per source; later stages and the dashboard read job["media"]
+    media = ANALYSIS.get_media(key)
+    if media is None:
         try:
-            voice_sample.file.seek(0)
-            with open(voice_path, "wb") as vf:
-                _sh.copyfileobj(voice_sample.file, vf, length=1024 * 512)
+            media = await STAGES.run("probe", media_probe.probe, src_path)
+            ANALYSIS.put_media(key, media)
         except Exception:
-            voice_path = None
+            media = None
+    return key, src_path, media
+
+
+async def _store_voice_sample(voice_sample: Optional[UploadFile], job_dir: str) -> Optional[str]:
+    if voice_sample is None:
+        return None
+    voice_path = os.path.join(job_dir, f"voice_{voice_sample.filename}")
+    try:
+        voice_sample.file.seek(0)
+        with open(voice_path, "wb") as vf:
+            shutil.copyfileobj(voice_sample.file, vf, length=1024 * 512)
+        return voice_path
+    except Exception:
+        return None
 
-    JOBS[job_id] = {
+
+def _new_job(job_id: str, job_dir: str, user_id: str, target_language: str, quality: str, src_path: str,
+             analysis_key: Optional[str], media: Optional[dict], voice_path: Optional[str]) -> dict:
+    return {
         "job_id": job_id,
         "user_id": user_id,
         "status": "queued",
         "progress": 0.0,
         "created_at": datetime.utcnow().isoformat() + "Z",
         "target_language": target_language,
+        "quality": quality,
+        "whisper_model": whisper_models.size_for_quality(quality),
+        "media": media,
+        # Content hash of the source; keys its entry in the shared analysis cache
+        "analysis_key": analysis_key,
         "paths": {
             "source": src_path,
             "preview": os.path.join(job_dir, "preview.mp4"),
@@ -296,11 +645,6 @@ async def upload_video(
         },
     }
 
-    # Start background processing
-    asyncio.create_task(_process_job(job_id))
-
-    return UploadResponse(job_id=job_id, message="Upload received. Processing started.")
-
 
 # Lightweight one-shot translation endpoint for the Chrome extension
 @app.post("/live_translate")
@@ -319,40 +663,22 @@ async def live_translate(
     with open(src_path, "wb") as f:
         shutil.copyfileobj(file.file, f, length=1024 * 1024)
 
-    # Prepare a mono 16k WAV for STT
-    wav_path = None
+    # Decode video or audio input straight to 16k mono samples for STT
     try:
-        ctype = (file.content_type or "").lower()
-        if ctype.startswith("video/"):
-            # Use existing utility to extract audio
-            wav_path = await _extract_audio(src_path)
-        else:
-            # Audio input: normalize to 16k mono WAV using librosa
-            import librosa, soundfile as sf
-            y, sr = librosa.load(src_path, sr=16000, mono=True)
-            wav_path = os.path.join(tmp_dir, "audio.wav")
-            sf.write(wav_path, y, 16000)
+        extracted = await _extract_audio(src_path, tmp_dir)
     except Exception:
-        # As a last resort, try moviepy for any input type
-        if HAS_MEDIA:
-            try:
-                clip = mp.AudioFileClip(src_path)
-                wav_path = os.path.join(tmp_dir, "audio.wav")
-                clip.write_audiofile(wav_path, fps=16000, nbytes=2, codec="pcm_s16le", verbose=False, logger=None)
-                clip.close()
-            except Exception:
-                pass
-    if not wav_path or not os.path.exists(wav_path):
+        shutil.rmtree(tmp_dir, ignore_errors=True)
         raise HTTPException(status_code=400, detail="Failed to prepare audio for transcription")
 
     # Transcribe
     full_text = None
     segs = None
     try:
-        full_text, segs, detected = await _transcribe_local_whisper(wav_path) or (None, None, None)
+        full_text, segs, detected = await _transcribe_local_whisper(extracted.samples, whisper_models.size_for_quality("preview")) or (None, None, None)
     except Exception:
         full_text = None
     if not full_text:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
         raise HTTPException(status_code=500, detail="Transcription failed")
 
     # Translate (whole text as a single block)
@@ -360,14 +686,418 @@ async def live_translate(
 
     # Synthesize TTS (single-shot)
     try:
-        tts_path = await _synthesize_tts([translated], lang)
+        tts_path = await _synthesize_tts([translated], lang, out_dir=tmp_dir)
     except Exception as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
         raise HTTPException(status_code=500, detail=f"TTS failed: {e}")
 
-    # Return as MP3
+    # Return as MP3; the scratch dir goes once the response is sent
     if not os.path.exists(tts_path):
+        shutil.rmtree(tmp_dir, ignore_errors=True)
         raise HTTPException(status_code=500, detail="TTS output missing")
-    return FileResponse(tts_path, media_type="audio/mpeg", filename="translated.mp3")
+    return FileResponse(tts_path, media_type="audio/mpeg", filename="translated.mp3",
+                        background=BackgroundTask(shutil.rmtree, tmp_dir, ignore_errors=True))
+
+
+async def _analyze_source(job: dict) -> tuple:
+    """(text, segments, language) of the job's source; (None, None, None) if nothing was heard.
+
+    None of this depends on the target language, so it is shared through the
+    analysis cache: the first job for a video extracts and transcribes (one
+    job at a time per video) and later jobs, in any language, read the stored
+    transcript. The preview-first preview is published on the way either way.
+    """
+    key = job.get("analysis_key")
+    duration = (job.get("media") or {}).get("duration")
+    job_dir = os.path.dirname(job["paths"]["output"])
+    if not key:
+        extracted = await _extract_audio(job["paths"]["source"], job_dir, duration)
+        if HAS_XTTS and not job["paths"].get("voice"):
+            # The source audio is the voice cloning reference when no sample was uploaded
+            job["paths"]["source_audio"] = await STAGES.run("io", extracted.wav_path)
+        return await _transcribe_source(job, extracted)
+
+    variant = job.get("whisper_model") or whisper_models.default_size()
+    async with _keyed_lock(_ANALYSIS_LOCKS, key):
+        cached = ANALYSIS.get_transcript(key, variant)
+        job.setdefault("metrics", {})["analysis_cache"] = "hit" if cached else "miss"
+        if cached:
+            if HAS_XTTS and not job["paths"].get("voice"):
+                job["paths"]["source_audio"] = await _speaker_reference(key)
+        else:
+            return await _analyze_uncached(job, key, variant, duration, job_dir)
+    # Outside the lock, so the language jobs of one video render their previews concurrently
+    if PREVIEW_FIRST and cached[1]:
+        await _render_preview_first(job, segments=cached[1], lang=cached[2])
+    return cached
+
+
+async def _analyze_uncached(job: dict, key: str, variant: str, duration: Optional[float], job_dir: str) -> tuple:
+    # Caller holds the source's analysis lock
+    samples = ANALYSIS.load_audio(key)
+    if samples is not None:
+        # Cached for another Whisper variant of this video
+        extracted = ExtractedAudio(samples, job_dir)
+    else:
+        extracted = await _extract_audio(job["paths"]["source"], job_dir, duration)
+        await STAGES.run("io", ANALYSIS.put_audio, key, extracted.samples)
+    if HAS_XTTS and not job["paths"].get("voice"):
+        job["paths"]["source_audio"] = await _speaker_reference(key, extracted.samples)
+    t0 = time.perf_counter()
+    text, segs, lang = await _transcribe_source(job, extracted)
+    if text and segs:
+        ANALYSIS.put_transcript(key, variant, text, segs, lang, seconds=time.perf_counter() - t0)
+    ANALYSIS.refresh(key)
+    return text, segs, lang
+
+
+# One analysis per source (and per source window) at a time: concurrent language jobs wait
+# for the first and then hit the cache
+_ANALYSIS_LOCKS: Dict[str, list] = {}
+
+
+@contextlib.asynccontextmanager
+async def _keyed_lock(locks: Dict[str, list], name: str):
+    """Hold the lock for `name` in `locks`; the entry is removed once nobody holds or awaits it."""
+    entry = locks.setdefault(name, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            locks.pop(name, None)
+
+
+async def _speaker_reference(key: str, samples=None) -> Optional[str]:
+    """The cached source-audio WAV used as the XTTS reference, written on first use."""
+    path = ANALYSIS.path(key, "source_audio.wav")
+    if not os.path.exists(path):
+        samples = samples if samples is not None else ANALYSIS.load_audio(key)
+        if samples is None:
+            return None
+        await STAGES.run("io", ExtractedAudio(samples, ANALYSIS.entry_dir(key)).wav_path)
+    return path
+
+
+async def _transcribe_source(job: dict, extracted: ExtractedAudio) -> tuple:
+    # Prefer local faster-whisper first (no API key), fall back to OpenAI if available
+    preview = await _render_preview_first(job, extracted) if PREVIEW_FIRST and HAS_LOCAL_WHISPER else None
+    if preview:
+        # Only the audio after the preview's last segment still needs STT
+        head, detected_src_lang = preview
+        resume = head[-1][1]
+        tail = extracted.samples[int(resume * extracted.sr):]
+        rest = await _transcribe_local_whisper(tail, job.get("whisper_model")) if len(tail) > extracted.sr // 2 else None
+        segs = head + [(st + resume, en + resume, tx) for (st, en, tx) in (rest[1] if rest else [])]
+        text = " ".join(tx for (_, _, tx) in segs)
+    else:
+        text, segs, detected_src_lang = await _transcribe_local_whisper(extracted.samples, job.get("whisper_model")) or (None, None, None)
+    if not text and HAS_OPENAI and os.getenv("OPENAI_API_KEY"):
+        text = await _transcribe_openai(await STAGES.run("io", extracted.wav_path))
+    extracted.release()
+    return text, segs, detected_src_lang
+
+
+async def _render_preview_first(job: dict, extracted: Optional[ExtractedAudio] = None,
+                                segments: Optional[List[tuple]] = None, lang: Optional[str] = None) -> Optional[tuple]:
+    """Run STT, translation, TTS and mux on the first PREVIEW_SECONDS only and publish the preview.
+    Returns (source segments, language) for the full pass to reuse, or None when there was
+    nothing to preview (the full pass then does everything, preview included). With
+    `segments` (a cached transcript) the STT step is skipped.
+    """
+    seconds = media_probe.keyframe_at_or_after(job.get("media"), PREVIEW_SECONDS)
+    if segments is not None:
+        segs = [seg for seg in segments if seg[0] < seconds]
+    else:
+        # A little lookahead so the segment crossing the boundary is transcribed whole
+        head = extracted.samples[:int((seconds + 3.0) * extracted.sr)]
+        res = await _transcribe_local_whisper(head, job.get("whisper_model"))
+        if not res:
+            return None
+        _, segs, lang = res
+        edge = len(head) / extracted.sr - 0.5 if len(head) < len(extracted.samples) else float("inf")
+        # A segment running into the end of the lookahead may be cut off; the full pass redoes it
+        segs = [seg for seg in segs if seg[0] < seconds and seg[1] < edge]
+    if not segs:
+        return None
+    translations = await _translate_segments([tx for (_, _, tx) in segs], job["target_language"], src_lang=lang)
+    tr_segs = [(st, en, ttx or tx) for (st, en, tx), ttx in zip(segs, translations)]
+    scratch = os.path.join(os.path.dirname(job["paths"]["output"]), "_preview")
+    os.makedirs(scratch, exist_ok=True)
+    try:
+        tts = await _synthesize_tts(
+            [tx for (_, _, tx) in tr_segs], job["target_language"], segments=tr_segs,
+            voice_sample=(job["paths"].get("voice") or job["paths"].get("source_audio") or None), out_dir=scratch,
+        )
+        tmp_out = os.path.join(scratch, "preview.mp4")
+        await STAGES.run("encode", ffm.remux_audio, job["paths"]["source"], tts, tmp_out, duration=seconds)
+        # Atomic publish: /preview never serves a half-written file
+        os.replace(tmp_out, job["paths"]["preview"])
+    except Exception:
+        return None
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    job["preview_ready"] = True
+    job["message"] = "Preview ready; rendering the full video"
+    job.setdefault("metrics", {})["time_to_preview_seconds"] = round(time.time() - job.get("queued_at", time.time()), 2)
+    EVENTS.publish(f"job:{job['job_id']}", "preview", {"url": f"/preview/{job['job_id']}"})
+    return segs, lang
+
+
+def _use_windowed_render(media: dict) -> bool:
+    # Window segments are stream-copied into MPEG-TS, and lipsync needs the whole clip
+    return (WINDOWED_RENDER and HAS_MEDIA and LIPSYNC_BACKEND != "wav2lip"
+            and media.get("has_video") and media.get("has_audio") and bool(media.get("keyframes"))
+            and media.get("video_codec") in ("h264", "hevc")
+            and (media.get("duration") or 0) >= WINDOWED_MIN_SECONDS)
+
+
+async def _process_job_windowed(job: dict, manifest: StageManifest, source_id: str):
+    """Render a long source window by window, publishing each as an HLS segment.
+
+    The source is split at keyframes (`hls.plan_windows`); each window is
+    decoded, transcribed, translated, synthesized and muxed on its own, so
+    memory depends on WINDOW_SECONDS and WINDOW_PARALLEL, not on the video
+    length. The MP4 for /download is concatenated from the windows on request.
+    Each finished window is a checkpoint in `manifest`; a resumed job re-renders
+    only the windows that are missing or whose inputs changed.
+    """
+    job_id = job["job_id"]
+    src = job["paths"]["source"]
+    media = job["media"]
+    job_dir = os.path.dirname(job["paths"]["output"])
+    windows = hls.plan_windows(media, WINDOW_SECONDS)
+    playlist = hls.Playlist(os.path.join(job_dir, "hls"), windows)
+    job["paths"]["hls"] = playlist.directory
+    job["paths"]["windows"] = os.path.join(job_dir, "windows")
+    os.makedirs(job["paths"]["windows"], exist_ok=True)
+    job["windows"] = {"total": len(windows), "ready": 0}
+    job["message"] = f"Rendering {len(windows)} windows"
+
+    voice = job["paths"].get("voice") or None
+    voice_id = await STAGES.run("io", checkpoint.digest_file, voice) if voice else source_id
+    if HAS_XTTS and not voice:
+        # Speaker reference from the opening minute; a whole-source WAV would defeat the windowing
+        ref = await STAGES.run("extract", extract_window, src, 0.0, min(60.0, media["duration"]))
+        voice = job["paths"]["source_audio"] = await STAGES.run("io", ExtractedAudio(ref, job_dir).wav_path)
+
+    subs: Dict[int, List[tuple]] = {}
+    words = 0
+    key = job.get("analysis_key")
+    reused = job["metrics"]["stages_reused"]
+    slots = asyncio.Semaphore(WINDOW_PARALLEL)
+
+    async def render(i: int, st: float, en: float):
+        nonlocal words
+        stage = f"window:{i:05d}"
+        variant = f"{job.get('whisper_model') or whisper_models.default_size()}@{st:.3f}+{en - st:.3f}"
+        inputs = {"source": source_id, "whisper": variant, "target": job["target_language"],
+                  "voice": voice_id, "xtts": HAS_XTTS}
+        done = manifest.lookup(stage, inputs)
+        name = hls.segment_name(i)
+        if done:
+            window = done["files"]["window"]["path"]
+            segs = [tuple(seg) for seg in await STAGES.run("io", checkpoint.read_json, done["files"]["subs"]["path"])]
+            reused.append(stage)
+            _report_stage(job, stage, "reused")
+        else:
+            async with slots:
+                _report_stage(job, stage, "started")
+                started = time.perf_counter()
+                # Window transcripts are cached too, so other languages of this video skip decode and STT
+                async with _keyed_lock(_ANALYSIS_LOCKS, f"{key}/{variant}") if key else contextlib.nullcontext():
+                    res = ANALYSIS.get_transcript(key, variant) if key else None
+                    if res is None:
+                        samples = await STAGES.run("extract", extract_window, src, st, en - st)
+                        res = await _transcribe_local_whisper(samples, job.get("whisper_model"))
+                        del samples
+                        if key and res:
+                            ANALYSIS.put_transcript(key, variant, *res)
+                segs = []
+                if res:
+                    _, raw, lang = res
+                    translations = await _translate_segments([tx for (_, _, tx) in raw], job["target_language"], src_lang=lang)
+                    segs = [(a, b, ttx or tx) for (a, b, tx), ttx in zip(raw, translations)]
+                win_dir = os.path.join(job["paths"]["windows"], f"w{i:05d}")
+                os.makedirs(win_dir, exist_ok=True)
+                try:
+                    if segs:
+                        track = await _synthesize_tts([tx for (_, _, tx) in segs], job["target_language"], segments=segs,
+                                                      voice_sample=voice, out_dir=win_dir)
+                    else:
+                        track = await STAGES.run("io", _write_silence, os.path.join(win_dir, "silence.wav"))
+                    window = await STAGES.run("encode", hls.render_window, src, track, st, en - st,
+                                              os.path.join(job["paths"]["windows"], hls.window_name(i)))
+                    segment = os.path.join(playlist.directory, name)
+                    await STAGES.run("encode", hls.publish_segment, window, st, segment)
+                finally:
+                    shutil.rmtree(win_dir, ignore_errors=True)
+            subs_path = os.path.join(job["paths"]["windows"], f"w{i:05d}.json")
+            await STAGES.run("io", _checkpoint_window, manifest, stage, inputs, window, segment, subs_path, segs)
+            _report_stage(job, stage, "completed", seconds=round(time.perf_counter() - started, 2))
+        playlist.add(i, name)
+        subs[i] = [(st + a, st + min(b, en - st), tx) for (a, b, tx) in segs]
+        words += sum(len(tx.split()) for (_, _, tx) in segs)
+        job["windows"]["ready"] = playlist.listed
+        _report(job, round(0.1 + 0.85 * len(subs) / len(windows), 3), windows_done=len(subs), windows_total=len(windows),
+                windows_ready=playlist.listed)
+        if i == 0:
+            # The first window doubles as the preview
+            await STAGES.run("encode", ffm.cut_copy, window, job["paths"]["preview"],
+                             0.0, media_probe.keyframe_at_or_after(media, PREVIEW_SECONDS))
+            job["preview_ready"] = True
+            job.setdefault("metrics", {})["time_to_preview_seconds"] = round(time.time() - job.get("queued_at", time.time()), 2)
+            EVENTS.publish(f"job:{job['job_id']}", "preview", {"url": f"/preview/{job['job_id']}"})
+
+    tasks = [asyncio.ensure_future(render(i, st, en)) for i, (st, en) in enumerate(windows)]
+    try:
+        await asyncio.gather(*tasks)
+    except Exception:
+        for t in tasks:
+            t.cancel()
+        raise
+    playlist.end()
+    if len([s for s in reused if s.startswith("window:")]) < len(windows) and os.path.exists(job["paths"]["output"]):
+        # Concatenated by an earlier run from windows that have since been re-rendered
+        os.remove(job["paths"]["output"])
+    await _write_segment_subtitles(job["paths"]["srt"], job["paths"]["vtt"],
+                                   [seg for i in sorted(subs) for seg in subs[i]])
+
+    job["progress"] = 1.0
+    job["status"] = "completed"
+    job["message"] = "All windows rendered"
+    job.setdefault("metrics", {})["time_to_completion_seconds"] = round(time.time() - job.get("queued_at", time.time()), 2)
+    job["metrics"]["processing_seconds"] = round(time.time() - job.get("started_at", time.time()), 2)
+    HISTORY.setdefault(job.get("user_id") or "guest", []).append({
+        "job_id": job_id,
+        "target_language": job.get("target_language"),
+        "created_at": job.get("created_at"),
+        "duration_sec": int(media.get("duration") or 0),
+        "words": words,
+        "status": "completed",
+    })
+    await _register_outputs(job)
+    if AUTO_DELETE:
+        _schedule_auto_delete(job)
+    await _prune_analysis_cache()
+
+
+def _checkpoint_window(manifest: StageManifest, stage: str, inputs: dict, window: str, segment: str,
+                       subs_path: str, segs: List[tuple]):
+    checkpoint.write_json(subs_path, segs)
+    manifest.record(stage, inputs, {"window": window, "segment": segment, "subs": subs_path})
+
+
+def _write_silence(path: str, seconds: float = 0.1) -> str:
+    import numpy as np
+    import soundfile as sf
+    # Padded to the window length by the segment mux
+    sf.write(path, np.zeros(int(TTS_SAMPLE_RATE * seconds), dtype=np.float32), TTS_SAMPLE_RATE)
+    return path
+
+
+# One concat per job at a time; concurrent /download requests wait for it
+_CONCAT_LOCKS: Dict[str, list] = {}
+
+
+async def _concat_windows(job: dict) -> str:
+    path = job["paths"]["output"]
+    async with _keyed_lock(_CONCAT_LOCKS, job["job_id"]):
+        if not os.path.exists(path):
+            windows = [os.path.join(job["paths"]["windows"], hls.window_name(i)) for i in range(job["windows"]["total"])]
+            await STAGES.run("encode", hls.concat_windows, windows, path)
+            await STAGES.run("io", CONTENT_HASHES.digest, path)
+    return path
+
+
+# Files the download endpoints serve, by job path key, and their URLs
+_SERVED_OUTPUTS = {"output": "/download/{}", "preview": "/preview/{}", "srt": "/subtitles/{}.srt", "vtt": "/subtitles/{}.vtt"}
+
+
+async def _register_outputs(job: dict, manifest: Optional[StageManifest] = None):
+    """Digest the files GET /download, /preview and /subtitles serve, so their ETags exist
+    before the first request. The final output reuses the mux checkpoint's digest."""
+    entry = manifest.stages.get("mux", {}).get("files", {}).get("output") if manifest else None
+    if entry and entry["path"] == job["paths"]["output"]:
+        CONTENT_HASHES.remember(entry["path"], entry["size"], entry["mtime_ns"], entry["sha256"])
+    for key in _SERVED_OUTPUTS:
+        path = job["paths"].get(key)
+        if path and os.path.exists(path):
+            await STAGES.run("io", CONTENT_HASHES.digest, path)
+
+
+async def _serve(request: Request, path: str, media_type: str, filename: Optional[str] = None,
+                 cache_control: Optional[str] = None):
+    """`path` with ETag/Range/conditional handling (services.storage.file_serving)."""
+    sha = CONTENT_HASHES.known(path) or await STAGES.run("io", CONTENT_HASHES.digest, path)
+    return serve_file(request, path, sha, media_type, filename=filename, cache_control=cache_control,
+                      accel_root=STORAGE_DIR, accel_prefix=ACCEL_REDIRECT_PREFIX or None)
+
+
+@app.websocket("/live_translate/ws")
+async def live_translate_ws(websocket: WebSocket, lang: str, src: Optional[str] = None):
+    """Streaming counterpart of /live_translate for the Chrome extension.
+    Query: lang (target), src (optional source language).
+    Client -> server: binary frames of 16kHz mono 16-bit little-endian PCM, then {"type": "stop"}.
+    Server -> client: {"type": "ready"}, then per finalized phrase a JSON "phrase" message
+    (source, text, timings) followed by one binary MP3 message when audio_bytes > 0,
+    and {"type": "done"} after the last phrase.
+    """
+    await websocket.accept()
+    if lang not in SUPPORTED_LANGUAGES:
+        await websocket.send_json({"type": "error", "message": "Unsupported target language"})
+        await websocket.close(code=1008)
+        return
+
+    async def transcribe(samples):
+        res = await _transcribe_local_whisper(samples, whisper_models.size_for_quality("preview"))
+        return (res[1], src or res[2]) if res else ([], src)
+
+    async def translate(text: str, src_lang: Optional[str]):
+        return await _translate_text(text, lang, src_lang=src_lang)
+
+    async def synthesize(text: str):
+        with tempfile.TemporaryDirectory() as scratch:
+            path = await _synthesize_tts([text], lang, out_dir=scratch)
+            return await STAGES.run("io", _read_file, path)
+
+    session = LiveSession(transcribe, translate, synthesize)
+
+    async def send_results():
+        async for res in session.results():
+            audio = res.pop("audio")
+            res["audio_bytes"] = len(audio) if audio else 0
+            await websocket.send_json(res)
+            if audio:
+                await websocket.send_bytes(audio)
+        await websocket.send_json({"type": "done"})
+
+    await websocket.send_json({"type": "ready", "sample_rate": session.sr, "format": "pcm_s16le"})
+    sender = asyncio.create_task(send_results())
+    try:
+        while True:
+            msg = await websocket.receive()
+            if msg["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect()
+            if msg.get("bytes"):
+                session.feed_pcm16(msg["bytes"])
+            elif msg.get("text") and json.loads(msg["text"]).get("type") == "stop":
+                break
+        session.flush()
+        await sender
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.cancel()
+        sender.cancel()
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
 
 
 async def _process_job(job_id: str):
@@ -376,30 +1106,68 @@ async def _process_job(job_id: str):
         return
     try:
         job["status"] = "processing"
-        job["progress"] = 0.1
-        job["message"] = "Starting processing"
+        job["started_at"] = time.time()
+        # Set again if this run publishes a preview-first preview; until then the full mux rebuilds it
+        job["preview_ready"] = False
+        job.pop("completed_at", None)
+        _report(job, 0.1, "Starting processing")
 
         # Prefer real STT + translation when possible
         translated_lines: List[str] | None = None
         segments_for_subs: List[tuple] | None = None  # (start, end, text)
         detected_src_lang: Optional[str] = None
-        if HAS_MEDIA:
+        job_dir = os.path.dirname(job["paths"]["output"])
+        media = job.get("media") or {}
+        # Completed stages (manifest.json in the job dir) are reused when their inputs are unchanged
+        manifest = StageManifest(job_dir)
+        reused = job.setdefault("metrics", {})["stages_reused"] = []
+        source_id = job.get("analysis_key") or await STAGES.run("io", checkpoint.digest_file, job["paths"]["source"])
+        if _use_windowed_render(media):
+            await _process_job_windowed(job, manifest, source_id)
+            return
+        if HAS_MEDIA and media and not media.get("has_audio"):
+            # Silent video: nothing to extract or transcribe
+            job["message"] = "Source has no audio track. Using demo lines."
+        elif HAS_MEDIA:
             try:
-                # 1) Extract audio from the uploaded video
-                audio_path = await _extract_audio(job["paths"]["source"])  # wav temp path, 16k mono
-                # Save extracted source audio for potential voice cloning reference
-                job.setdefault("paths", {})["source_audio"] = audio_path
-                # 2) Transcribe: prefer local faster-whisper first (no API key), fall back to OpenAI if available
-                text, segs, detected_src_lang = await _transcribe_local_whisper(audio_path) or (None, None, None)
-                if not text:
-                    text = await _transcribe_openai(audio_path)
+                # 1-2) Decode and transcribe the source, or reuse a checkpoint or another language job's analysis
+                transcript_inputs = {"source": source_id, "whisper": job.get("whisper_model") or whisper_models.default_size()}
+                done = manifest.lookup("transcript", transcript_inputs)
+                if done:
+                    saved = await STAGES.run("io", checkpoint.read_json, done["files"]["transcript"]["path"])
+                    text, detected_src_lang = saved["text"], saved["language"]
+                    segs = [tuple(seg) for seg in saved["segments"]] if saved["segments"] else None
+                    reused.append("transcript")
+                    _report_stage(job, "transcript", "reused")
+                else:
+                    _report_stage(job, "transcript", "started")
+                    analysis_started = time.perf_counter()
+                    text, segs, detected_src_lang = await _analyze_source(job)
+                    job["metrics"]["analysis_seconds"] = round(time.perf_counter() - analysis_started, 2)
+                    _report_stage(job, "transcript", "completed", seconds=job["metrics"]["analysis_seconds"])
+                    if text:
+                        await STAGES.run("io", _checkpoint_json, manifest, "transcript", transcript_inputs,
+                                         os.path.join(job_dir, "transcript.json"),
+                                         {"text": text, "segments": segs, "language": detected_src_lang},
+                                         job["metrics"]["analysis_seconds"])
                 # 3) Translate to target language (per segment if available)
                 if text:
-                    if segs:
+                    translation_inputs = {"transcript": manifest.digest("transcript", "transcript"), "target": job["target_language"]}
+                    done = manifest.lookup("translation", translation_inputs)
+                    if done:
+                        saved = await STAGES.run("io", checkpoint.read_json, done["files"]["translation"]["path"])
+                        translated_lines = saved["lines"]
+                        segments_for_subs = [tuple(seg) for seg in saved["segments"]] if saved["segments"] else None
+                        reused.append("translation")
+                        _report_stage(job, "translation", "reused")
+                    elif segs:
+                        _report_stage(job, "translation", "started")
+                        translation_started = time.perf_counter()
                         tr_lines: List[str] = []
                         tr_segs: List[tuple] = []
-                        for (st, en, tx) in segs:
-                            ttx = await _translate_text(tx, job["target_language"], src_lang=detected_src_lang) or tx
+                        translations = await _translate_segments([tx for (_, _, tx) in segs], job["target_language"], src_lang=detected_src_lang)
+                        for (st, en, tx), ttx in zip(segs, translations):
+                            ttx = ttx or tx
                             if ttx.strip() == tx.strip():
                                 job["message"] = "Primary translator returned source; used fallback or kept original."
                             tr_lines.append(ttx)
@@ -407,10 +1175,19 @@ async def _process_job(job_id: str):
                         translated_lines = tr_lines
                         segments_for_subs = tr_segs
                     else:
+                        _report_stage(job, "translation", "started")
+                        translation_started = time.perf_counter()
                         translated_text = await _translate_text(text, job["target_language"], src_lang=detected_src_lang) or text
                         if translated_text.strip() == text.strip():
                             job["message"] = "Primary translator returned source; used fallback or kept original."
                         translated_lines = _split_to_sentences(translated_text)
+                    if not done:
+                        _report_stage(job, "translation", "completed", seconds=round(time.perf_counter() - translation_started, 2))
+                    if translated_lines and not done:
+                        await STAGES.run("io", _checkpoint_json, manifest, "translation", translation_inputs,
+                                         os.path.join(job_dir, "translation.json"),
+                                         {"lines": translated_lines, "segments": segments_for_subs},
+                                         time.perf_counter() - translation_started)
                     if not translated_lines:
                         job["message"] = "Translation returned empty; kept original text."
                     else:
@@ -428,51 +1205,116 @@ async def _process_job(job_id: str):
             translated_lines = _demo_translation_text(job["target_language"])  # placeholder
 
         await asyncio.sleep(0.3)
-        job["progress"] = 0.3  # STT + translation ready
+        _report(job, 0.3)  # STT + translation ready
         if segments_for_subs:
             await _write_segment_subtitles(job["paths"]["srt"], job["paths"]["vtt"], segments_for_subs)
         else:
             await _write_demo_subtitles(job["paths"]["srt"], job["paths"]["vtt"], translated_lines, lang=job["target_language"])
 
         await asyncio.sleep(0.3)
-        job["progress"] = 0.6  # TTS
+        _report(job, 0.6)  # TTS
         tts_path = None
         if HAS_MEDIA:
-            try:
-                # Synthesize speech from translated lines (per-segment when available)
-                tts_path = await _synthesize_tts(
-                    translated_lines,
-                    job["target_language"],
-                    segments=segments_for_subs,
-                    voice_sample=(job["paths"].get("voice") or job["paths"].get("source_audio") or None),
-                )
-                job["message"] = "TTS synthesized"
-            except Exception:
-                tts_path = None
-                job["message"] = "TTS failed (possibly offline). Using mock video."
+            voice = job["paths"].get("voice") or None
+            tts_inputs = await _tts_stage_inputs(job, translated_lines, segments_for_subs, source_id)
+            done = manifest.lookup("tts", tts_inputs)
+            if done:
+                tts_path = done["files"]["track"]["path"]
+                reused.append("tts")
+                _report_stage(job, "tts", "reused")
+            else:
+                _report_stage(job, "tts", "started")
+                tts_started = time.perf_counter()
+                if HAS_XTTS and not voice and job.get("analysis_key") and not os.path.exists(job["paths"].get("source_audio") or ""):
+                    # Resumed past the analysis: the speaker reference comes from the cache
+                    job["paths"]["source_audio"] = await _speaker_reference(job["analysis_key"])
+                def tts_progress(done: int, total: int):
+                    _report(job, round(0.6 + 0.25 * done / total, 3), f"TTS: {done}/{total} segments",
+                            stage="tts", done=done, total=total)
+
+                try:
+                    # Synthesize speech from translated lines (per-segment when available)
+                    tts_path = await _synthesize_tts(
+                        translated_lines,
+                        job["target_language"],
+                        segments=segments_for_subs,
+                        voice_sample=(voice or job["paths"].get("source_audio") or None),
+                        out_dir=job_dir,
+                        progress=tts_progress,
+                    )
+                    job["message"] = "TTS synthesized"
+                    # Job-owned track (single-shot clips are exported from the cache), removed with the job
+                    job["paths"]["tts_audio"] = tts_path
+                except Exception:
+                    tts_path = None
+                    job["message"] = "TTS failed (possibly offline). Using mock video."
+                job["metrics"]["tts_seconds"] = round(time.perf_counter() - tts_started, 2)
+                _report_stage(job, "tts", "completed" if tts_path else "failed", seconds=job["metrics"]["tts_seconds"])
+                if tts_path:
+                    await STAGES.run("io", manifest.record, "tts", tts_inputs, {"track": tts_path}, job["metrics"]["tts_seconds"])
 
         await asyncio.sleep(0.3)
-        job["progress"] = 0.85  # Mux audio + preview (or lipsync + mux)
+        _report(job, 0.85)  # Mux audio + preview (or lipsync + mux)
 
         # Optional: Wav2Lip for better lip sync
         source_for_mux = job["paths"]["source"]
-        if LIPSYNC_BACKEND == "wav2lip" and HAS_MEDIA and tts_path:
+        lipsync_inputs = {"source": source_id, "tts": manifest.digest("tts", "track"), "backend": LIPSYNC_BACKEND}
+        done = manifest.lookup("lipsync", lipsync_inputs) if LIPSYNC_BACKEND == "wav2lip" and tts_path else None
+        if done:
+            source_for_mux = done["files"]["video"]["path"]
+            reused.append("lipsync")
+            _report_stage(job, "lipsync", "reused")
+        elif LIPSYNC_BACKEND == "wav2lip" and HAS_MEDIA and tts_path:
+            _report_stage(job, "lipsync", "started")
             try:
-                lipsynced_path = await _run_wav2lip(source_for_mux, tts_path)
+                def lipsync_progress(stage: str, fraction: float):
+                    # Called from the lipsync worker thread; EVENTS.publish hops onto the loop
+                    _report(job, round(0.85 + 0.1 * fraction, 3) if stage == "inference" else None,
+                            f"Lipsync: {stage.replace('_', ' ')} {int(fraction * 100)}%", stage="lipsync", step=stage,
+                            fraction=round(fraction, 3))
+
+                key = job.get("analysis_key")
+                lipsynced_path = await _run_wav2lip(source_for_mux, tts_path, out_dir=job_dir, progress=lipsync_progress,
+                                                    faces_path=ANALYSIS.path(key, "faces.npy") if key else None)
+                if key:
+                    ANALYSIS.refresh(key)
                 if lipsynced_path and os.path.exists(lipsynced_path):
-                    source_for_mux = lipsynced_path
+                    source_for_mux = job["paths"]["lipsync"] = lipsynced_path
                     job["message"] = "Wav2Lip lipsync complete"
+                    await STAGES.run("io", manifest.record, "lipsync", lipsync_inputs, {"video": lipsynced_path})
+                    _report_stage(job, "lipsync", "completed")
             except Exception:
                 job["message"] = "Wav2Lip unavailable/failed, falling back to normal mux"
+                _report_stage(job, "lipsync", "failed")
 
         if HAS_MEDIA and tts_path:
             try:
-                await _mux_with_video(
-                    source_video=source_for_mux,
-                    tts_audio=tts_path,
-                    preview_out=job["paths"]["preview"],
-                    final_out=job["paths"]["output"],
-                )
+                reencode = source_for_mux != job["paths"]["source"]
+                mux_inputs = _mux_stage_inputs(manifest, reencode, source_id)
+                if manifest.lookup("mux", mux_inputs):
+                    reused.append("mux")
+                    _report_stage(job, "mux", "reused")
+                else:
+                    _report_stage(job, "mux", "started")
+                    mux_started = time.perf_counter()
+
+                    def encode_progress(frames: int, total: int):
+                        _report(job, round(0.95 + 0.05 * frames / total, 3), f"Encoding: {frames}/{total} frames",
+                                stage="mux", frames=frames, total=total)
+
+                    await _mux_with_video(
+                        source_video=source_for_mux,
+                        tts_audio=tts_path,
+                        # A preview-first preview is already published; leave it in place
+                        preview_out=None if job.get("preview_ready") else job["paths"]["preview"],
+                        final_out=job["paths"]["output"],
+                        reencode=reencode,
+                        media=media,
+                        progress=encode_progress,
+                    )
+                    await STAGES.run("io", manifest.record, "mux", mux_inputs, {"output": job["paths"]["output"]},
+                                     time.perf_counter() - mux_started)
+                    _report_stage(job, "mux", "completed", seconds=round(time.perf_counter() - mux_started, 2))
                 job["message"] = "Muxing complete"
                 job["status"] = "completed"
 
@@ -481,14 +1323,8 @@ async def _process_job(job_id: str):
                     user_id = job.get("user_id") or "guest"
                     if user_id not in HISTORY:
                         HISTORY[user_id] = []
-                    # Derive duration from source video
-                    duration_sec = 0
-                    try:
-                        clip = mp.VideoFileClip(job["paths"]["source"])
-                        duration_sec = int(clip.duration or 0)
-                        clip.close()
-                    except Exception:
-                        pass
+                    # Duration from the upload-time probe
+                    duration_sec = int(media.get("duration") or 0)
                     # Estimate words from translated lines
                     words = 0
                     try:
@@ -507,8 +1343,10 @@ async def _process_job(job_id: str):
                 except Exception:
                     pass
             except Exception:
-                # Fallback to mock if moviepy/ffmpeg fails
-                await _write_mock_video(job["paths"]["preview"], duration_sec=5)
+                # Fallback to mock if moviepy/ffmpeg fails; a preview already published (preview-first,
+                # or an earlier run) stays
+                if not os.path.exists(job["paths"]["preview"]):
+                    await _write_mock_video(job["paths"]["preview"], duration_sec=5)
                 await _write_mock_video(job["paths"]["output"], duration_sec=10)
                 job["message"] = "Muxing failed (ffmpeg?). Using mock files."
                 job["status"] = "failed"
@@ -535,6 +1373,8 @@ async def _process_job(job_id: str):
 
         job["progress"] = 1.0
         job["status"] = "completed"
+        job.setdefault("metrics", {})["time_to_completion_seconds"] = round(time.time() - job.get("queued_at", time.time()), 2)
+        job["metrics"]["processing_seconds"] = round(time.time() - job.get("started_at", time.time()), 2)
 
         # Update history
         HISTORY.get(job["user_id"], []).append({
@@ -546,12 +1386,43 @@ async def _process_job(job_id: str):
             "status": job["status"],
         })
 
+        await _register_outputs(job, manifest)
         if AUTO_DELETE:
             # Schedule auto-delete in background after some time
-            asyncio.create_task(_auto_delete_job(job_id, delay_seconds=600))
+            _schedule_auto_delete(job)
     except Exception as e:
         job["status"] = "failed"
         job["message"] = str(e)
+    await _prune_analysis_cache()
+
+
+async def _tts_stage_inputs(job: dict, lines: List[str], segments: Optional[List[tuple]], source_id: str) -> dict:
+    voice = job["paths"].get("voice") or None
+    return {
+        "lines": lines, "segments": segments, "target": job["target_language"],
+        # Without an uploaded sample, XTTS clones the source's voice
+        "voice": await STAGES.run("io", checkpoint.digest_file, voice) if voice else source_id,
+        "xtts": HAS_XTTS, "sample_rate": TTS_SAMPLE_RATE,
+    }
+
+
+def _mux_stage_inputs(manifest: StageManifest, reencode: bool, source_id: str) -> dict:
+    return {
+        "video": manifest.digest("lipsync", "video") if reencode else source_id,
+        "tts": manifest.digest("tts", "track"), "mode": MUX_MODE,
+        "profile": ENCODE_PROFILE if reencode else None,
+    }
+
+
+def _checkpoint_json(manifest: StageManifest, stage: str, inputs: dict, path: str, obj, seconds: float):
+    checkpoint.write_json(path, obj)
+    manifest.record(stage, inputs, {stage: path}, seconds)
+
+
+async def _prune_analysis_cache():
+    """Keep the analysis cache under its cap without evicting sources that queued or running jobs use."""
+    active = {j.get("analysis_key") for j in JOBS.values() if j.get("status") in ("queued", "processing")}
+    await STAGES.run("io", ANALYSIS.prune, active - {None})
 
 
 async def _write_mock_video(path: str, duration_sec: int = 5):
@@ -594,108 +1465,225 @@ def _demo_translation_text(lang: str) -> List[str]:
     return lines.get(lang, [f"Hello, this is a demo translation in {label}."])
 
 
-async def _synthesize_tts(lines: List[str], lang: str, segments: Optional[List[tuple]] = None, voice_sample: Optional[str] = None) -> str:
+async def _synthesize_tts(lines: List[str], lang: str, segments: Optional[List[tuple]] = None, voice_sample: Optional[str] = None,
+                          out_dir: Optional[str] = None, progress: Optional[Callable[[int, int], None]] = None) -> str:
     """Synthesize TTS audio.
-    If segments provided (list of (start, end, text)), synthesize per segment and concatenate
-    in order with tiny silences to better align with subtitle timings.
-    Returns path to a single MP3 file.
+    If segments provided (list of (start, end, text)), synthesize per segment and place each
+    clip at its start time on one track so it lines up with the subtitle timings;
+    `progress(done, total)` is called as segments finish.
+    Returns path to a single audio file in `out_dir` (a new temp dir when None): the WAV track
+    for segments, otherwise a copy of the cached clip, so cache eviction never removes it.
     """
-    tmp_dir = tempfile.mkdtemp()
-    gtts_lang = GTTS_LANG_MAP.get(lang, lang)
-    supported = {
-        "en","hi","fr","es","de","ta","ja","ko","zh-CN","ar",
-        "pt","it","ru","tr","fa","sw","id","th","vi","ms","nl","pl","el","he","sv","da","fi","ro","hu",
-        "bn","gu","kn","ml","mr","ne","or","pa","te"
-    }
-    if gtts_lang not in supported:
-        gtts_lang = "en"
+    gtts_lang = _gtts_lang(lang)
 
     # Try XTTS voice cloning if available and a voice sample is provided
-    if HAS_XTTS and voice_sample and os.path.exists(voice_sample):
+    if HAS_XTTS and voice_sample and os.path.exists(voice_sample) and not segments:
         try:
-            model_name = os.getenv("XTTS_MODEL", "tts_models/multilingual/multi-dataset/xtts_v2")
-            xtts = CoquiTTS(model_name)
-            if segments and len(segments) > 0:
-                seg_files = []
-                for (st, en, tx) in segments:
-                    seg_out = os.path.join(tmp_dir, f"xtts_{int(st*1000)}.wav")
-                    lang_code = GTTS_LANG_MAP.get(lang, lang)
-                    xtts.tts_to_file(text=tx, file_path=seg_out, speaker_wav=voice_sample, language=lang_code)
-                    seg_files.append((st, en, seg_out))
-                # Replace segments list to reuse duration matching + concatenation below
-                segments = [(st, en, f"__FILE__::{fp}") for (st, en, fp) in seg_files]
-            else:
-                whole_out = os.path.join(tmp_dir, "xtts_full.wav")
-                lang_code = GTTS_LANG_MAP.get(lang, lang)
-                xtts.tts_to_file(text="\n".join(lines), file_path=whole_out, speaker_wav=voice_sample, language=lang_code)
-                return whole_out
+            # Model comes from the process-wide registry; speaker latents are cached per voice sample
+            lang_code = GTTS_LANG_MAP.get(lang, lang)
+            engine = f"xtts:{xtts_engine.model_name()}"
+            voice_hash = await STAGES.run("io", xtts_engine.file_sha256, voice_sample)
+            text = "\n".join(lines)
+            return await _tts_single(out_dir, text, lang_code, engine, ".wav", xtts_engine.synthesize_to_file, text,
+                                     lang_code, voice_sample, voice_hash=voice_hash)
         except Exception:
             # fall back to gTTS path below
             pass
 
     if segments and len(segments) > 0:
-        # Per-segment TTS, then concatenate
-        clips = []
+        # Per-segment TTS, synthesized and stretched concurrently, then placed on one
+        # in-memory timeline at each segment's real start time and written once
         try:
-            for (st, en, tx) in segments:
-                # Allow pre-generated XTTS files via __FILE__:: protocol
-                prefile = None
-                if isinstance(tx, str) and tx.startswith("__FILE__::"):
-                    prefile = tx.replace("__FILE__::", "", 1)
-                if prefile and os.path.exists(prefile):
-                    clip = mp.AudioFileClip(prefile)
-                else:
-                    seg_mp3 = os.path.join(tmp_dir, f"seg_{int(st*1000)}.mp3")
-                    tts = gTTS(text=tx, lang=gtts_lang)
-                    tts.save(seg_mp3)
-                    clip = mp.AudioFileClip(seg_mp3)
-                # Duration match with simple time-stretch when possible
-                try:
-                    import librosa, soundfile as sf
-                    target_dur = max(en - st, 0.3)
-                    y, sr = librosa.load(seg_mp3, sr=44100)
-                    cur = max(len(y) / sr, 0.001)
-                    rate = max(min(cur / target_dur, 3.0), 0.33)
-                    y2 = librosa.effects.time_stretch(y, rate)
-                    out_wav = os.path.join(tmp_dir, f"seg_{int(st*1000)}_stretch.wav")
-                    sf.write(out_wav, y2, 44100)
-                    clip.close()
-                    clip = mp.AudioFileClip(out_wav)
-                except Exception:
-                    pass
-                clips.append(clip)
-                # small silence between segments to avoid cutting
-                silence = mp.AudioClip(lambda t: 0, duration=0.08, fps=44100)
-                clips.append(silence)
-            # Concatenate all
-            from moviepy.audio.AudioClip import concatenate_audioclips
-            concat = concatenate_audioclips(clips)
-            out_mp3 = os.path.join(tmp_dir, "tts_concat.mp3")
-            concat.write_audiofile(out_mp3, fps=44100, nbytes=2, codec="mp3", verbose=False, logger=None)
-            # Close clips
-            for c in clips:
-                try:
-                    c.close()
-                except Exception:
-                    pass
-            return out_mp3
+            ordered = sorted(segments, key=lambda seg: seg[0])
+            rendered = await _render_tts_segments(ordered, lang, voice_sample, progress=progress)
+            out_wav = os.path.join(out_dir or tempfile.mkdtemp(), "tts_track.wav")
+            await STAGES.run("io", _write_tts_track, ordered, rendered, out_wav)
+            return out_wav
         except Exception:
             # Fall back to single-shot TTS below
-            for c in clips:
-                try:
-                    c.close()
-                except Exception:
-                    pass
+            pass
 
     # Single-shot TTS
     text = "\n".join(lines)
-    out_mp3 = os.path.join(tmp_dir, "tts.mp3")
-    tts = gTTS(text=text, lang=gtts_lang)
-    tts.save(out_mp3)
-    return out_mp3
+    return await _tts_single(out_dir, text, gtts_lang, "gtts", ".mp3", _gtts_save, text, gtts_lang)
+
+
+def _gtts_lang(lang: str) -> str:
+    gtts_lang = GTTS_LANG_MAP.get(lang, lang)
+    supported = {
+        "en","hi","fr","es","de","ta","ja","ko","zh-CN","ar",
+        "pt","it","ru","tr","fa","sw","id","th","vi","ms","nl","pl","el","he","sv","da","fi","ro","hu",
+        "bn","gu","kn","ml","mr","ne","or","pa","te"
+    }
+    return gtts_lang if gtts_lang in supported else "en"
+
+
+async def _render_tts_segments(segments: List[tuple], lang: str, voice_sample: Optional[str] = None,
+                               progress: Optional[Callable[[int, int], None]] = None) -> list:
+    """Samples for each (start, end, text) segment at TTS_SAMPLE_RATE, stretched to its slot, in order.
+    XTTS cloning `voice_sample` when available (all segments, or none), gTTS otherwise.
+    Clips stay pinned in the clip cache until they are decoded."""
+    sem = asyncio.Semaphore(TTS_FANOUT)
+    gtts_lang = _gtts_lang(lang)
+    finished = 0
+    async with contextlib.AsyncExitStack() as pins:
+        files: Optional[List[str]] = None
+        if HAS_XTTS and voice_sample and os.path.exists(voice_sample):
+            try:
+                # Concurrent requests still share one model (its lock serializes inference),
+                # but cache hits and file I/O overlap with it
+                lang_code = GTTS_LANG_MAP.get(lang, lang)
+                engine = f"xtts:{xtts_engine.model_name()}"
+                voice_hash = await STAGES.run("io", xtts_engine.file_sha256, voice_sample)
+
+                async def _xtts_segment(tx):
+                    async with sem:
+                        return await pins.enter_async_context(_tts_clip(
+                            tx, lang_code, engine, ".wav", xtts_engine.synthesize_to_file, tx, lang_code, voice_sample,
+                            voice_hash=voice_hash))
+
+                files = await asyncio.gather(*(_xtts_segment(tx) for (_, _, tx) in segments))
+            except Exception:
+                # fall back to gTTS below
+                files = None
+
+        async def _render_segment(i, st, en, tx):
+            nonlocal finished
+            async with sem:
+                # Duration match with simple time-stretch when possible
+                if files:
+                    samples = await STAGES.run("stretch", _load_segment_samples, files[i], max(en - st, 0.3))
+                else:
+                    async with _tts_clip(tx, gtts_lang, "gtts", ".mp3", _gtts_save, tx, gtts_lang, limiter=GTTS_LIMITER) as clip:
+                        samples = await STAGES.run("stretch", _load_segment_samples, clip, max(en - st, 0.3))
+            finished += 1
+            if progress is not None:
+                progress(finished, len(segments))
+            return samples
+
+        return await asyncio.gather(*(_render_segment(i, st, en, tx) for i, (st, en, tx) in enumerate(segments)))
+
+
+def _tts_placements_path(track_path: str) -> str:
+    return os.path.splitext(track_path)[0] + ".placements.json"
+
+
+def _write_tts_track(ordered: List[tuple], rendered: list, out_wav: str) -> AudioTimeline:
+    """Place the rendered segments on one timeline and write it, plus where each segment landed
+    (`*.placements.json`, sample offset and length per segment) so single segments can be spliced later."""
+    timeline = AudioTimeline(max(en for (_, en, _) in ordered) + 0.5, sr=TTS_SAMPLE_RATE)
+    for (st, _, _), samples in zip(ordered, rendered):
+        timeline.place(st, samples)
+    tmp = out_wav + ".part.wav"
+    timeline.write(tmp)
+    os.replace(tmp, out_wav)
+    checkpoint.write_json(_tts_placements_path(out_wav), {"sr": timeline.sr, "placements": timeline.placements})
+    return timeline
+
+
+def _splice_tts_track(track_path: str, ordered: List[tuple], replaced: Dict[int, object]) -> tuple:
+    """Rebuild the track with the segments at the `replaced` positions (in `ordered`) swapped
+    for new samples; every other segment is copied from the existing track, not re-synthesized.
+    Placement follows the original rules, so a longer line pushes later ones back as before.
+    Returns the (old, new) samples."""
+    import soundfile as sf
+    placed = checkpoint.read_json(_tts_placements_path(track_path))
+    if placed["sr"] != TTS_SAMPLE_RATE or len(placed["placements"]) != len(ordered):
+        raise ValueError("TTS track does not match its segments")
+    old, _ = sf.read(track_path, dtype="float32")
+    rendered = [replaced[i] if i in replaced else old[off:off + n] for i, (off, n) in enumerate(placed["placements"])]
+    return old, _write_tts_track(ordered, rendered, track_path).buffer
+
+
+@contextlib.asynccontextmanager
+async def _tts_clip(text: str, language: str, engine: str, ext: str, synth, *args, voice_hash: str = "",
+                    limiter: Optional[AsyncRateLimiter] = None):
+    """Yields the path of the synthesized clip for `text`, pinned in the clip cache (never
+    evicted) until the block exits; cache hits never reach the TTS pool (the lookup runs
+    on the io pool). On a miss `synth(*args, out_path)` renders it into the cache, after
+    `limiter` (remote engines) admits the request. Export the clip to keep it past the block."""
+    key = TTS_CACHE.key(text, language, engine, voice_hash)
+    with TTS_CACHE.pinned(key):
+        clip = await STAGES.run("io", TTS_CACHE.get, key)
+        if not clip:
+            if limiter is not None:
+                await limiter.acquire()
+            clip = await STAGES.run("tts", TTS_CACHE.synthesize, key, ext, synth, *args)
+        yield clip
+
+
+async def _tts_single(out_dir: Optional[str], *clip_args, **clip_kwargs) -> str:
+    """`_tts_clip` exported into `out_dir` (a new temp dir when None) as tts.<ext>."""
+    dest = os.path.join(out_dir or tempfile.mkdtemp(), "tts" + clip_args[3])
+    async with _tts_clip(*clip_args, **clip_kwargs) as clip:
+        return await STAGES.run("io", TTS_CACHE.export, clip, dest)
+
+
+def _gtts_save(text: str, lang: str, out_path: str) -> str:
+    tts = gTTS(text=text, lang=lang)
+    tts.save(out_path)
+    return out_path
+
+
+def _load_segment_samples(path: str, target_dur: Optional[float]):
+    """Decode a segment clip at TTS_SAMPLE_RATE, time-stretched to `target_dur` when given."""
+    y = ffm.decode_pcm(path, TTS_SAMPLE_RATE)
+    if target_dur is None:
+        return y
+    try:
+        # Engine from TIME_STRETCH_ENGINE; clips within STRETCH_TOLERANCE are left as-is
+        y = stretch_to_duration(y, TTS_SAMPLE_RATE, target_dur)
+    except Exception:
+        pass
+    return y
+
+
+async def _mux_with_video(source_video: str, tts_audio: str, preview_out: Optional[str], final_out: str, reencode: bool = False,
+                          media: Optional[dict] = None, progress: Optional[Callable[[int, int], None]] = None):
+    """Swap in the synthesized audio and write the final video plus a short preview
+    (skipped when `preview_out` is None, i.e. preview-first already published one).
+    Unless `reencode` is set (lipsynced frames) or MUX_MODE=reencode, the video
+    stream is copied and only the new AAC track is encoded; the preview is a
+    stream-copied cut from the start of the final output, ending on the first
+    keyframe after PREVIEW_SECONDS when the probe in `media` lists one nearby.
+    Re-encodes go through the parallel chunked encoder (ENCODE_PROFILE for the
+    final, PREVIEW_ENCODE_PROFILE for the preview), moviepy being the last resort;
+    `progress(frames_done, frames_total)` follows the final's encode.
+    """
+    if not reencode and MUX_MODE != "reencode":
+        preview_seconds = media_probe.keyframe_at_or_after(media, PREVIEW_SECONDS)
+        try:
+            await STAGES.run("encode", _remux_copy_sync, source_video, tts_audio, preview_out, final_out, preview_seconds)
+            return
+        except Exception:
+            # e.g. a source codec the mp4 container cannot hold; re-encode instead
+            pass
+    try:
+        await STAGES.run("encode", _encode_with_video_sync, source_video, tts_audio, preview_out, final_out, progress)
+        return
+    except Exception:
+        # e.g. an ffmpeg build without libx264
+        pass
+    await STAGES.run("encode", _mux_with_video_sync, source_video, tts_audio, preview_out, final_out)
+
+
+def _remux_copy_sync(source_video: str, tts_audio: str, preview_out: Optional[str], final_out: str,
+                     preview_seconds: float = PREVIEW_SECONDS):
+    ffm.remux_audio(source_video, tts_audio, final_out)
+    if preview_out:
+        ffm.cut_copy(final_out, preview_out, start=0.0, duration=preview_seconds)
+
+
+def _encode_with_video_sync(source_video: str, tts_audio: str, preview_out: Optional[str], final_out: str,
+                            progress: Optional[Callable[[int, int], None]] = None):
+    info = media_probe.probe(source_video)
+    encoder.encode(source_video, tts_audio, final_out, profile=ENCODE_PROFILE, media=info, progress=progress)
+    if preview_out:
+        encoder.encode(source_video, tts_audio, preview_out, profile=PREVIEW_ENCODE_PROFILE, media=info,
+                       duration=PREVIEW_SECONDS)
 
 
-async def _mux_with_video(source_video: str, tts_audio: str, preview_out: str, final_out: str):
+def _mux_with_video_sync(source_video: str, tts_audio: str, preview_out: Optional[str], final_out: str):
     # Load video, replace audio with synthesized track, export final and 5s preview
     clip = mp.VideoFileClip(source_video)
     audio = mp.AudioFileClip(tts_audio)
@@ -706,8 +1694,9 @@ async def _mux_with_video(source_video: str, tts_audio: str, preview_out: str, f
     # Write final video
     clip.write_videofile(final_out, codec="libx264", audio_codec="aac", fps=clip.fps or 24, verbose=False, logger=None)
     # Write preview (first 5 seconds or less)
-    p_dur = min(5, clip.duration or 5)
-    clip.subclip(0, p_dur).write_videofile(preview_out, codec="libx264", audio_codec="aac", fps=clip.fps or 24, verbose=False, logger=None)
+    if preview_out:
+        p_dur = min(PREVIEW_SECONDS, clip.duration or PREVIEW_SECONDS)
+        clip.subclip(0, p_dur).write_videofile(preview_out, codec="libx264", audio_codec="aac", fps=clip.fps or 24, verbose=False, logger=None)
     clip.close()
 
 
@@ -752,53 +1741,49 @@ def _fmt_vtt_time(t: float) -> str:
     return f"{h:02}:{m:02}:{s:02}.{ms:03}"
 
 
-async def _run_wav2lip(source_video: str, tts_audio: str) -> Optional[str]:
-    """Run optional Wav2Lip inference via external script if configured.
-    Requires:
-      - environment WAV2LIP_REPO_PATH pointing to a local clone of Wav2Lip
-      - environment WAV2LIP_MODEL_PATH pointing to the pretrained checkpoint (.pth)
-    Returns output video path or None on failure.
+def _make_lipsync_worker() -> Optional[Wav2LipWorker]:
+    """The process-wide Wav2Lip worker, if configured:
+      - WAV2LIP_STUB=true: stub model (no weights; video passes through with the new audio)
+      - otherwise WAV2LIP_REPO_PATH (a local clone of Wav2Lip) and WAV2LIP_MODEL_PATH
+        (the pretrained .pth checkpoint) must both exist
     """
+    if LIPSYNC_BACKEND != "wav2lip":
+        return None
+    if os.getenv("WAV2LIP_STUB", "false").lower() == "true":
+        return Wav2LipWorker("stub")
     repo = os.getenv("WAV2LIP_REPO_PATH")
     model = os.getenv("WAV2LIP_MODEL_PATH")
     if not repo or not model or not os.path.exists(repo) or not os.path.exists(model):
         return None
-    out_dir = tempfile.mkdtemp()
-    out_path = os.path.join(out_dir, "lipsynced.mp4")
-    # Typical Wav2Lip CLI
-    # python inference.py --checkpoint_path <model> --face <source> --audio <tts> --outfile <out>
-    import sys, subprocess
-    py = sys.executable
-    cmd = [
-        py,
-        os.path.join(repo, "inference.py"),
-        "--checkpoint_path", model,
-        "--face", source_video,
-        "--audio", tts_audio,
-        "--outfile", out_path,
-    ]
+    return Wav2LipWorker("wav2lip", repo, model, device=os.getenv("WAV2LIP_DEVICE", "cpu"))
+
+
+# Started on first use (or at startup with WAV2LIP_PRELOAD) and kept for the process lifetime
+_LIPSYNC_WORKER = _make_lipsync_worker()
+
+
+async def _run_wav2lip(source_video: str, tts_audio: str, out_dir: Optional[str] = None,
+                       progress=None, faces_path: Optional[str] = None) -> Optional[str]:
+    """Lipsync `source_video` to `tts_audio` on the persistent Wav2Lip worker.
+    The checkpoint and face detector stay loaded between jobs; `progress(stage, fraction)`
+    is called on the event loop as the worker reports; `faces_path` keeps the face track.
+    Returns the output path or None.
+    """
+    if _LIPSYNC_WORKER is None:
+        return None
+    out_path = os.path.join(out_dir or tempfile.mkdtemp(), "lipsynced.mp4")
     try:
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        await _LIPSYNC_WORKER.apply(source_video, tts_audio, out_path, progress=progress, faces_path=faces_path)
         return out_path if os.path.exists(out_path) else None
     except Exception:
         return None
 
 
-async def _extract_audio(source_video: str) -> str:
-    """Extract audio from source video to a temporary 16kHz mono PCM WAV file."""
-    tmp_dir = tempfile.mkdtemp()
-    out_wav = os.path.join(tmp_dir, "audio.wav")
-    clip = mp.VideoFileClip(source_video)
-    if clip.audio is None:
-        # create a silent track to avoid failures
-        import numpy as np
-        from moviepy.audio.AudioClip import AudioArrayClip
-        arr = np.zeros((int(16000*1), 1))  # 1s silence
-        aclip = AudioArrayClip(arr, fps=16000)
-        clip = clip.set_audio(aclip)
-    clip.audio.write_audiofile(out_wav, fps=16000, nbytes=2, codec="pcm_s16le", verbose=False, logger=None)
-    clip.close()
-    return out_wav
+async def _extract_audio(source: str, work_dir: str, expected_seconds: Optional[float] = None) -> ExtractedAudio:
+    """Decode the audio of `source` (video or audio) to 16kHz mono samples via an ffmpeg pipe.
+    Long sources go to a memmap in `work_dir`; a WAV is only written if a consumer asks for a path.
+    """
+    return await STAGES.run("extract", extract_audio, source, work_dir, expected_seconds)
 
 
 async def _transcribe_openai(audio_path: str) -> Optional[str]:
@@ -807,34 +1792,58 @@ async def _transcribe_openai(audio_path: str) -> Optional[str]:
     if not (HAS_OPENAI and api_key):
         return None
     try:
-        client = OpenAI(api_key=api_key)
-        with open(audio_path, "rb") as f:
-            resp = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f,
-                response_format="text",
-            )
-        return str(resp)
+        return await STAGES.run("stt", _transcribe_openai_sync, audio_path, api_key)
     except Exception:
         return None
 
 
-_LOCAL_WHISPER_MODEL = None
-_WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "tiny").strip()  # tiny, base, small, medium, large
+def _transcribe_openai_sync(audio_path: str, api_key: str) -> str:
+    client = OpenAI(api_key=api_key)
+    with open(audio_path, "rb") as f:
+        resp = client.audio.transcriptions.create(
+            model="whisper-1",
+            file=f,
+            response_format="text",
+        )
+    return str(resp)
+
+
+# > 0: run VAD first and decode the speech chunks on this many worker processes
+# (used for WHISPER_MODEL_SIZE; other tiers run on the in-process registry model)
+WHISPER_PARALLEL_WORKERS = int(os.getenv("WHISPER_PARALLEL_WORKERS", "0"))
+_WHISPER_POOL = (
+    ParallelTranscriber(WHISPER_PARALLEL_WORKERS, whisper_models.default_size(),
+                        os.getenv("WHISPER_COMPUTE_TYPE", "int8"))
+    if WHISPER_PARALLEL_WORKERS > 0 and HAS_LOCAL_WHISPER else None
+)
 
 
-async def _transcribe_local_whisper(audio_path: str) -> Optional[tuple[str, List[tuple], Optional[str]]]:
+async def _transcribe_local_whisper(audio, model_size: Optional[str] = None) -> Optional[tuple[str, List[tuple], Optional[str]]]:
     """Transcribe audio locally using faster-whisper if available; returns (text, segments, lang) or None.
+    `audio` is a file path or 16kHz mono float32 samples (as from `_extract_audio`).
     segments: list of (start, end, text), lang is ISO-639-1 code if available.
+    `model_size` picks the Whisper model (defaults to WHISPER_MODEL_SIZE).
     """
     if not (HAS_LOCAL_WHISPER and HAS_MEDIA):
         return None
     try:
-        global _LOCAL_WHISPER_MODEL
-        if _LOCAL_WHISPER_MODEL is None:
-            # Use a small model by default for speed; configurable via env
-            _LOCAL_WHISPER_MODEL = WhisperModel(_WHISPER_MODEL_SIZE, device="cpu", compute_type="int8")
-        segments, info = _LOCAL_WHISPER_MODEL.transcribe(audio_path, beam_size=1)
+        # Model load and decoding (the segment generator is lazy) both block
+        return await STAGES.run("stt", _transcribe_local_whisper_sync, audio, model_size)
+    except Exception:
+        return None
+
+
+def _transcribe_local_whisper_sync(audio, model_size: Optional[str] = None) -> Optional[tuple[str, List[tuple], Optional[str]]]:
+    model_size = model_size or whisper_models.default_size()
+    if _WHISPER_POOL is not None and model_size == _WHISPER_POOL.size:
+        try:
+            return _WHISPER_POOL.transcribe(ffm.decode_pcm(audio, 16000) if isinstance(audio, str) else audio)
+        except Exception:
+            pass  # fall back to the single in-process model
+    try:
+        # Shared per (size, compute_type, cpu_threads) and evicted by MODEL_MEMORY_BUDGET_MB
+        model = whisper_models.load_model(model_size).model
+        segments, info = model.transcribe(audio, beam_size=1)
         seg_list = []
         full_text_parts = []
         for seg in segments:
@@ -887,13 +1896,17 @@ async def _translate_text(text: str, target_language: str, src_lang: Optional[st
     lang = GTTS_LANG_MAP.get(target_language, target_language)
     # If source not provided, attempt light detection via googletrans
     if not src_lang:
-        try:
-            trd = Translator()
-            det = trd.detect(text)
-            if det and getattr(det, 'lang', None):
-                src_lang = det.lang
-        except Exception:
-            src_lang = None
+        src_lang = await _detect_language(text)
+    cached = await STAGES.run("io", TRANSLATION_MEMORY.get, text, src_lang, lang)
+    if cached:
+        return cached
+    result = await _translate_text_uncached(text, lang, src_lang)
+    if result:
+        await STAGES.run("io", TRANSLATION_MEMORY.put, text, src_lang, lang, result)
+    return result
+
+
+async def _translate_text_uncached(text: str, lang: str, src_lang: Optional[str]) -> Optional[str]:
     def _norm(s: str) -> str:
         return " ".join(s.strip().lower().split())
 
@@ -901,8 +1914,7 @@ async def _translate_text(text: str, target_language: str, src_lang: Optional[st
     # 1) googletrans with small retry
     for _ in range(2):
         try:
-            tr = Translator()
-            res = tr.translate(text, dest=lang, src=src_lang or 'auto')
+            res = await tb.maybe_await(tb.get_translator().translate(text, dest=lang, src=src_lang or 'auto'))
             if res and isinstance(res.text, str) and res.text.strip():
                 if _norm(res.text) != src_norm:
                     return res.text
@@ -917,16 +1929,15 @@ async def _translate_text(text: str, target_language: str, src_lang: Optional[st
             q = text.strip()
             if not q:
                 return None
-            url = 'https://api.mymemory.translated.net/get'
-            async with httpx.AsyncClient(timeout=10) as client:
-                r = await client.get(url, params={"q": q, "langpair": f"{src}|{lang}"})
-                if r.status_code == 200:
-                    data = r.json()
-                    t = data.get('responseData', {}).get('translatedText')
-                    # Guard against MyMemory error texts leaking as "translation"
-                    if t and isinstance(t, str) and t.strip() and 'INVALID SOURCE LANGUAGE' not in t.upper():
-                        if _norm(t) != src_norm:
-                            return t
+            url = os.getenv('MYMEMORY_URL', 'https://api.mymemory.translated.net').rstrip('/') + '/get'
+            r = await tb.get_http_client().get(url, params={"q": q, "langpair": f"{src}|{lang}"}, timeout=10)
+            if r.status_code == 200:
+                data = r.json()
+                t = data.get('responseData', {}).get('translatedText')
+                # Guard against MyMemory error texts leaking as "translation"
+                if t and isinstance(t, str) and t.strip() and 'INVALID SOURCE LANGUAGE' not in t.upper():
+                    if _norm(t) != src_norm:
+                        return t
         except Exception:
             await asyncio.sleep(0.2)
     # 3) LibreTranslate public instance fallback (no API key). Note: rate-limited, best-effort.
@@ -940,14 +1951,13 @@ async def _translate_text(text: str, target_language: str, src_lang: Optional[st
             url = f"{base}/translate"
             payload = {"q": q, "source": src_lang or "auto", "target": lang, "format": "text"}
             headers = {"Accept": "application/json"}
-            async with httpx.AsyncClient(timeout=20) as client:
-                r = await client.post(url, json=payload, headers=headers)
-                if r.status_code == 200:
-                    data = r.json()
-                    t = data.get('translatedText')
-                    if t and isinstance(t, str) and t.strip():
-                        if _norm(t) != src_norm:
-                            return t
+            r = await tb.get_http_client().post(url, json=payload, headers=headers)
+            if r.status_code == 200:
+                data = r.json()
+                t = data.get('translatedText')
+                if t and isinstance(t, str) and t.strip():
+                    if _norm(t) != src_norm:
+                        return t
         except Exception:
             await asyncio.sleep(0.2)
 
@@ -962,8 +1972,7 @@ async def _translate_text(text: str, target_language: str, src_lang: Optional[st
             continue
         # Try googletrans quickly per clause
         try:
-            tr = Translator()
-            res = tr.translate(p, dest=lang, src=src_lang or 'auto')
+            res = await tb.maybe_await(tb.get_translator().translate(p, dest=lang, src=src_lang or 'auto'))
             if res and isinstance(res.text, str) and res.text.strip() and _norm(res.text) != _norm(p):
                 rebuilt.append(res.text)
                 continue
@@ -977,6 +1986,36 @@ async def _translate_text(text: str, target_language: str, src_lang: Optional[st
     return None
 
 
+async def _detect_language(text: str) -> Optional[str]:
+    """Detect the source language once (googletrans); None when unavailable."""
+    try:
+        det = await tb.maybe_await(tb.get_translator().detect(text[:1000]))
+        return getattr(det, 'lang', None) or None
+    except Exception:
+        return None
+
+
+async def _translate_segments(texts: List[str], target_language: str, src_lang: Optional[str] = None) -> List[Optional[str]]:
+    """Translate many segments at once: packed concurrent batches, then the
+    per-text fallback chain of `_translate_text` for whatever is left."""
+    if not src_lang:
+        src_lang = await _detect_language(" ".join(texts))
+    lang = GTTS_LANG_MAP.get(target_language, target_language)
+    # Exact duplicates within the job are translated once; earlier jobs' work comes from the memory
+    unique = list(dict.fromkeys(n for n in (tm_normalize(t) for t in texts) if n))
+    known = await STAGES.run("io", TRANSLATION_MEMORY.get_many, unique, src_lang, lang)
+    todo = [n for n in unique if n not in known]
+    if todo:
+        fresh = await tb.translate_batch(
+            todo, lang, src_lang=src_lang,
+            fallback=lambda t: _translate_text_uncached(t, lang, src_lang),
+        )
+        done = [(n, t) for n, t in zip(todo, fresh) if t]
+        await STAGES.run("io", TRANSLATION_MEMORY.put_many, done, src_lang, lang)
+        known.update(done)
+    return [known.get(tm_normalize(t)) for t in texts]
+
+
 def _split_to_sentences(text: str) -> List[str]:
     # Naive split by punctuation; keep it short for TTS and subtitles
     import re
@@ -987,18 +2026,32 @@ def _split_to_sentences(text: str) -> List[str]:
     return lines[:6] if len(lines) > 6 else lines
 
 
-async def _auto_delete_job(job_id: str, delay_seconds: int = 600):
+def _schedule_auto_delete(job: dict):
+    """Delete `job`'s files AUTO_DELETE_SECONDS after it completed (`completed_at`, stamped
+    now on first call); a job restored past its window is deleted right away."""
+    completed_at = job.setdefault("completed_at", time.time())
+    delay = max(0.0, AUTO_DELETE_SECONDS - (time.time() - completed_at))
+    asyncio.create_task(_auto_delete_job(job["job_id"], delay_seconds=delay))
+
+
+async def _auto_delete_job(job_id: str, delay_seconds: float = AUTO_DELETE_SECONDS):
     await asyncio.sleep(delay_seconds)
     job = JOBS.get(job_id)
     if not job:
         return
-    # Delete files
+    # Delete files; the shared source and analysis go below once no other job uses them
+    shared = os.path.join(os.path.abspath(ANALYSIS.root), "")
     for p in job.get("paths", {}).values():
+        if p and os.path.abspath(p).startswith(shared):
+            continue
         try:
-            if os.path.exists(p):
+            if p and os.path.isdir(p):
+                shutil.rmtree(p)
+            elif os.path.exists(p):
                 os.remove(p)
         except Exception:
             pass
+    CONTENT_HASHES.forget(os.path.dirname(job["paths"]["output"]))
     # Try to remove directory
     try:
         job_dir = os.path.dirname(job["paths"]["output"])
@@ -1006,6 +2059,41 @@ async def _auto_delete_job(job_id: str, delay_seconds: int = 600):
             os.rmdir(job_dir)
     except Exception:
         pass
+    job["files_deleted"] = True
+    DB.save_job(job)
+    await _release_analysis()
+
+
+# A stored upload may wait this long for its job to be created; younger entries are never dropped
+ANALYSIS_UPLOAD_GRACE_SECONDS = 60
+
+
+async def _release_analysis():
+    """With AUTO_DELETE, drop cached sources and their analysis once no job whose files
+    are still kept references them, so uploads are not retained past the auto-delete window."""
+    if not AUTO_DELETE:
+        return
+    live = {j.get("analysis_key") for j in JOBS.values() if not j.get("files_deleted")}
+    await STAGES.run("io", ANALYSIS.drop_unreferenced, live - {None}, ANALYSIS_UPLOAD_GRACE_SECONDS)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {"translation_memory": TRANSLATION_MEMORY.stats(), "tts_clips": TTS_CACHE.stats(), "analysis": ANALYSIS.stats()}
+
+
+@app.get("/admin/models")
+async def admin_models():
+    """Resident models (load time, size, hits) and the registry's memory budget."""
+    resident = MODELS.stats()
+    return {
+        "budget_mb": round(MODELS.budget_bytes / (1024 * 1024), 1),
+        "resident_mb": round(sum(m["size_mb"] for m in resident), 1),
+        "models": resident,
+        "whisper_pool": {"workers": _WHISPER_POOL.workers, "size": _WHISPER_POOL.size, "started": _WHISPER_POOL.started}
+        if _WHISPER_POOL is not None else None,
+        "quality_tiers": {q: whisper_models.size_for_quality(q) for q in whisper_models.QUALITY_TIERS},
+    }
 
 
 @app.get("/jobs/{job_id}", response_model=JobStatusResponse)
@@ -1013,53 +2101,339 @@ async def job_status(job_id: str):
     job = JOBS.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    position = eta = None
+    if job["status"] == "queued":
+        position = JOB_QUEUE.position(job_id)
+        eta = JOB_QUEUE.eta_seconds(position) if position else None
     return JobStatusResponse(
-        job_id=job_id, status=job["status"], progress=job.get("progress", 0.0), message=job.get("message")
+        job_id=job_id, status=job["status"], progress=job.get("progress", 0.0), message=job.get("message"),
+        queue_position=position, eta_seconds=eta, metrics=job.get("metrics"),
+        preview_ready=bool(job.get("preview_ready")) or os.path.exists(job["paths"]["preview"]),
+        hls={"playlist": f"/hls/{job_id}/{hls.PLAYLIST_NAME}", **job["windows"]} if job.get("windows") else None,
+        # Keyframe index stays server-side; it is only needed for cutting
+        media={k: v for k, v in job["media"].items() if k != "keyframes"} if job.get("media") else None,
+        downloads=_versioned_urls(job) or None,
     )
 
 
-@app.get("/preview/{job_id}")
-async def preview(job_id: str):
+def _versioned_urls(job: dict) -> Dict[str, str]:
+    # Only digests already known; a status poll never hashes
+    urls = {}
+    for key, url in _SERVED_OUTPUTS.items():
+        path = job["paths"].get(key)
+        sha = CONTENT_HASHES.known(path) if path else None
+        if sha:
+            urls[key] = url.format(job["job_id"]) + f"?v={sha[:32]}"
+    return urls
+
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def _event_stream(request: Request, topic: str, snapshot: Callable[[], dict], snapshot_event: str,
+                  finished: Callable[[], bool]) -> StreamingResponse:
+    """Server-sent events for `topic`, opened with a `snapshot_event` carrying `snapshot()`.
+    The subscription is taken before the snapshot, so nothing in between is lost;
+    a "done" event closes the stream once `finished()` holds."""
+    sub = EVENTS.subscribe(topic)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n" + _sse(snapshot_event, await snapshot())
+            while not finished():
+                events = await sub.next(timeout=SSE_KEEPALIVE_SECONDS)
+                if await request.is_disconnected():
+                    break
+                if not events:
+                    yield ": keepalive\n\n"
+                for event_id, event, data in events:
+                    yield _sse(event, data, event_id)
+            else:
+                yield _sse("done", await snapshot())
+        finally:
+            sub.close()
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Push channel for GET /jobs/{id}: a "status" snapshot, then "status", "stage", "progress"
+    and "preview" events as they happen, and "done" when the job completes or fails."""
+    job = JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def snapshot():
+        return (await job_status(job_id)).model_dump()
+
+    return _event_stream(request, f"job:{job_id}", snapshot, "status",
+                         lambda: job.get("status") in TERMINAL_STATUSES)
+
+
+# Checkpointed stages of a whole-file job, in pipeline order
+STAGE_ORDER = ("transcript", "translation", "tts", "lipsync", "mux")
+
+
+@app.post("/jobs/{job_id}/retry")
+async def retry_job(job_id: str):
+    """Queue a failed or finished job again. Stages whose inputs and artifacts are
+    unchanged are reused from the job's manifest; work resumes at the first stale one."""
+    job = JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] in ("queued", "processing"):
+        raise HTTPException(status_code=409, detail=f"Job is already {job['status']}")
+    if job_id in _EDIT_LOCKS:
+        # A segment edit is rewriting the outputs and checkpoints a retry would resume from
+        raise HTTPException(status_code=409, detail="Job is being edited")
+    if not os.path.exists(job["paths"]["source"]):
+        raise HTTPException(status_code=410, detail="Source video is no longer stored")
+    manifest = StageManifest(os.path.dirname(job["paths"]["output"]))
+    if job.get("windows"):
+        order = [f"window:{i:05d}" for i in range(job["windows"]["total"])]
+    else:
+        order = [stage for stage in STAGE_ORDER if stage != "lipsync" or LIPSYNC_BACKEND == "wav2lip"]
+    _admit_or_429(1)
+    job["progress"] = 0.0
+    job["message"] = "Retry requested"
+    position = JOB_QUEUE.submit(job, priority=job.get("priority", 0), reserved=True)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "queue_position": position,
+        "resume_from": manifest.first_stale(order),
+        "stages": manifest.summary(),
+    }
+
+
+class SegmentEdit(BaseModel):
+    index: int
+    # New translated line, or a corrected source line that is translated again
+    text: Optional[str] = None
+    source_text: Optional[str] = None
+
+
+class SegmentPatch(BaseModel):
+    segments: List[SegmentEdit]
+
+
+# Per job: held (or awaited) while a segment edit runs; retry refuses while an entry exists
+_EDIT_LOCKS: Dict[str, list] = {}
+
+
+@app.patch("/jobs/{job_id}/segments")
+async def patch_segments(job_id: str, patch: SegmentPatch):
+    """Edit single lines of a finished job without re-running it.
+
+    Only the changed segments are synthesized again and spliced into the
+    existing TTS track; the output gets the new track by an audio-only remux
+    (video stream copied) and the subtitles are rewritten. The edited
+    transcript/translation become the job's checkpoints, so a later retry
+    keeps them. Lipsynced frames are not redone here; a retry does that.
+    """
+    job = JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job_dir = os.path.dirname(job["paths"]["output"])
+    async with _keyed_lock(_EDIT_LOCKS, job_id):
+        # Checked under the lock: an edit queued behind another sees the job as that one left it
+        manifest = StageManifest(job_dir)
+        translation_path, track = manifest.file("translation", "translation"), manifest.file("tts", "track")
+        if (job["status"] != "completed" or job.get("windows") or not manifest.file("transcript", "transcript")
+                or not (translation_path and track and os.path.exists(track))):
+            raise HTTPException(status_code=409, detail="Only finished whole-file jobs with segment timings can be edited")
+        started = time.perf_counter()
+        transcript = await STAGES.run("io", checkpoint.read_json, manifest.file("transcript", "transcript"))
+        translation = await STAGES.run("io", checkpoint.read_json, translation_path)
+        segs = [tuple(seg) for seg in translation.get("segments") or []]
+        src_segs = [tuple(seg) for seg in transcript.get("segments") or []]
+        if not segs or len(src_segs) != len(segs):
+            raise HTTPException(status_code=409, detail="Job has no per-segment translation to edit")
+        bad = [e.index for e in patch.segments if not 0 <= e.index < len(segs)]
+        if bad:
+            raise HTTPException(status_code=400, detail=f"Segment index out of range: {bad}")
+
+        # Corrected source lines are translated again unless a translation came with them
+        for e in patch.segments:
+            if e.source_text is not None:
+                st, en, _ = src_segs[e.index]
+                src_segs[e.index] = (st, en, e.source_text)
+        retranslate = [e for e in patch.segments if e.source_text is not None and e.text is None]
+        new_text = {e.index: e.text for e in patch.segments if e.text is not None}
+        if retranslate:
+            translations = await _translate_segments([e.source_text for e in retranslate], job["target_language"],
+                                                     src_lang=transcript.get("language"))
+            new_text.update({e.index: ttx or e.source_text for e, ttx in zip(retranslate, translations)})
+        changed = sorted(i for i, tx in new_text.items() if tx != segs[i][2])
+        for i in changed:
+            st, en, _ = segs[i]
+            segs[i] = (st, en, new_text[i])
+
+        if changed:
+            # The track and output are rewritten in place: until they are recorded again below,
+            # a retry (or an edit that fails half way) must not reuse them
+            await STAGES.run("io", manifest.invalidate, ("tts", "mux"))
+            voice = job["paths"].get("voice") or job["paths"].get("source_audio") or None
+            if HAS_XTTS and not voice and job.get("analysis_key"):
+                voice = job["paths"]["source_audio"] = await _speaker_reference(job["analysis_key"])
+            rendered = await _render_tts_segments([segs[i] for i in changed], job["target_language"], voice)
+            # The track is laid out in start order; map list positions to timeline positions
+            order = sorted(range(len(segs)), key=lambda i: segs[i][0])
+            position = {i: pos for pos, i in enumerate(order)}
+            ordered = [segs[i] for i in order]
+            replaced = {position[i]: samples for i, samples in zip(changed, rendered)}
+            try:
+                old, new = await STAGES.run("io", _splice_tts_track, track, ordered, replaced)
+            except (OSError, ValueError, KeyError):
+                # No usable placements (older job): lay out the whole track again
+                old = new = None
+                track = await _synthesize_tts([tx for (_, _, tx) in segs], job["target_language"], segments=segs,
+                                              voice_sample=voice, out_dir=job_dir)
+            await STAGES.run("encode", _remux_edited_output, job, track, old, new)
+            del old, new
+        await _write_segment_subtitles(job["paths"]["srt"], job["paths"]["vtt"], segs)
+
+        # The edits become the checkpoints a retry resumes from
+        source_id = job.get("analysis_key") or await STAGES.run("io", checkpoint.digest_file, job["paths"]["source"])
+        transcript_inputs = {"source": source_id, "whisper": job.get("whisper_model") or whisper_models.default_size()}
+        await STAGES.run("io", _checkpoint_json, manifest, "transcript", transcript_inputs, manifest.file("transcript", "transcript"),
+                         {**transcript, "segments": src_segs, "text": " ".join(tx for (_, _, tx) in src_segs)}, None)
+        lines = [tx for (_, _, tx) in segs]
+        translation_inputs = {"transcript": manifest.digest("transcript", "transcript"), "target": job["target_language"]}
+        await STAGES.run("io", _checkpoint_json, manifest, "translation", translation_inputs, translation_path,
+                         {"lines": lines, "segments": segs}, None)
+        if changed:
+            await STAGES.run("io", manifest.record, "tts", await _tts_stage_inputs(job, lines, segs, source_id), {"track": track})
+            lipsynced = bool(job["paths"].get("lipsync"))
+            await STAGES.run("io", manifest.record, "mux", _mux_stage_inputs(manifest, lipsynced, source_id),
+                             {"output": job["paths"]["output"]})
+        seconds = round(time.perf_counter() - started, 2)
+        job.setdefault("metrics", {})["last_edit_seconds"] = seconds
+        job["message"] = f"Edited {len(changed)} segment(s)"
+        await _register_outputs(job, manifest)
+        DB.save_job(job)
+    return {"job_id": job_id, "changed": changed, "seconds": seconds,
+            "segments": [{"index": i, "start": st, "end": en, "text": tx} for i, (st, en, tx) in enumerate(segs)]}
+
+
+def _remux_edited_output(job: dict, track: str, old=None, new=None):
+    """Swap the output's audio for the edited track and recut the preview. With the track's
+    `old` and `new` samples only the AAC frames around the changes are re-encoded; otherwise
+    the whole track is (the video stream is copied either way)."""
+    out = job["paths"]["output"]
+    tmp = out + ".part.mp4"
+    if old is None or not replace_audio_span(out, old, new, TTS_SAMPLE_RATE, tmp):
+        ffm.remux_audio(out, track, tmp)
+    os.replace(tmp, out)
+    if os.path.exists(job["paths"]["preview"]):
+        tmp = job["paths"]["preview"] + ".part.mp4"
+        ffm.cut_copy(out, tmp, start=0.0, duration=media_probe.keyframe_at_or_after(job.get("media"), PREVIEW_SECONDS))
+        os.replace(tmp, job["paths"]["preview"])
+
+
+@app.get("/groups/{group_id}")
+async def group_status(group_id: str):
+    """Status of the language jobs of one multi-language upload, and what the
+    shared analysis saved: completion time of the first job vs. the later ones."""
+    jobs = sorted((j for j in JOBS.values() if j.get("group_id") == group_id), key=lambda j: j.get("queued_at", 0))
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Group not found")
+    items = [{
+        "job_id": j["job_id"],
+        "target_language": j.get("target_language"),
+        "status": j["status"],
+        "progress": j.get("progress", 0.0),
+        "metrics": j.get("metrics"),
+    } for j in jobs]
+    # Work time (start to completion), independent of how long each job waited in the queue
+    work = [m["processing_seconds"] for m in (j.get("metrics") or {} for j in jobs if j["status"] == "completed")
+            if "processing_seconds" in m]
+    summary = None
+    if work:
+        first, rest = work[0], work[1:]
+        later = sum(rest) / len(rest) if rest else None
+        summary = {
+            "first_seconds": round(first, 2),
+            "later_mean_seconds": round(later, 2) if later is not None else None,
+            "nth_vs_first": round(later / first, 3) if later is not None and first > 0 else None,
+        }
+    return {"group_id": group_id, "jobs": items, "summary": summary}
+
+
+@app.api_route("/preview/{job_id}", methods=["GET", "HEAD"])
+async def preview(job_id: str, request: Request):
     job = JOBS.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     path = job["paths"]["preview"]
     if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="Preview not ready")
-    return FileResponse(path, media_type="video/mp4", filename="preview.mp4")
+    return await _serve(request, path, "video/mp4", filename="preview.mp4")
 
 
-@app.get("/download/{job_id}")
-async def download(job_id: str):
+@app.api_route("/download/{job_id}", methods=["GET", "HEAD"])
+async def download(job_id: str, request: Request):
     job = JOBS.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     path = job["paths"]["output"]
+    if not os.path.exists(path) and job.get("windows") and job.get("status") == "completed":
+        # Windowed renders are concatenated from their rendered MP4 window masters on first download
+        try:
+            await _concat_windows(job)
+        except Exception:
+            raise HTTPException(status_code=500, detail="Could not assemble the rendered windows")
     if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="File not ready")
-    return FileResponse(path, media_type="video/mp4", filename="translated.mp4")
+    return await _serve(request, path, "video/mp4", filename="translated.mp4")
+
 
+_HLS_NAME = re.compile(r"index\.m3u8|seg_\d{5}\.ts")
 
-@app.get("/subtitles/{job_id}.srt")
-async def download_srt(job_id: str):
+
+@app.api_route("/hls/{job_id}/{name}", methods=["GET", "HEAD"])
+async def hls_file(job_id: str, name: str, request: Request):
+    job = JOBS.get(job_id)
+    if not job or not job["paths"].get("hls"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not _HLS_NAME.fullmatch(name):
+        raise HTTPException(status_code=404, detail="Not found")
+    path = os.path.join(job["paths"]["hls"], name)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Segment not ready")
+    if name == hls.PLAYLIST_NAME:
+        # The playlist grows until #EXT-X-ENDLIST; segments never change once written
+        return await _serve(request, path, "application/vnd.apple.mpegurl", cache_control="no-cache")
+    return await _serve(request, path, "video/mp2t")
+
+
+@app.api_route("/subtitles/{job_id}.srt", methods=["GET", "HEAD"])
+async def download_srt(job_id: str, request: Request):
     job = JOBS.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     path = job["paths"]["srt"]
     if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="SRT not ready")
-    return FileResponse(path, media_type="text/plain", filename="subtitles.srt")
+    return await _serve(request, path, "text/plain; charset=utf-8", filename="subtitles.srt")
 
 
-@app.get("/subtitles/{job_id}.vtt")
-async def download_vtt(job_id: str):
+@app.api_route("/subtitles/{job_id}.vtt", methods=["GET", "HEAD"])
+async def download_vtt(job_id: str, request: Request):
     job = JOBS.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     path = job["paths"]["vtt"]
     if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="VTT not ready")
-    return FileResponse(path, media_type="text/vtt", filename="subtitles.vtt")
+    return await _serve(request, path, "text/vtt; charset=utf-8", filename="subtitles.vtt")
 
 
 @app.get("/dashboard/{user_id}")
@@ -1076,3 +2450,10 @@ async def dashboard(user_id: str):
         "total_time_sec": total_time,
         "history": items[-20:],
     }
+
+
+@app.get("/dashboard/{user_id}/events")
+async def dashboard_events(user_id: str, request: Request):
+    """A "dashboard" snapshot, then a "job" event on each status change of the user's jobs."""
+    uid = user_id or "guest"
+    return _event_stream(request, f"user:{uid}", lambda: dashboard(uid), "dashboard", lambda: False)
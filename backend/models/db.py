@@ -1,7 +1,12 @@
 # Placeholder for MongoDB or other DB integration.
-# For demo, main.py uses in-memory stores.
+# For demo, main.py uses in-memory stores; DB_BACKEND=sqlite persists jobs to disk.
 
-from typing import Any
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict
 
 class InMemoryDB:
     def __init__(self):
@@ -9,4 +14,74 @@ class InMemoryDB:
         self.jobs = {}
         self.history = {}
 
+    def open(self):
+        pass
+
+    def save_job(self, job: Dict[str, Any]):
+        self.jobs[job["job_id"]] = job
+
+    def delete_job(self, job_id: str):
+        self.jobs.pop(job_id, None)
+
+
+class SQLiteDB(InMemoryDB):
+    """InMemoryDB whose jobs are written through to a local SQLite file.
+
+    `jobs` stays a plain dict of job dicts (the shape main.py already uses);
+    `save_job` snapshots a job so queued and finished jobs survive a restart.
+    Nothing touches the disk until `open` (app startup, or the first write).
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._sqlite = None
+
+    def open(self):
+        """Create the file if needed and load the stored jobs; idempotent."""
+        with self._open_lock:
+            if self._sqlite is not None:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    " job_id TEXT PRIMARY KEY, user_id TEXT, status TEXT,"
+                    " priority INTEGER DEFAULT 0, data TEXT NOT NULL, updated_at REAL)"
+                )
+                rows = conn.execute("SELECT data FROM jobs").fetchall()
+            for (data,) in rows:
+                try:
+                    job = json.loads(data)
+                    self.jobs.setdefault(job["job_id"], job)
+                except Exception:
+                    continue
+            self._sqlite = conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._sqlite is None:
+            self.open()
+        return self._sqlite
+
+    def save_job(self, job: Dict[str, Any]):
+        super().save_job(job)
+        data = json.dumps(job, default=str)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, user_id, status, priority, data, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job["job_id"], job.get("user_id"), job.get("status"), int(job.get("priority", 0) or 0), data, time.time()),
+            )
+
+    def delete_job(self, job_id: str):
+        super().delete_job(job_id)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+
 DB = InMemoryDB()
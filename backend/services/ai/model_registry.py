@@ -0,0 +1,120 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+def estimate_model_bytes(model: Any) -> Optional[int]:
+    """Best-effort resident size of a torch-backed model (sum of parameter bytes)."""
+    candidates = [model, getattr(getattr(model, "synthesizer", None), "tts_model", None)]
+    for obj in candidates:
+        params = getattr(obj, "parameters", None)
+        if not callable(params):
+            continue
+        try:
+            return int(sum(p.numel() * p.element_size() for p in params()))
+        except Exception:
+            continue
+    return None
+
+
+class _Entry:
+    def __init__(self, model: Any, size_bytes: int, load_seconds: float):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.hits = 0
+        # Serializes inference on models that are not safe to call concurrently
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models with LRU eviction by memory budget.
+
+    Each key is loaded at most once even under concurrent requests; when the
+    approximate resident total exceeds the budget the least recently used
+    models (other than the one just requested) are dropped.
+    """
+
+    def __init__(self, budget_mb: Optional[float] = None):
+        if budget_mb is None:
+            budget_mb = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "6144"))
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+
+    def get(self, key: Hashable, loader: Callable[[], Any], size_bytes: Optional[int] = None) -> Any:
+        """Return the model for `key`, calling `loader()` on first use."""
+        return self.entry(key, loader, size_bytes).model
+
+    def entry(self, key: Hashable, loader: Callable[[], Any], size_bytes: Optional[int] = None) -> _Entry:
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                return entry
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    return entry
+            t0 = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - t0
+            size = estimate_model_bytes(model) or size_bytes or 0
+            entry = _Entry(model, size, load_seconds)
+            with self._lock:
+                self._entries[key] = entry
+                self._evict(keep=key)
+                self._load_locks.pop(key, None)
+            return entry
+
+    def _touch(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.hits += 1
+            entry.last_used = time.time()
+            self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self, keep: Hashable):
+        total = sum(e.size_bytes for e in self._entries.values())
+        for key in list(self._entries.keys()):
+            if total <= self.budget_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._entries.pop(key).size_bytes
+        gc.collect()
+
+    def evict(self, key: Hashable) -> bool:
+        with self._lock:
+            removed = self._entries.pop(key, None) is not None
+        if removed:
+            gc.collect()
+        return removed
+
+    def loaded(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "key": list(key) if isinstance(key, tuple) else key,
+                    "size_mb": round(e.size_bytes / (1024 * 1024), 1),
+                    "load_seconds": round(e.load_seconds, 2),
+                    "loaded_at": e.loaded_at,
+                    "last_used": e.last_used,
+                    "hits": e.hits,
+                }
+                for key, e in self._entries.items()
+            ]
+
+
+MODELS = ModelRegistry()
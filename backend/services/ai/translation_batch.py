@@ -0,0 +1,193 @@
+import asyncio
+import inspect
+import os
+from typing import Awaitable, Callable, List, Optional
+
+import httpx
+
+from services import lazy
+from services.pipeline.ratelimit import AsyncRateLimiter
+
+# Segments are packed one per line; anything that would break the line
+# structure is flattened first and every batch is re-split and count-checked.
+DELIMITER = "\n"
+BATCH_CHARS = int(os.getenv("TRANSLATE_BATCH_CHARS", "4000"))
+MYMEMORY_MAX_CHARS = 480
+CONCURRENCY = int(os.getenv("TRANSLATE_CONCURRENCY", "4"))
+PROVIDERS = [p.strip() for p in os.getenv("TRANSLATE_PROVIDERS", "google,mymemory,libre").split(",") if p.strip()]
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop = None
+_translator = None
+_limiter = AsyncRateLimiter(float(os.getenv("TRANSLATE_RATE_PER_SEC", "5")))
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide keep-alive client for the HTTP translation providers."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(20.0, connect=5.0),
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60),
+        )
+        _client_loop = loop
+    return _client
+
+
+def set_http_client(client: httpx.AsyncClient):
+    """Swap the shared client, e.g. for one bound to a local stub server transport."""
+    global _client, _client_loop
+    _client = client
+    _client_loop = asyncio.get_running_loop()
+
+
+async def close_http_client():
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def get_translator():
+    """Shared googletrans Translator (its own connection pool is reused across calls)."""
+    global _translator
+    if _translator is None:
+        _translator = lazy.load("googletrans").Translator()
+    return _translator
+
+
+async def maybe_await(value):
+    # googletrans is async from 4.0.1 on, sync in the older releases
+    return await value if inspect.isawaitable(value) else value
+
+
+def _norm(s: str) -> str:
+    return " ".join(s.strip().lower().split())
+
+
+def pack_batches(texts: List[str], max_chars: int = BATCH_CHARS) -> List[List[int]]:
+    """Group indices of `texts` into batches whose joined length stays under `max_chars`."""
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    size = 0
+    for idx, text in enumerate(texts):
+        n = len(text) + len(DELIMITER)
+        if cur and size + n > max_chars:
+            batches.append(cur)
+            cur, size = [], 0
+        cur.append(idx)
+        size += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def _split(joined: str, expected: int) -> Optional[List[str]]:
+    parts = [p.strip() for p in joined.strip().split(DELIMITER)]
+    return parts if len(parts) == expected else None
+
+
+async def _google(texts: List[str], src: Optional[str], dest: str) -> List[Optional[str]]:
+    async with _limiter:
+        res = await maybe_await(get_translator().translate(DELIMITER.join(texts), dest=dest, src=src or "auto"))
+    parts = _split(getattr(res, "text", "") or "", len(texts))
+    return parts if parts is not None else [None] * len(texts)
+
+
+async def _mymemory(texts: List[str], src: Optional[str], dest: str) -> List[Optional[str]]:
+    src = (src or "en").lower()
+    if src == "auto":
+        src = "en"
+    url = os.getenv("MYMEMORY_URL", "https://api.mymemory.translated.net").rstrip("/") + "/get"
+    out: List[Optional[str]] = [None] * len(texts)
+    # MyMemory caps q at ~500 bytes, so pack small groups only
+    for batch in pack_batches(texts, MYMEMORY_MAX_CHARS):
+        chunk = [texts[i] for i in batch]
+        async with _limiter:
+            r = await get_http_client().get(url, params={"q": DELIMITER.join(chunk), "langpair": f"{src}|{dest}"})
+        if r.status_code != 200:
+            continue
+        t = (r.json().get("responseData") or {}).get("translatedText")
+        if not isinstance(t, str) or "INVALID SOURCE LANGUAGE" in t.upper():
+            continue
+        parts = _split(t, len(chunk))
+        if parts is not None:
+            for i, p in zip(batch, parts):
+                out[i] = p
+    return out
+
+
+async def _libre(texts: List[str], src: Optional[str], dest: str) -> List[Optional[str]]:
+    base = os.getenv("LIBRETRANSLATE_URL", "https://libretranslate.de").rstrip("/")
+    payload = {"q": texts, "source": src or "auto", "target": dest, "format": "text"}
+    async with _limiter:
+        r = await get_http_client().post(f"{base}/translate", json=payload, headers={"Accept": "application/json"})
+    if r.status_code != 200:
+        return [None] * len(texts)
+    t = r.json().get("translatedText")
+    if isinstance(t, list) and len(t) == len(texts):
+        return [x if isinstance(x, str) else None for x in t]
+    return [None] * len(texts)
+
+
+_PROVIDERS = {"google": _google, "mymemory": _mymemory, "libre": _libre}
+
+
+async def _translate_pack(texts: List[str], src: Optional[str], dest: str) -> List[Optional[str]]:
+    """Run one pack through the provider chain; each provider only sees the lines still unresolved."""
+    out: List[Optional[str]] = [None] * len(texts)
+    for name in PROVIDERS:
+        todo = [i for i, t in enumerate(out) if t is None]
+        if not todo:
+            break
+        fn = _PROVIDERS.get(name)
+        if fn is None:
+            continue
+        try:
+            res = await fn([texts[i] for i in todo], src, dest)
+        except Exception:
+            continue
+        for i, t in zip(todo, res):
+            # A provider echoing the source counts as a miss, as in the single-text path
+            if t and t.strip() and _norm(t) != _norm(texts[i]):
+                out[i] = t.strip()
+    return out
+
+
+async def translate_batch(
+    texts: List[str],
+    dest: str,
+    src_lang: Optional[str] = None,
+    fallback: Optional[Callable[[str], Awaitable[Optional[str]]]] = None,
+) -> List[Optional[str]]:
+    """Translate many segments with as few provider requests as possible.
+
+    Segments are packed into newline-delimited batches that run concurrently
+    (bounded by TRANSLATE_CONCURRENCY and the shared rate limiter). Lines a
+    batch could not resolve go through `fallback` one at a time. Returns one
+    entry per input; None where nothing produced a translation.
+    """
+    flat = [" ".join((t or "").split()) for t in texts]
+    results: List[Optional[str]] = [None] * len(flat)
+    live = [i for i, t in enumerate(flat) if t]
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def run_pack(indices: List[int]):
+        async with sem:
+            res = await _translate_pack([flat[i] for i in indices], src_lang, dest)
+        for i, t in zip(indices, res):
+            results[i] = t
+
+    packs = pack_batches([flat[i] for i in live])
+    await asyncio.gather(*(run_pack([live[j] for j in pack]) for pack in packs))
+
+    if fallback is not None:
+        missing = [i for i in live if results[i] is None]
+
+        async def run_one(i: int):
+            async with sem:
+                results[i] = await fallback(texts[i])
+
+        await asyncio.gather(*(run_one(i) for i in missing))
+    return results
@@ -0,0 +1,341 @@
+import asyncio
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from services.ai.lipsync_interface import LipSyncInterface
+
+# (stage, fraction done) for the request being processed
+ProgressCallback = Callable[[str, float], None]
+
+MEL_STEP = 16
+IMG_SIZE = 96
+# Face boxes are cached per source video, so a re-run (new audio, same video) skips detection
+FACE_CACHE_SIZE = int(os.getenv("WAV2LIP_FACE_CACHE", "8"))
+
+
+class Wav2LipModel:
+    """Wav2Lip inference kept in memory: checkpoint and face detector load once.
+
+    Mirrors the reference `inference.py` (S3FD detection with box smoothing,
+    96x96 lower-half-masked crops, 16-step mel windows at 80/fps) but writes
+    the frames straight into an ffmpeg pipe and caches face boxes per video.
+    """
+
+    def __init__(self, repo: str, checkpoint: str, device: str = "cpu", batch_size: int = 64, face_batch_size: int = 8):
+        sys.path.insert(0, repo)
+        import torch
+        import face_detection
+        from models import Wav2Lip
+
+        self.torch = torch
+        self.device = device
+        self.batch_size = batch_size
+        self.face_batch_size = face_batch_size
+        state = torch.load(checkpoint, map_location=device)["state_dict"]
+        model = Wav2Lip()
+        model.load_state_dict({k.replace("module.", ""): v for k, v in state.items()})
+        self.model = model.to(device).eval()
+        self.detector = face_detection.FaceAlignment(face_detection.LandmarksType._2D, flip_input=False, device=device)
+        self._faces: "OrderedDict[tuple, object]" = OrderedDict()
+
+    def _face_boxes(self, video_path: str, frames, progress: ProgressCallback, faces_path: Optional[str] = None):
+        import numpy as np
+
+        st = os.stat(video_path)
+        key = (os.path.abspath(video_path), st.st_size, st.st_mtime)
+        if key in self._faces:
+            self._faces.move_to_end(key)
+            return self._faces[key]
+        if faces_path and os.path.exists(faces_path):
+            # Face track stored by an earlier job for this video (any target language)
+            boxes = np.load(faces_path)
+            if len(boxes) == len(frames):
+                self._remember(key, boxes)
+                return boxes
+        rects = []
+        for i in range(0, len(frames), self.face_batch_size):
+            rects.extend(self.detector.get_detections_for_batch(np.array(frames[i:i + self.face_batch_size])))
+            progress("face_detection", min(1.0, (i + self.face_batch_size) / len(frames)))
+        boxes = []
+        for rect, frame in zip(rects, frames):
+            if rect is None:
+                raise ValueError("Face not detected in every frame")
+            # Reference padding (0, 10, 0, 0): a little extra chin
+            boxes.append([max(0, rect[0]), max(0, rect[1]), min(frame.shape[1], rect[2]), min(frame.shape[0], rect[3] + 10)])
+        boxes = np.array(boxes, dtype=np.float64)
+        # Temporal smoothing over 5 frames, as in the reference
+        smooth = np.array([boxes[max(0, min(i, len(boxes) - 5)):][:5].mean(axis=0) for i in range(len(boxes))])
+        boxes = smooth.astype(int)
+        if faces_path:
+            tmp = faces_path + ".part.npy"
+            np.save(tmp, boxes)
+            os.replace(tmp, faces_path)
+        self._remember(key, boxes)
+        return boxes
+
+    def _remember(self, key: tuple, boxes):
+        self._faces[key] = boxes
+        while len(self._faces) > FACE_CACHE_SIZE:
+            self._faces.popitem(last=False)
+
+    def run(self, video_path: str, audio_path: str, out_path: str, progress: ProgressCallback,
+            faces_path: Optional[str] = None):
+        import cv2
+        import numpy as np
+        import audio as w2l_audio  # from the Wav2Lip repo
+
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        frames = []
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame)
+        cap.release()
+        if not frames:
+            raise ValueError("No frames in source video")
+        progress("decode", 1.0)
+        boxes = self._face_boxes(video_path, frames, progress, faces_path)
+
+        mel = w2l_audio.melspectrogram(w2l_audio.load_wav(audio_path, 16000))
+        step = 80.0 / fps
+        chunks = []
+        while True:
+            start = int(len(chunks) * step)
+            if start + MEL_STEP > mel.shape[1]:
+                chunks.append(mel[:, mel.shape[1] - MEL_STEP:])
+                break
+            chunks.append(mel[:, start:start + MEL_STEP])
+
+        h, w = frames[0].shape[:2]
+        writer = _open_writer(out_path, audio_path, w, h, fps)
+        try:
+            for b in range(0, len(chunks), self.batch_size):
+                idx = [i % len(frames) for i in range(b, min(b + self.batch_size, len(chunks)))]
+                faces = np.asarray([cv2.resize(frames[i][y1:y2, x1:x2], (IMG_SIZE, IMG_SIZE))
+                                    for i in idx for (x1, y1, x2, y2) in [boxes[i]]])
+                masked = faces.copy()
+                masked[:, IMG_SIZE // 2:] = 0
+                img = np.concatenate((masked, faces), axis=3).transpose(0, 3, 1, 2) / 255.0
+                mels = np.asarray(chunks[b:b + len(idx)])[:, None]
+                with self.torch.no_grad():
+                    pred = self.model(self.torch.FloatTensor(mels).to(self.device),
+                                      self.torch.FloatTensor(img).to(self.device))
+                pred = (pred.cpu().numpy().transpose(0, 2, 3, 1) * 255.0).astype(np.uint8)
+                for p, i in zip(pred, idx):
+                    x1, y1, x2, y2 = boxes[i]
+                    frame = frames[i].copy()
+                    frame[y1:y2, x1:x2] = cv2.resize(p, (x2 - x1, y2 - y1))
+                    writer.stdin.write(frame.tobytes())
+                progress("inference", min(1.0, (b + len(idx)) / len(chunks)))
+        finally:
+            _close_writer(writer)
+
+
+class StubModel:
+    """Stand-in with the real model's interface: no weights, the video passes
+    through unchanged with the new audio. For tests and CPU-only smoke runs."""
+
+    def run(self, video_path: str, audio_path: str, out_path: str, progress: ProgressCallback,
+            faces_path: Optional[str] = None):
+        from services.media import ffmpeg as ffm
+        progress("inference", 0.0)
+        ffm.remux_audio(video_path, audio_path, out_path)
+        progress("inference", 1.0)
+
+
+def _open_writer(out_path: str, audio_path: str, width: int, height: int, fps: float) -> subprocess.Popen:
+    from services.media.ffmpeg import ffmpeg_exe
+    # Near-lossless intermediate with a keyframe every second: the final mux
+    # re-encodes it anyway, in parallel chunks cut at those keyframes
+    return subprocess.Popen(
+        [ffmpeg_exe(), "-hide_banner", "-nostdin", "-loglevel", "error", "-y",
+         "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", f"{fps:.3f}", "-i", "pipe:0",
+         "-i", audio_path, "-map", "0:v", "-map", "1:a", "-shortest",
+         "-c:v", "libx264", "-preset", "ultrafast", "-crf", "16", "-g", str(max(1, round(fps))), "-pix_fmt", "yuv420p",
+         "-c:a", "aac", out_path],
+        stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+
+
+def _close_writer(proc: subprocess.Popen):
+    proc.stdin.close()
+    err = proc.stderr.read()
+    proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {err.decode('utf-8', 'replace')[-500:]}")
+
+
+def _worker_main(requests, events, backend: str, repo: Optional[str], checkpoint: Optional[str], device: str):
+    """Worker process: load the model once, then serve requests until a None arrives."""
+    try:
+        model = StubModel() if backend == "stub" else Wav2LipModel(repo, checkpoint, device)
+    except Exception as e:
+        events.put({"type": "failed", "error": f"{type(e).__name__}: {e}"})
+        return
+    events.put({"type": "ready"})
+    while True:
+        req = requests.get()
+        if req is None:
+            return
+        rid = req["id"]
+        try:
+            model.run(req["video"], req["audio"], req["out"],
+                      lambda stage, frac: events.put({"type": "progress", "id": rid, "stage": stage, "fraction": round(frac, 3)}),
+                      faces_path=req.get("faces"))
+            events.put({"type": "done", "id": rid, "out": req["out"]})
+        except Exception as e:
+            events.put({"type": "error", "id": rid, "error": f"{type(e).__name__}: {e}"})
+
+
+class Wav2LipWorker(LipSyncInterface):
+    """LipSyncInterface backed by one long-lived worker process.
+
+    Requests go over a multiprocessing queue and are served one at a time by
+    a process that loaded the checkpoint and face detector once; progress
+    events come back on a second queue and are routed to the caller's
+    callback on its event loop. A worker that dies is restarted on the next
+    request, failing whatever it had in flight.
+    """
+
+    def __init__(self, backend: str = "wav2lip", repo: Optional[str] = None, checkpoint: Optional[str] = None,
+                 device: str = "cpu"):
+        self.backend = backend
+        self.repo = repo
+        self.checkpoint = checkpoint
+        self.device = device
+        self._ctx = mp.get_context("spawn")
+        self._proc = None
+        self._requests = None
+        self._events = None
+        self._listener: Optional[threading.Thread] = None
+        self._pending: Dict[int, tuple] = {}  # id -> (generation, loop, future, progress)
+        self._ids = itertools.count()
+        self._generation = 0  # bumped per worker process; a dead one only fails its own requests
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.error: Optional[str] = None
+        self.completed = 0
+
+    # -- lifecycle -------------------------------------------------------------
+
+    def start(self):
+        with self._lock:
+            if self._proc is not None and self._proc.is_alive():
+                return
+            self._generation += 1
+            self._ready.clear()
+            self.error = None
+            self._requests = self._ctx.Queue()
+            self._events = self._ctx.Queue()
+            self._proc = self._ctx.Process(
+                target=_worker_main, name="wav2lip-worker", daemon=True,
+                args=(self._requests, self._events, self.backend, self.repo, self.checkpoint, self.device),
+            )
+            self._proc.start()
+            self._listener = threading.Thread(target=self._listen, args=(self._proc, self._events, self._generation),
+                                              name="wav2lip-events", daemon=True)
+            self._listener.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the model is loaded (True) or loading failed / timed out (False)."""
+        self.start()
+        self._ready.wait(timeout)
+        return self._ready.is_set() and self.error is None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and self.error is None and self._proc is not None and self._proc.is_alive()
+
+    def shutdown(self):
+        with self._lock:
+            if self._proc is not None:
+                if self._proc.is_alive():
+                    self._requests.put(None)
+                    self._proc.join(timeout=5)
+                    if self._proc.is_alive():
+                        self._proc.terminate()
+                self._proc = None
+            self._fail_pending("lipsync worker shut down")
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "alive": self._proc is not None and self._proc.is_alive(),
+            "ready": self.ready,
+            "error": self.error,
+            "pending": len(self._pending),
+            "completed": self.completed,
+        }
+
+    # -- requests ----------------------------------------------------------------
+
+    async def apply(self, video_path: str, audio_path: str, out_path: str,
+                    progress: Optional[ProgressCallback] = None, faces_path: Optional[str] = None) -> str:
+        """Lipsync on the worker. `faces_path` (a .npy) persists the face track across jobs and restarts."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        rid = next(self._ids)
+        self.start()
+        with self._lock:
+            self._pending[rid] = (self._generation, loop, fut, progress)
+            requests = self._requests
+        requests.put({"id": rid, "video": video_path, "audio": audio_path, "out": out_path, "faces": faces_path})
+        try:
+            return await fut
+        finally:
+            self._pending.pop(rid, None)
+
+    def _listen(self, proc, events, generation: int):
+        while True:
+            try:
+                ev = events.get(timeout=0.5)
+            except (EOFError, OSError):
+                return  # queue torn down at interpreter exit
+            except queue.Empty:
+                if not proc.is_alive():
+                    if not self._ready.is_set():
+                        self.error = self.error or f"lipsync worker exited with code {proc.exitcode}"
+                        self._ready.set()
+                    self._fail_pending(f"lipsync worker exited with code {proc.exitcode}", generation)
+                    return
+                continue
+            kind = ev["type"]
+            if kind in ("ready", "failed"):
+                self.error = ev.get("error")
+                self._ready.set()
+                continue
+            entry = self._pending.get(ev.get("id"))
+            if entry is None:
+                continue
+            _, loop, fut, progress = entry
+            if kind == "progress":
+                if progress is not None:
+                    loop.call_soon_threadsafe(progress, ev["stage"], ev["fraction"])
+            elif kind == "done":
+                self.completed += 1
+                loop.call_soon_threadsafe(_resolve, fut, ev["out"], None)
+            elif kind == "error":
+                loop.call_soon_threadsafe(_resolve, fut, None, RuntimeError(ev["error"]))
+
+    def _fail_pending(self, reason: str, generation: Optional[int] = None):
+        for gen, loop, fut, _ in list(self._pending.values()):
+            if generation is None or gen == generation:
+                loop.call_soon_threadsafe(_resolve, fut, None, RuntimeError(reason))
+
+
+def _resolve(fut: asyncio.Future, result, error: Optional[Exception]):
+    if fut.done():
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
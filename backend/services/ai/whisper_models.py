@@ -0,0 +1,54 @@
+import os
+from typing import Optional, Tuple
+
+from services import lazy
+from services.ai.model_registry import MODELS
+
+# Approximate resident MB of the float16 CTranslate2 conversions; int8 is about half
+_SIZE_MB = {"tiny": 75, "base": 145, "small": 485, "medium": 1530, "large": 3090}
+_DTYPE_SCALE = {"int8": 0.5, "int8_float16": 0.5, "int8_float32": 0.5, "float16": 1.0, "float32": 2.0}
+
+# Per-job quality tiers accepted on /upload
+QUALITY_TIERS = ("preview", "standard", "high")
+
+
+def default_size() -> str:
+    return os.getenv("WHISPER_MODEL_SIZE", "tiny").strip()  # tiny, base, small, medium, large
+
+
+def size_for_quality(quality: Optional[str]) -> str:
+    """Model size for a quality tier; `standard` (and anything unknown) uses WHISPER_MODEL_SIZE."""
+    if quality == "preview":
+        return os.getenv("WHISPER_MODEL_PREVIEW", "tiny").strip()
+    if quality == "high":
+        return os.getenv("WHISPER_MODEL_HIGH", "small").strip()
+    return default_size()
+
+
+def model_key(size: Optional[str] = None, compute_type: Optional[str] = None,
+              cpu_threads: Optional[int] = None) -> Tuple[str, str, str, int]:
+    return (
+        "whisper",
+        size or default_size(),
+        compute_type or os.getenv("WHISPER_COMPUTE_TYPE", "int8"),
+        int(cpu_threads if cpu_threads is not None else os.getenv("WHISPER_CPU_THREADS", "0")),
+    )
+
+
+def approx_bytes(size: str, compute_type: str) -> int:
+    base = next((mb for name, mb in _SIZE_MB.items() if size.startswith(name)), 500)
+    return int(base * _DTYPE_SCALE.get(compute_type, 1.0) * 1024 * 1024)
+
+
+def load_model(size: Optional[str] = None, compute_type: Optional[str] = None, cpu_threads: Optional[int] = None):
+    """Return the shared WhisperModel for (size, compute_type, cpu_threads), loading it on first use."""
+    WhisperModel = lazy.load("faster_whisper").WhisperModel
+
+    key = model_key(size, compute_type, cpu_threads)
+    _, size, compute_type, cpu_threads = key
+    # CTranslate2 weights are not torch parameters, so the registry gets the size up front
+    return MODELS.entry(
+        key,
+        lambda: WhisperModel(size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads),
+        size_bytes=approx_bytes(size, compute_type),
+    )
@@ -0,0 +1,129 @@
+import multiprocessing as mp
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = float(os.getenv("WHISPER_CHUNK_SECONDS", "30"))
+# Speech regions are padded so words at a cut are not clipped
+PAD_SECONDS = 0.2
+
+# Per-worker-process model, created by the pool initializer
+_MODEL = None
+
+
+def plan_chunks(audio: np.ndarray, max_chunk_s: float = CHUNK_SECONDS, sr: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """Split `audio` into speech-only (start, end) sample ranges of at most ~`max_chunk_s`.
+
+    Silero VAD (bundled with faster-whisper) finds the speech regions; nearby
+    regions are merged until a chunk would exceed the limit, so cuts land in
+    pauses and silent stretches are never decoded.
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    regions = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500, max_speech_duration_s=max_chunk_s))
+    pad = int(PAD_SECONDS * sr)
+    limit = int(max_chunk_s * sr)
+    chunks: List[Tuple[int, int]] = []
+    for r in regions:
+        st, en = max(0, r["start"] - pad), min(len(audio), r["end"] + pad)
+        if chunks and en - chunks[-1][0] <= limit:
+            chunks[-1] = (chunks[-1][0], max(chunks[-1][1], en))
+        else:
+            chunks.append((st, en))
+    return chunks
+
+
+def _init_worker(size: str, compute_type: str, cpu_threads: int):
+    global _MODEL
+    from faster_whisper import WhisperModel
+    _MODEL = WhisperModel(size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(audio: np.ndarray, offset: float) -> Tuple[List[tuple], Optional[str], float]:
+    segments, info = _MODEL.transcribe(audio, beam_size=1, vad_filter=False)
+    out = []
+    for seg in segments:
+        tx = (seg.text or "").strip()
+        if tx:
+            out.append((offset + float(seg.start), offset + float(seg.end), tx))
+    return out, getattr(info, "language", None), len(audio) / SAMPLE_RATE
+
+
+class ParallelTranscriber:
+    """faster-whisper over a pool of worker processes, one int8 model each.
+
+    Each worker gets `cpu_count // workers` CTranslate2 threads so the pool
+    as a whole uses the machine once, without oversubscription. Audio is
+    VAD-split into chunks (`plan_chunks`), chunks are decoded in parallel
+    and segments come back with global timestamps.
+    """
+
+    def __init__(self, workers: int, size: str = "tiny", compute_type: str = "int8", cpu_threads: Optional[int] = None):
+        self.workers = max(1, workers)
+        self.size = size
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Set once every worker has its model loaded
+        self.warmed = False
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a threaded server (and a loaded CTranslate2) is not safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=mp.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.size, self.compute_type, self.cpu_threads),
+                )
+            return self._pool
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    def warm(self):
+        """Start every worker now so the model loads happen before the first job."""
+        pool = self._get_pool()
+        list(pool.map(_noop, range(self.workers)))
+        self.warmed = True
+
+    def transcribe(self, audio: np.ndarray) -> Optional[Tuple[str, List[tuple], Optional[str]]]:
+        """(full_text, [(start, end, text)], language) for 16 kHz mono `audio`; None if nothing was said."""
+        chunks = plan_chunks(audio)
+        if not chunks:
+            return None
+        pool = self._get_pool()
+        futures = [pool.submit(_transcribe_chunk, audio[st:en], st / SAMPLE_RATE) for st, en in chunks]
+        segs: List[tuple] = []
+        votes: Dict[str, float] = defaultdict(float)
+        for fut in futures:
+            chunk_segs, lang, seconds = fut.result()
+            segs.extend(chunk_segs)
+            if lang:
+                votes[lang] += seconds
+        segs.sort(key=lambda s: s[0])
+        text = " ".join(s[2] for s in segs).strip()
+        if not text:
+            return None
+        # Chunks detect their language independently; the one covering most speech wins
+        lang = max(votes, key=votes.get) if votes else None
+        return text, segs, lang[:2] if lang else None
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                self.warmed = False
+
+
+def _noop(_):
+    return _MODEL is not None
@@ -0,0 +1,81 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from services import lazy
+from services.ai.model_registry import MODELS
+from services.pipeline.checkpoint import digest_file
+
+DEFAULT_XTTS_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+# Rough resident size used when parameter counting is unavailable
+_XTTS_FALLBACK_BYTES = 2 * 1024 ** 3
+
+_latents: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+_latents_lock = threading.Lock()
+_LATENT_CACHE_SIZE = int(os.getenv("XTTS_LATENT_CACHE_SIZE", "32"))
+_hash_memo: Dict[Tuple[str, int, float], str] = {}
+
+
+def model_name() -> str:
+    return os.getenv("XTTS_MODEL", DEFAULT_XTTS_MODEL)
+
+
+def file_sha256(path: str) -> str:
+    """Content hash of a file, memoized on (path, size, mtime)."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime)
+    digest = _hash_memo.get(memo_key)
+    if digest is None:
+        digest = _hash_memo[memo_key] = digest_file(path)
+    return digest
+
+
+def load_model(name: Optional[str] = None):
+    """Return the shared XTTS model, loading it into the registry on first use."""
+    CoquiTTS = lazy.load("TTS.api").TTS
+
+    name = name or model_name()
+    return MODELS.entry(("xtts", name), lambda: CoquiTTS(name), size_bytes=_XTTS_FALLBACK_BYTES)
+
+
+def speaker_latents(inner_model, name: str, speaker_wav: str):
+    """(gpt_cond_latent, speaker_embedding) for a voice sample, cached by content hash."""
+    key = (name, file_sha256(speaker_wav))
+    with _latents_lock:
+        cached = _latents.get(key)
+        if cached is not None:
+            _latents.move_to_end(key)
+            return cached
+    latents = inner_model.get_conditioning_latents(audio_path=[speaker_wav])
+    with _latents_lock:
+        _latents[key] = latents
+        while len(_latents) > _LATENT_CACHE_SIZE:
+            _latents.popitem(last=False)
+    return latents
+
+
+def synthesize_to_file(text: str, language: str, speaker_wav: str, out_path: str, name: Optional[str] = None) -> str:
+    """Render `text` in the cloned voice to a WAV at `out_path`.
+
+    Uses the low-level XTTS inference API with cached speaker latents when the
+    installed TTS version exposes it; otherwise falls back to tts_to_file.
+    """
+    name = name or model_name()
+    entry = load_model(name)
+    tts = entry.model
+    synth = getattr(tts, "synthesizer", None)
+    inner = getattr(synth, "tts_model", None)
+    if inner is not None and hasattr(inner, "get_conditioning_latents") and hasattr(inner, "inference"):
+        import numpy as np
+        import soundfile as sf
+
+        with entry.lock:
+            gpt_cond_latent, speaker_embedding = speaker_latents(inner, name, speaker_wav)
+            out = inner.inference(text, language.lower(), gpt_cond_latent, speaker_embedding)
+        sr = getattr(synth, "output_sample_rate", None) or 24000
+        sf.write(out_path, np.asarray(out["wav"], dtype=np.float32), sr)
+        return out_path
+    with entry.lock:
+        tts.tts_to_file(text=text, file_path=out_path, speaker_wav=speaker_wav, language=language)
+    return out_path
@@ -0,0 +1 @@
+# In-memory audio processing (timeline assembly, time-scale modification).
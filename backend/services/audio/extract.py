@@ -0,0 +1,112 @@
+import os
+import subprocess
+from typing import Optional
+
+import numpy as np
+
+from services.media.ffmpeg import ffmpeg_exe
+
+SAMPLE_RATE = 16000
+# Sources longer than this decode into a disk-backed memmap instead of RAM
+MEMMAP_SECONDS = float(os.getenv("EXTRACT_MEMMAP_SECONDS", "1800"))
+_READ_BYTES = 1 << 20
+
+
+def stream_pcm(path: str, sr: int = SAMPLE_RATE, expected_seconds: Optional[float] = None,
+               memmap_path: Optional[str] = None, start: float = 0.0, duration: Optional[float] = None) -> np.ndarray:
+    """Decode the audio of `path` to mono float32 at `sr`, straight from an ffmpeg pipe.
+
+    With `expected_seconds` (from the media probe) the buffer is allocated
+    once and ffmpeg's output is read into it in place; with `memmap_path`
+    that buffer is a file-backed memmap so long sources stay out of RAM.
+    No intermediate WAV is written either way. `start`/`duration` decode a
+    single window only (ffmpeg seeks; nothing before it is decoded).
+    """
+    capacity = int(((expected_seconds or 60.0) + 1.0) * sr)
+    if memmap_path:
+        buf = np.memmap(memmap_path, dtype=np.float32, mode="w+", shape=(capacity,))
+    else:
+        buf = np.empty(capacity, dtype=np.float32)
+    window = (["-ss", f"{start:.3f}"] if start > 0 else []) + ["-i", path]
+    if duration is not None:
+        window += ["-t", f"{duration:.3f}"]
+    proc = subprocess.Popen(
+        [ffmpeg_exe(), "-hide_banner", "-nostdin", "-loglevel", "error", *window,
+         "-vn", "-ac", "1", "-ar", str(sr), "-f", "f32le", "pipe:1"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    filled = 0  # bytes
+    try:
+        while True:
+            if filled + _READ_BYTES > buf.nbytes:
+                buf = _grow(buf, memmap_path, max(buf.size * 2, (filled + _READ_BYTES) // 4))
+            view = memoryview(buf).cast("B")[filled:filled + _READ_BYTES]
+            n = proc.stdout.readinto(view)
+            if not n:
+                break
+            filled += n
+        err = proc.stderr.read()
+    finally:
+        proc.stdout.close()
+        proc.stderr.close()
+        proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg decode failed ({proc.returncode}): {err.decode('utf-8', 'replace')[-500:]}")
+    return buf[:filled // 4]
+
+
+def _grow(buf: np.ndarray, memmap_path: Optional[str], size: int) -> np.ndarray:
+    if memmap_path:
+        buf.flush()
+        return np.memmap(memmap_path, dtype=np.float32, mode="r+", shape=(size,))
+    grown = np.empty(size, dtype=np.float32)
+    grown[:buf.size] = buf
+    return grown
+
+
+class ExtractedAudio:
+    """A source's speech-rate PCM, decoded once and kept as an array.
+
+    faster-whisper reads `samples` directly. Consumers that insist on a file
+    (OpenAI upload, XTTS speaker reference) call `wav_path()`, which writes a
+    16-bit WAV into `work_dir` the first time only.
+    """
+
+    def __init__(self, samples: np.ndarray, work_dir: str, sr: int = SAMPLE_RATE, memmap_path: Optional[str] = None):
+        self.samples = samples
+        self.sr = sr
+        self.work_dir = work_dir
+        self.memmap_path = memmap_path
+        self._wav: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sr
+
+    def wav_path(self) -> str:
+        if self._wav is None:
+            import soundfile as sf
+            path = os.path.join(self.work_dir, "source_audio.wav")
+            sf.write(path, np.asarray(self.samples), self.sr, subtype="PCM_16")
+            self._wav = path
+        return self._wav
+
+    def release(self):
+        """Drop the buffer (and its memmap file); a written WAV is left to the caller."""
+        self.samples = np.zeros(0, dtype=np.float32)
+        if self.memmap_path and os.path.exists(self.memmap_path):
+            os.remove(self.memmap_path)
+
+
+def extract_window(path: str, start: float, duration: float) -> np.ndarray:
+    """Speech-rate samples of [start, start + duration) only; memory scales with the window."""
+    return stream_pcm(path, SAMPLE_RATE, duration, start=start, duration=duration)
+
+
+def extract(path: str, work_dir: str, expected_seconds: Optional[float] = None) -> ExtractedAudio:
+    """Decode `path` for transcription, memory-mapping sources longer than EXTRACT_MEMMAP_SECONDS."""
+    memmap_path = None
+    if expected_seconds and expected_seconds > MEMMAP_SECONDS:
+        memmap_path = os.path.join(work_dir, "source_audio.f32")
+    samples = stream_pcm(path, SAMPLE_RATE, expected_seconds, memmap_path)
+    return ExtractedAudio(samples, work_dir, SAMPLE_RATE, memmap_path)
@@ -0,0 +1,122 @@
+import os
+import subprocess
+from typing import Callable, Dict, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from services.media.ffmpeg import ffmpeg_exe
+
+# rate > 1 speeds up (shorter output), rate < 1 slows down, as in librosa.
+MIN_RATE, MAX_RATE = 0.33, 3.0
+_DECIMATE = 4
+
+
+def wsola(y: np.ndarray, sr: int, rate: float, frame_ms: float = 40.0, search_ms: float = 10.0) -> np.ndarray:
+    """Waveform-similarity overlap-add time stretch.
+
+    Frames of `frame_ms` are overlap-added at a fixed half-frame synthesis hop
+    while the analysis position advances `rate` times faster. Each frame is
+    shifted by up to `search_ms` to the offset whose samples best continue the
+    previous frame. The search runs coarse-to-fine: all lags are scored on a
+    4x decimated copy with one real FFT product, then the best lag is refined
+    at full rate with a small matrix-vector product over a strided view, so
+    the Python loop runs once per output frame (~50 per second of audio).
+    """
+    y = np.asarray(y, dtype=np.float32).reshape(-1)
+    n = max(16, int(sr * frame_ms / 1000) // 2 * 2)
+    hs = n // 2
+    ha = hs * rate
+    tol = max(1, int(sr * search_ms / 1000))
+    out_len = int(round(len(y) / rate))
+    if len(y) < n or out_len < n:
+        return _resample_length(y, out_len)
+
+    pad = n + tol
+    ypad = np.concatenate([np.zeros(pad, np.float32), y, np.zeros(pad + n + int(ha) + hs, np.float32)])
+    # Periodic Hann: at 50% overlap the windows sum to exactly one
+    win = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / n)).astype(np.float32)
+    n_frames = out_len // hs + 1
+    out = np.zeros(n_frames * hs + n, dtype=np.float32)
+
+    d = _DECIMATE
+    # Box-filtered before decimation so the coarse search is not fooled by aliasing
+    ydec = np.convolve(ypad, np.full(d, 1.0 / d, np.float32), mode="same")[::d]
+    nd, told = n // d, max(1, tol // d)
+    nfft = 1 << (2 * told + 2 * nd).bit_length()
+
+    pos = pad
+    out[:n] += ypad[pos:pos + n] * win
+    for k in range(1, n_frames):
+        nominal = pad + int(k * ha)
+        # Coarse: scores[lag] = dot(region[lag:lag + nd], template) for every decimated lag
+        t0 = (pos + hs) // d
+        r0 = (nominal - tol) // d
+        spec = np.fft.rfft(ydec[r0:r0 + 2 * told + nd], nfft) * np.conj(np.fft.rfft(ydec[t0:t0 + nd], nfft))
+        coarse = r0 * d + int(np.argmax(np.fft.irfft(spec, nfft)[:2 * told + 1])) * d
+        # Fine: full-rate lags within one decimation step of the coarse pick
+        lo = min(max(coarse - d, nominal - tol), nominal + tol)
+        cand = sliding_window_view(ypad[lo:lo + 2 * d + n], n)
+        pos = lo + int(np.argmax(cand @ ypad[pos + hs:pos + hs + n]))
+        out[k * hs:k * hs + n] += ypad[pos:pos + n] * win
+    return out[:out_len]
+
+
+def _resample_length(y: np.ndarray, length: int) -> np.ndarray:
+    # Clips shorter than one frame: plain linear resampling is inaudible at that size
+    if length <= 0 or len(y) == 0:
+        return np.zeros(max(length, 0), dtype=np.float32)
+    return np.interp(np.linspace(0, len(y) - 1, length), np.arange(len(y)), y).astype(np.float32)
+
+
+def atempo(y: np.ndarray, sr: int, rate: float) -> np.ndarray:
+    """ffmpeg `atempo` filter over a raw PCM pipe (chained to stay within 0.5-2.0 per stage)."""
+    factors = []
+    r = rate
+    while r > 2.0:
+        factors.append(2.0)
+        r /= 2.0
+    while r < 0.5:
+        factors.append(0.5)
+        r /= 0.5
+    factors.append(r)
+    chain = ",".join(f"atempo={f:.6f}" for f in factors)
+    proc = subprocess.run(
+        [ffmpeg_exe(), "-hide_banner", "-nostdin", "-loglevel", "error",
+         "-f", "f32le", "-ar", str(sr), "-ac", "1", "-i", "pipe:0",
+         "-af", chain, "-f", "f32le", "-ar", str(sr), "-ac", "1", "pipe:1"],
+        input=np.asarray(y, dtype=np.float32).tobytes(), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode("utf-8", "replace")[-500:])
+    return np.frombuffer(proc.stdout, dtype=np.float32)
+
+
+def phase_vocoder(y: np.ndarray, sr: int, rate: float) -> np.ndarray:
+    """librosa's phase-vocoder stretch (previous default; slowest, kept for comparison)."""
+    import librosa
+    return librosa.effects.time_stretch(np.asarray(y, dtype=np.float32), rate=rate)
+
+
+ENGINES: Dict[str, Callable[[np.ndarray, int, float], np.ndarray]] = {
+    "wsola": wsola,
+    "atempo": atempo,
+    "librosa": phase_vocoder,
+}
+
+
+def stretch_to_duration(y: np.ndarray, sr: int, target_dur: float, engine: Optional[str] = None,
+                        tolerance: Optional[float] = None) -> np.ndarray:
+    """Time-scale `y` so it lasts about `target_dur` seconds.
+
+    Clips already within `tolerance` (relative) of the target are returned
+    untouched; the rate is clamped to [MIN_RATE, MAX_RATE].
+    """
+    engine = engine or os.getenv("TIME_STRETCH_ENGINE", "wsola").lower()
+    if tolerance is None:
+        tolerance = float(os.getenv("STRETCH_TOLERANCE", "0.05"))
+    cur = max(len(y) / sr, 0.001)
+    rate = max(min(cur / max(target_dur, 0.001), MAX_RATE), MIN_RATE)
+    if abs(rate - 1.0) <= tolerance:
+        return y
+    return ENGINES.get(engine, wsola)(y, sr, rate)
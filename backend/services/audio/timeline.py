@@ -0,0 +1,58 @@
+import math
+import os
+import subprocess
+from typing import List, Tuple
+
+import numpy as np
+
+from services.media.ffmpeg import ffmpeg_exe
+
+
+class AudioTimeline:
+    """Mono float32 track that segments are placed into at their real start times.
+
+    The buffer is preallocated for the expected duration and grows only if a
+    segment runs past the end. A segment that would overlap the previous one
+    is pushed back to start where the previous one ends, so speech never
+    overlaps and gaps between segments are kept as silence.
+    """
+
+    def __init__(self, duration: float, sr: int = 24000):
+        self.sr = sr
+        self.buffer = np.zeros(max(1, int(math.ceil(duration * sr))), dtype=np.float32)
+        self.cursor = 0
+        self.placements: List[Tuple[int, int]] = []
+
+    def place(self, start: float, samples: np.ndarray) -> Tuple[int, int]:
+        """Write `samples` at `start` seconds; returns (offset, length) in samples."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        offset = max(int(round(max(start, 0.0) * self.sr)), self.cursor)
+        end = offset + len(samples)
+        if end > len(self.buffer):
+            grown = np.zeros(max(end, int(len(self.buffer) * 1.25)), dtype=np.float32)
+            grown[:len(self.buffer)] = self.buffer
+            self.buffer = grown
+        self.buffer[offset:end] = samples
+        self.cursor = max(self.cursor, end)
+        self.placements.append((offset, len(samples)))
+        return offset, len(samples)
+
+    @property
+    def duration(self) -> float:
+        return len(self.buffer) / self.sr
+
+    def write(self, path: str) -> str:
+        """Write the track once: WAV as 16-bit PCM, any other extension via ffmpeg."""
+        data = np.clip(self.buffer, -1.0, 1.0)
+        if os.path.splitext(path)[1].lower() == ".wav":
+            import soundfile as sf
+            sf.write(path, data, self.sr, subtype="PCM_16")
+            return path
+        proc = subprocess.run(
+            [ffmpeg_exe(), "-hide_banner", "-loglevel", "error", "-y",
+             "-f", "f32le", "-ar", str(self.sr), "-ac", "1", "-i", "pipe:0", path],
+            input=data.tobytes(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.decode("utf-8", "replace")[-500:])
+        return path
@@ -0,0 +1 @@
+# Caches shared across jobs (translation memory, synthesized audio, analysis results).
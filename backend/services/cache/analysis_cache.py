@@ -0,0 +1,212 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class AnalysisCache:
+    """Target-language-independent analysis of a source video, keyed by its content hash.
+
+    One directory per source holds the stored upload itself, its 16 kHz
+    speech-rate audio (`audio.npy`, memory-mapped on load), the Wav2Lip face
+    track (`faces.npy`) and the XTTS speaker reference; a SQLite index keeps
+    the media probe and Whisper transcripts (per model variant) plus size and
+    last use. Every language job for the same video reads from here, so
+    extraction, STT and face detection run once per video. Least recently
+    used entries go once the cache exceeds `max_bytes`, except those that
+    queued or running jobs still reference; `drop_unreferenced` removes
+    entries no job uses any more (the auto-delete retention window).
+    """
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        self.root = root
+        self.max_bytes = max_bytes or int(float(os.getenv("ANALYSIS_CACHE_MAX_MB", "10240")) * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "sources_deduplicated": 0, "evictions": 0, "dropped": 0}
+        self._open_lock = threading.Lock()
+        self._sqlite: Optional[sqlite3.Connection] = None
+
+    def open(self):
+        """Create the cache directory and index if needed; idempotent, and implied by first use."""
+        with self._open_lock:
+            if self._sqlite is not None:
+                return
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, "index.db"), check_same_thread=False)
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    " key TEXT PRIMARY KEY, source TEXT, media TEXT, bytes INTEGER, created_at REAL, last_used REAL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS transcripts ("
+                    " key TEXT, variant TEXT, text TEXT, segments TEXT, language TEXT, seconds REAL,"
+                    " PRIMARY KEY (key, variant))"
+                )
+            self._sqlite = conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._sqlite is None:
+            self.open()
+        return self._sqlite
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def path(self, key: str, name: str) -> str:
+        return os.path.join(self.entry_dir(key), name)
+
+    # -- source ------------------------------------------------------------------
+
+    def store_source(self, key: str, upload_path: str, filename: str) -> str:
+        """Keep one copy of an uploaded source: move `upload_path` in on first sight, drop it
+        if this content is already stored. Returns the stored path. Blocking."""
+        with self._lock:
+            row = self._conn.execute("SELECT source FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and row[0] and os.path.exists(row[0]):
+                os.remove(upload_path)
+                self.counters["sources_deduplicated"] += 1
+                self._touch(key)
+                return row[0]
+            os.makedirs(self.entry_dir(key), exist_ok=True)
+            ext = os.path.splitext(filename)[1] or ".mp4"
+            dest = self.path(key, "source" + ext)
+            shutil.move(upload_path, dest)
+            now = time.time()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, source, media, bytes, created_at, last_used) "
+                    "VALUES (?, ?, NULL, ?, ?, ?)",
+                    (key, dest, os.path.getsize(dest), now, now),
+                )
+            return dest
+
+    # -- media probe ----------------------------------------------------------------
+
+    def get_media(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT media FROM entries WHERE key = ?", (key,)).fetchone()
+            return json.loads(row[0]) if row and row[0] else None
+
+    def put_media(self, key: str, media: dict):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE entries SET media = ? WHERE key = ?", (json.dumps(media), key))
+
+    # -- transcripts ------------------------------------------------------------------
+
+    def get_transcript(self, key: str, variant: str) -> Optional[Tuple[str, List[tuple], Optional[str]]]:
+        """(text, [(start, end, text)], language) for the Whisper `variant`, or None (a miss)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, segments, language FROM transcripts WHERE key = ? AND variant = ?", (key, variant)
+            ).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            self._touch(key)
+            return row[0], [tuple(s) for s in json.loads(row[1])], row[2]
+
+    def put_transcript(self, key: str, variant: str, text: str, segments: List[tuple], language: Optional[str],
+                       seconds: float = 0.0):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?)",
+                (key, variant, text, json.dumps([list(s) for s in segments]), language, seconds),
+            )
+
+    # -- audio --------------------------------------------------------------------------
+
+    def load_audio(self, key: str) -> Optional[np.ndarray]:
+        """The stored speech-rate samples, memory-mapped (no copy), or None."""
+        path = self.path(key, "audio.npy")
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def put_audio(self, key: str, samples: np.ndarray):
+        """Store extracted samples (blocking). Written to a temp name first so readers never see half a file."""
+        path = self.path(key, "audio.npy")
+        tmp = path + ".part.npy"
+        np.save(tmp, np.asarray(samples, dtype=np.float32))
+        os.replace(tmp, path)
+        self._update_bytes(key)
+
+    # -- bookkeeping ----------------------------------------------------------------------
+
+    def _touch(self, key: str):
+        with self._conn:
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+
+    def _update_bytes(self, key: str):
+        size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(self.entry_dir(key)) for f in files)
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE entries SET bytes = ? WHERE key = ?", (size, key))
+
+    def refresh(self, key: str):
+        """Re-measure an entry after files were added beside the index (face track, speaker WAV)."""
+        if os.path.isdir(self.entry_dir(key)):
+            self._update_bytes(key)
+
+    def prune(self, protect: Iterable[str] = ()):
+        """Evict least recently used entries over the byte cap, skipping keys in `protect`."""
+        protect = set(protect)
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+            if total <= self.max_bytes:
+                return
+            rows = self._conn.execute("SELECT key, bytes FROM entries ORDER BY last_used ASC").fetchall()
+            with self._conn:
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    if key in protect:
+                        continue
+                    self._evict(key)
+                    total -= size or 0
+                    self.counters["evictions"] += 1
+
+    def drop_unreferenced(self, referenced: Iterable[str], idle_seconds: float = 0.0) -> int:
+        """Remove entries whose key is not in `referenced` and that were not used in the last
+        `idle_seconds` (an upload is stored before its job exists). Returns how many went."""
+        referenced = set(referenced)
+        cutoff = time.time() - idle_seconds
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM entries WHERE last_used < ?", (cutoff,)).fetchall()
+            dropped = [key for (key,) in rows if key not in referenced]
+            with self._conn:
+                for key in dropped:
+                    self._evict(key)
+            self.counters["dropped"] += len(dropped)
+            return len(dropped)
+
+    def _evict(self, key: str):
+        # Caller holds the lock and a transaction
+        shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(self.entry_dir(key)))
+        except OSError:
+            pass  # other entries share the shard
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._conn.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+            (transcripts,) = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": entries,
+                "transcripts": transcripts,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,157 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize(text: str) -> str:
+    """Whitespace-normalized segment text used as the lookup key."""
+    return " ".join((text or "").split())
+
+
+class TranslationMemory:
+    """Disk-backed translation memory with an in-process LRU in front.
+
+    Entries are keyed by (normalized source text, source lang, target lang).
+    The SQLite tier expires rows after `ttl_days` and keeps at most
+    `max_entries` rows, dropping the least recently used first.
+    """
+
+    def __init__(self, path: str, lru_size: Optional[int] = None, ttl_days: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        self.path = path
+        self.lru_size = lru_size or int(os.getenv("TM_LRU_SIZE", "5000"))
+        self.ttl_seconds = (ttl_days or float(os.getenv("TM_TTL_DAYS", "90"))) * 86400
+        self.max_entries = max_entries or int(os.getenv("TM_MAX_ENTRIES", "200000"))
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        self.counters = {"lru_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._open_lock = threading.Lock()
+        self._sqlite: Optional[sqlite3.Connection] = None
+
+    def open(self):
+        """Create the database file if needed; idempotent, and implied by the first lookup."""
+        with self._open_lock:
+            if self._sqlite is not None:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tm ("
+                    " key TEXT PRIMARY KEY, src_lang TEXT, dest_lang TEXT, source TEXT,"
+                    " translation TEXT NOT NULL, created_at REAL, last_used REAL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS tm_last_used ON tm (last_used)")
+            self._sqlite = conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._sqlite is None:
+            self.open()
+        return self._sqlite
+
+    @staticmethod
+    def key(text: str, src_lang: Optional[str], dest_lang: str) -> str:
+        raw = f"{(src_lang or 'auto').lower()}\x1f{dest_lang.lower()}\x1f{normalize(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str], src_lang: Optional[str], dest_lang: str) -> Dict[str, str]:
+        """Map of normalized text -> cached translation for every hit among `texts`."""
+        found: Dict[str, str] = {}
+        disk_keys: Dict[str, str] = {}
+        now = time.time()
+        with self._lock:
+            for text in texts:
+                norm = normalize(text)
+                if not norm or norm in found:
+                    continue
+                k = self.key(norm, src_lang, dest_lang)
+                hit = self._lru.get(k)
+                if hit is not None:
+                    self._lru.move_to_end(k)
+                    found[norm] = hit
+                    self.counters["lru_hits"] += 1
+                else:
+                    disk_keys[k] = norm
+            if disk_keys:
+                keys = list(disk_keys)
+                rows = []
+                for i in range(0, len(keys), 500):
+                    part = keys[i:i + 500]
+                    rows += self._conn.execute(
+                        f"SELECT key, translation, created_at FROM tm WHERE key IN ({','.join('?' * len(part))})", part
+                    ).fetchall()
+                fresh = [(k, t) for (k, t, created) in rows if now - (created or 0) <= self.ttl_seconds]
+                for k, t in fresh:
+                    found[disk_keys[k]] = t
+                    self._remember(k, t)
+                self.counters["disk_hits"] += len(fresh)
+                self.counters["misses"] += len(disk_keys) - len(fresh)
+                if fresh:
+                    with self._conn:
+                        self._conn.executemany("UPDATE tm SET last_used = ? WHERE key = ?", [(now, k) for k, _ in fresh])
+        return found
+
+    def get(self, text: str, src_lang: Optional[str], dest_lang: str) -> Optional[str]:
+        return self.get_many([text], src_lang, dest_lang).get(normalize(text))
+
+    def put_many(self, pairs: List[Tuple[str, str]], src_lang: Optional[str], dest_lang: str):
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, translation in pairs:
+                norm = normalize(text)
+                if not norm or not translation:
+                    continue
+                k = self.key(norm, src_lang, dest_lang)
+                self._remember(k, translation)
+                rows.append((k, (src_lang or "auto").lower(), dest_lang.lower(), norm, translation, now, now))
+            if not rows:
+                return
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO tm VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.counters["writes"] += len(rows)
+            self._puts_since_evict += len(rows)
+            if self._puts_since_evict >= 1000:
+                self._puts_since_evict = 0
+                self._evict()
+
+    def put(self, text: str, src_lang: Optional[str], dest_lang: str, translation: str):
+        self.put_many([(text, translation)], src_lang, dest_lang)
+
+    def _remember(self, k: str, translation: str):
+        self._lru[k] = translation
+        self._lru.move_to_end(k)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _evict(self):
+        with self._conn:
+            cur = self._conn.execute("DELETE FROM tm WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            removed = cur.rowcount or 0
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM tm").fetchone()
+            if count > self.max_entries:
+                cur = self._conn.execute(
+                    "DELETE FROM tm WHERE key IN (SELECT key FROM tm ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                removed += cur.rowcount or 0
+        self.counters["evictions"] += removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            (rows,) = self._conn.execute("SELECT COUNT(*) FROM tm").fetchone()
+            lookups = self.counters["lru_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = self.counters["lru_hits"] + self.counters["disk_hits"]
+            return {
+                **self.counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "lru_entries": len(self._lru),
+                "disk_entries": rows,
+            }
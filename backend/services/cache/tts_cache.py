@@ -0,0 +1,155 @@
+import contextlib
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+
+class TTSClipCache:
+    """Content-addressed cache of synthesized segment audio under a byte cap.
+
+    Clips are keyed by (text, language, engine, voice-sample hash) and stored
+    as files next to a small SQLite index that tracks size, last use and how
+    long the clip took to synthesize, so hits can report the seconds saved.
+    Least recently used clips are removed once the cache exceeds `max_bytes`,
+    except keys that are `pinned` by a render still reading them.
+    """
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        self.root = root
+        self.max_bytes = max_bytes or int(float(os.getenv("TTS_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._pins: Dict[str, int] = {}
+        self.counters = {"hits": 0, "misses": 0, "seconds_saved": 0.0, "evictions": 0}
+        self._open_lock = threading.Lock()
+        self._sqlite: Optional[sqlite3.Connection] = None
+
+    def open(self):
+        """Create the cache directory and index if needed; idempotent, and implied by first use."""
+        with self._open_lock:
+            if self._sqlite is not None:
+                return
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, "index.db"), check_same_thread=False)
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS clips ("
+                    " key TEXT PRIMARY KEY, path TEXT NOT NULL, bytes INTEGER,"
+                    " synth_seconds REAL, created_at REAL, last_used REAL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS clips_last_used ON clips (last_used)")
+            self._sqlite = conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._sqlite is None:
+            self.open()
+        return self._sqlite
+
+    @staticmethod
+    def key(text: str, language: str, engine: str, voice_hash: str = "") -> str:
+        raw = "\x1f".join([" ".join((text or "").split()), language or "", engine or "", voice_hash or ""])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @contextlib.contextmanager
+    def pinned(self, key: str):
+        """Keep `key`'s clip (cached now or stored inside the block) from being evicted until exit."""
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pins[key] -= 1
+                if not self._pins[key]:
+                    del self._pins[key]
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached clip for `key`, or None (counted as a miss)."""
+        with self._lock:
+            row = self._conn.execute("SELECT path, synth_seconds FROM clips WHERE key = ?", (key,)).fetchone()
+            if row and os.path.exists(row[0]):
+                with self._conn:
+                    self._conn.execute("UPDATE clips SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.counters["hits"] += 1
+                self.counters["seconds_saved"] += row[1] or 0.0
+                return row[0]
+            if row:
+                with self._conn:
+                    self._conn.execute("DELETE FROM clips WHERE key = ?", (key,))
+            self.counters["misses"] += 1
+            return None
+
+    def synthesize(self, key: str, ext: str, synth: Callable[..., object], *args) -> str:
+        """Run `synth(*args, out_path)` and store the result under `key`; returns the cached path.
+
+        Blocking: call from a worker thread, after `get` missed.
+        """
+        final = os.path.join(self.root, key[:2], key + ext)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        tmp = os.path.join(os.path.dirname(final), f".{uuid.uuid4().hex}{ext}")
+        t0 = time.perf_counter()
+        try:
+            synth(*args, tmp)
+            elapsed = time.perf_counter() - t0
+            os.replace(tmp, final)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO clips VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, final, os.path.getsize(final), elapsed, now, now),
+                )
+            self._evict(keep=key)
+        return final
+
+    @staticmethod
+    def export(path: str, dest: str) -> str:
+        """Hardlink (copy across filesystems) a cached clip to `dest`, which then outlives eviction."""
+        tmp = f"{dest}.{uuid.uuid4().hex}.part"
+        try:
+            os.link(path, tmp)
+        except OSError:
+            shutil.copyfile(path, tmp)
+        os.replace(tmp, dest)
+        return dest
+
+    def _evict(self, keep: str):
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM clips").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, path, bytes FROM clips ORDER BY last_used ASC").fetchall()
+        with self._conn:
+            for key, path, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if key == keep or key in self._pins:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                self._conn.execute("DELETE FROM clips WHERE key = ?", (key,))
+                total -= size or 0
+                self.counters["evictions"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM clips").fetchone()
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "seconds_saved": round(self.counters["seconds_saved"], 2),
+                "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+            }
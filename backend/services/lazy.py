@@ -0,0 +1,101 @@
+import importlib
+import importlib.util
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# module name -> seconds its first import took
+_import_seconds: Dict[str, float] = {}
+# module name -> why its first import failed; it is not tried again
+_failed: Dict[str, str] = {}
+# Called with (module name, error) when a first import fails
+_on_failure: List[Callable[[str, str], None]] = []
+# One lock per module, so a slow import (torch via TTS) does not hold up the others
+_locks: Dict[str, threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def available(name: str) -> bool:
+    """True if `name` is importable, without importing it (only the finder runs).
+
+    A spec only proves the package is installed; once an import of `name` (or
+    a submodule) has failed through `load`, it is reported unavailable.
+    """
+    if any(f == name or f.startswith(name + ".") or name.startswith(f + ".") for f in failed()):
+        return False
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def on_failure(callback: Callable[[str, str], None]):
+    """Register `callback(name, error)`, run once per module whose first import fails."""
+    _on_failure.append(callback)
+
+
+def load(name: str):
+    """Import `name` (once) and record how long the first import took.
+
+    A failed first import (broken install, missing shared library) is recorded
+    and reported to the `on_failure` callbacks; later calls raise ImportError
+    without trying again.
+    """
+    if name in _import_seconds:
+        return importlib.import_module(name)
+    with _lock:
+        lock = _locks.setdefault(name, threading.Lock())
+    with lock:
+        if name in _failed:
+            raise ImportError(f"{name} failed to import: {_failed[name]}")
+        if name not in _import_seconds:
+            t0 = time.perf_counter()
+            try:
+                module = importlib.import_module(name)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                with _lock:
+                    _failed[name] = error
+                for callback in list(_on_failure):
+                    callback(name, error)
+                raise
+            with _lock:
+                _import_seconds[name] = time.perf_counter() - t0
+            return module
+    return importlib.import_module(name)
+
+
+def loaded() -> Dict[str, float]:
+    """Modules imported through this helper so far, with their import time in seconds."""
+    with _lock:
+        return {name: round(s, 3) for name, s in _import_seconds.items()}
+
+
+def failed() -> Dict[str, str]:
+    """Modules whose import failed through this helper, with the error."""
+    with _lock:
+        return dict(_failed)
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[Any] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._module is None:
+            self._module = load(self._name)
+        return getattr(self._module, attr)
+
+
+class LazyAttr:
+    """Stand-in for `from module import attr` that imports on first call."""
+
+    def __init__(self, module: str, attr: str):
+        self._module = module
+        self._attr = attr
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return getattr(load(self._module), self._attr)(*args, **kwargs)
@@ -0,0 +1 @@
+# Real-time (streaming) translation sessions.
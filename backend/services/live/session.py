@@ -0,0 +1,174 @@
+import asyncio
+import itertools
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+
+# (samples) -> ([(start, end, text)], language)
+Transcriber = Callable[[np.ndarray], Awaitable[Tuple[List[tuple], Optional[str]]]]
+# (text, source_language) -> translated text
+Translator = Callable[[str, Optional[str]], Awaitable[Optional[str]]]
+# (text) -> encoded audio bytes
+Synthesizer = Callable[[str], Awaitable[Optional[bytes]]]
+
+# Recent per-phrase latencies across sessions, for /health
+RECENT_LATENCIES_MS: Deque[float] = deque(maxlen=200)
+
+
+class LiveSession:
+    """Incremental speech translation over a rolling 16 kHz mono feed.
+
+    Audio accumulates in a window that is cut into a phrase when speech is
+    followed by `silence_ms` of quiet (energy endpointing, so it also works
+    on synthetic feeds), or at the quietest frame near the end once the
+    window reaches `max_window` seconds. Phrases are transcribed one at a
+    time, in order, while translation and synthesis of earlier phrases run
+    concurrently; `results()` yields them in phrase order as they are ready.
+    """
+
+    def __init__(self, transcribe: Transcriber, translate: Translator, synthesize: Synthesizer,
+                 sr: int = SAMPLE_RATE, max_window: Optional[float] = None, silence_ms: Optional[float] = None,
+                 rms_threshold: Optional[float] = None):
+        self.transcribe = transcribe
+        self.translate = translate
+        self.synthesize = synthesize
+        self.sr = sr
+        self.max_window = max_window or float(os.getenv("LIVE_MAX_WINDOW_SECONDS", "8"))
+        self.silence_samples = int(sr * (silence_ms or float(os.getenv("LIVE_SILENCE_MS", "500"))) / 1000)
+        self.rms_threshold = rms_threshold or float(os.getenv("LIVE_RMS_THRESHOLD", "0.01"))
+        self.frame = int(sr * FRAME_SECONDS)
+
+        self._buf = np.zeros(0, dtype=np.float32)
+        self._offset = 0  # absolute sample index of _buf[0]
+        self._scanned = 0  # samples of _buf already classified
+        self._frame_rms: List[float] = []
+        self._speech = False
+        self._trailing_silence = 0
+        self._ids = itertools.count()
+        self._stt_lock = asyncio.Lock()
+        self._order: "asyncio.Queue[Optional[asyncio.Task]]" = asyncio.Queue()
+        self.language: Optional[str] = None
+
+    # -- input ---------------------------------------------------------------
+
+    def feed(self, samples: np.ndarray):
+        """Append audio; schedules a phrase when an endpoint is found. Never blocks on STT."""
+        self._buf = np.concatenate([self._buf, samples.astype(np.float32, copy=False)])
+        while self._scanned + self.frame <= len(self._buf):
+            rms = float(np.sqrt(np.mean(np.square(self._buf[self._scanned:self._scanned + self.frame]))))
+            self._frame_rms.append(rms)
+            self._scanned += self.frame
+            if rms >= self.rms_threshold:
+                self._speech = True
+                self._trailing_silence = 0
+            else:
+                self._trailing_silence += self.frame
+            if self._speech and self._trailing_silence >= self.silence_samples:
+                # Keep half of the pause with the phrase so the last word is not clipped
+                keep = (self._trailing_silence // 2 // self.frame) * self.frame
+                self._cut(self._scanned - keep, waited=self._trailing_silence)
+            elif len(self._buf) >= self.max_window * self.sr and self._scanned >= len(self._buf) - self.frame:
+                if self._speech:
+                    self._cut(self._quietest_cut(), waited=0)
+                else:
+                    # Nothing said yet: drop the silence instead of transcribing it, keeping the
+                    # last scanned frames (_scanned is a whole number of frames, so the cut is too)
+                    self._trim(max(0, self._scanned - self.silence_samples // self.frame * self.frame))
+
+    def feed_pcm16(self, data: bytes):
+        """`feed` for little-endian 16-bit PCM, the wire format of the WebSocket endpoint."""
+        data = data[:len(data) // 2 * 2]
+        self.feed(np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0)
+
+    def flush(self):
+        """Schedule whatever speech is buffered and mark the end of input."""
+        if self._speech and len(self._buf):
+            self._cut(len(self._buf), waited=0)
+        self._order.put_nowait(None)
+
+    def _quietest_cut(self) -> int:
+        # Forced cut in continuous speech: the quietest frame of the last two seconds
+        tail = max(1, int(2.0 / FRAME_SECONDS))
+        rms = self._frame_rms[-tail:]
+        idx = len(self._frame_rms) - len(rms) + int(np.argmin(rms))
+        return max(self.frame, (idx + 1) * self.frame)
+
+    def _trim(self, at: int) -> np.ndarray:
+        # `at` is frame-aligned, so _frame_rms stays aligned with _buf
+        head = self._buf[:at]
+        self._buf = self._buf[at:]
+        self._offset += at
+        self._scanned = max(0, self._scanned - at)
+        self._frame_rms = self._frame_rms[at // self.frame:]
+        return head
+
+    def _cut(self, at: int, waited: int):
+        start = self._offset / self.sr
+        window = self._trim(at)
+        self._speech = False
+        self._trailing_silence = 0
+        endpoint = time.perf_counter()
+        # Time the speaker has been quiet before the endpoint fired counts towards glass-to-ear
+        task = asyncio.ensure_future(self._phrase(next(self._ids), window, start, endpoint, waited / self.sr))
+        self._order.put_nowait(task)
+
+    # -- processing ----------------------------------------------------------
+
+    async def _phrase(self, phrase_id: int, window: np.ndarray, start: float, endpoint: float, waited: float) -> dict:
+        async with self._stt_lock:
+            t0 = time.perf_counter()
+            segs, lang = await self.transcribe(window)
+            stt = time.perf_counter() - t0
+        if lang:
+            self.language = lang
+        source = " ".join(s[2] for s in segs if s[2]).strip()
+        out = {"type": "phrase", "id": phrase_id, "start": round(start, 3),
+               "end": round(start + len(window) / self.sr, 3), "source": source, "language": self.language,
+               "text": "", "audio": None}
+        translate = tts = 0.0
+        if source:
+            t1 = time.perf_counter()
+            out["text"] = (await self.translate(source, self.language)) or source
+            translate = time.perf_counter() - t1
+            t2 = time.perf_counter()
+            out["audio"] = await self.synthesize(out["text"])
+            tts = time.perf_counter() - t2
+        processing = time.perf_counter() - endpoint
+        out["timings"] = {
+            "stt_ms": round(stt * 1000), "translate_ms": round(translate * 1000), "tts_ms": round(tts * 1000),
+            "processing_ms": round(processing * 1000), "glass_to_ear_ms": round((processing + waited) * 1000),
+        }
+        if source:
+            RECENT_LATENCIES_MS.append(out["timings"]["glass_to_ear_ms"])
+        return out
+
+    async def results(self):
+        """Phrase results in order (dicts; `audio` holds the encoded bytes or None)."""
+        while True:
+            task = await self._order.get()
+            if task is None:
+                return
+            yield await task
+
+    def cancel(self):
+        while not self._order.empty():
+            task = self._order.get_nowait()
+            if task is not None:
+                task.cancel()
+
+
+def latency_stats() -> dict:
+    values = sorted(RECENT_LATENCIES_MS)
+    if not values:
+        return {"phrases": 0}
+    return {
+        "phrases": len(values),
+        "p50_ms": values[len(values) // 2],
+        "p90_ms": values[min(len(values) - 1, int(len(values) * 0.9))],
+    }
@@ -0,0 +1 @@
+# Media helpers that drive the ffmpeg binary directly (probing, remuxing, cutting).
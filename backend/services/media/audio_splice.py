@@ -0,0 +1,117 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from services.media.ffmpeg import ffmpeg_exe, run_ffmpeg
+
+AAC_FRAME = 1024
+# Encoder delay of ffmpeg's AAC encoder: the first frame of a raw (ADTS) stream is priming
+_PRIMING = AAC_FRAME
+# Unchanged frames re-encoded on each side of a change, so the spliced-in frames
+# meet the copied ones on steady signal and MDCT overlap/window switching line up
+MARGIN_FRAMES = 4
+# Extra audio fed to the encoder before a span and dropped again (encoder warm-up)
+PREROLL_FRAMES = 4
+_ADTS_RATES = [96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350]
+
+
+def _adts_frames(data: bytes) -> List[bytes]:
+    frames = []
+    i = 0
+    while i < len(data):
+        if data[i] != 0xFF or data[i + 1] & 0xF0 != 0xF0:
+            raise ValueError("not an ADTS stream")
+        size = ((data[i + 3] & 0x03) << 11) | (data[i + 4] << 3) | (data[i + 5] >> 5)
+        frames.append(data[i:i + size])
+        i += size
+    return frames
+
+
+def _adts_format(frame: bytes) -> Tuple[int, int]:
+    """(sample rate, channels) from an ADTS header."""
+    rate = _ADTS_RATES[(frame[2] >> 2) & 0x0F]
+    channels = ((frame[2] & 0x01) << 2) | (frame[3] >> 6)
+    return rate, channels
+
+
+def changed_frame_runs(old: np.ndarray, new: np.ndarray, frames: int, margin: int = MARGIN_FRAMES) -> List[Tuple[int, int]]:
+    """[start, end) runs of stream frames whose samples differ between `old` and `new`, widened
+    by `margin`. Stream frame k (k >= 1, frame 0 is priming) holds samples [(k-1)*1024, k*1024)."""
+    total = (frames - 1) * AAC_FRAME
+    diff = _fit(old, total) != _fit(new, total)
+    differs = np.flatnonzero(diff.reshape(-1, AAC_FRAME).any(axis=1)) + 1
+    runs: List[Tuple[int, int]] = []
+    for k in differs:
+        start, end = max(1, k - margin), min(frames, k + 1 + margin)
+        if runs and start <= runs[-1][1]:
+            runs[-1] = (runs[-1][0], max(runs[-1][1], end))
+        else:
+            runs.append((start, end))
+    return runs
+
+
+def _fit(samples: np.ndarray, length: int) -> np.ndarray:
+    # The muxed track is padded with silence (or cut) to the video's length
+    if len(samples) >= length:
+        return samples[:length]
+    return np.concatenate([samples, np.zeros(length - len(samples), dtype=samples.dtype)])
+
+
+def _encode_adts(samples: np.ndarray, sr: int, bitrate: str) -> List[bytes]:
+    proc = subprocess.run(
+        [ffmpeg_exe(), "-hide_banner", "-nostdin", "-loglevel", "error", "-y",
+         "-f", "f32le", "-ar", str(sr), "-ac", "1", "-i", "pipe:0",
+         "-c:a", "aac", "-b:a", bitrate, "-f", "adts", "pipe:1"],
+        input=np.clip(samples, -1.0, 1.0).astype(np.float32).tobytes(), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode("utf-8", "replace")[-500:])
+    return _adts_frames(proc.stdout)
+
+
+def replace_audio_span(video_path: str, old: np.ndarray, new: np.ndarray, sr: int, out_path: str,
+                       audio_bitrate: str = "160k") -> Optional[str]:
+    """Write `video_path` with its mono AAC track changed from `old` to `new` samples, re-encoding
+    only the AAC frames around the samples that differ; video and every other audio frame are
+    stream-copied. Returns None, writing nothing, when the existing track is not one this can
+    splice (other sample rate or layout); the caller then remuxes the whole track.
+    """
+    work = tempfile.mkdtemp(prefix="splice_", dir=os.path.dirname(os.path.abspath(out_path)))
+    try:
+        orig_path = os.path.join(work, "orig.aac")
+        run_ffmpeg(["-i", video_path, "-map", "0:a:0", "-c", "copy", "-f", "adts", orig_path])
+        with open(orig_path, "rb") as f:
+            frames = _adts_frames(f.read())
+        if len(frames) < 2 or _adts_format(frames[0]) != (sr, 1):
+            return None
+        total = (len(frames) - 1) * AAC_FRAME
+        new = _fit(np.asarray(new, dtype=np.float32), total)
+        out_frames = list(frames)
+        for start, end in changed_frame_runs(old, new, len(frames)):
+            # Encode from PREROLL_FRAMES early and keep the frames that cover [start, end)
+            first = max(0, (start - 1 - PREROLL_FRAMES) * AAC_FRAME)
+            last = min(total, (end - 1 + PREROLL_FRAMES) * AAC_FRAME)
+            encoded = _encode_adts(new[first:last], sr, audio_bitrate)
+            skip = (start - 1) - first // AAC_FRAME + 1
+            span = encoded[skip:skip + (end - start)]
+            if len(span) != end - start:
+                return None
+            out_frames[start:end] = span
+        new_path = os.path.join(work, "new.aac")
+        with open(new_path, "wb") as f:
+            f.write(b"".join(out_frames))
+        # A raw AAC stream carries no priming info; shift it back so it stays in sync
+        run_ffmpeg([
+            "-i", video_path,
+            "-itsoffset", f"{-_PRIMING / sr:.6f}", "-i", new_path,
+            "-map", "0:v:0", "-map", "1:a:0", "-c", "copy",
+            "-movflags", "+faststart",
+            out_path,
+        ])
+        return out_path
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+from services.media.ffmpeg import run_ffmpeg
+from services.media.probe import probe
+
+# libx264 settings per use: previews favour turnaround, finals size and quality
+PROFILES = {
+    "fast": {"preset": "veryfast", "crf": 26},
+    "balanced": {"preset": "medium", "crf": 21},
+    "quality": {"preset": "slow", "crf": 18},
+}
+CHUNK_SECONDS = float(os.getenv("ENCODE_CHUNK_SECONDS", "10"))
+# Chunks shorter than this are not worth their own process
+_MIN_CHUNK_SECONDS = 2.0
+
+
+def default_workers() -> int:
+    return max(1, int(os.getenv("ENCODE_WORKERS", str(os.cpu_count() or 1))))
+
+
+def plan_chunks(keyframes: List[float], duration: float, chunk_seconds: float = CHUNK_SECONDS) -> List[Tuple[float, float]]:
+    """(start, end) chunks of about `chunk_seconds`, every inner boundary on an input keyframe
+    so each encoder process seeks straight to its first frame. One chunk without keyframes."""
+    bounds = [0.0]
+    for k in keyframes:
+        if k - bounds[-1] >= chunk_seconds and duration - k >= _MIN_CHUNK_SECONDS:
+            bounds.append(k)
+    bounds.append(duration)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _encode_chunk(video_in: str, start: float, end: Optional[float], fps: Optional[float], out_path: str,
+                  profile: dict, threads: int):
+    args = []
+    if start > 0:
+        # Land on the keyframe itself (probe times are rounded to the millisecond) and keep it
+        args += ["-noaccurate_seek", "-ss", f"{start + 0.001:.3f}"]
+    args += ["-i", video_in]
+    if end is not None:
+        # Stop a quarter frame short of the next chunk's keyframe so no frame is encoded twice
+        args += ["-t", f"{end - start - 0.25 / (fps or 30.0):.4f}"]
+    args += [
+        "-map", "0:v:0", "-an",
+        "-c:v", "libx264", "-preset", profile["preset"], "-crf", str(profile["crf"]),
+        "-pix_fmt", "yuv420p", "-threads", str(threads),
+        out_path,
+    ]
+    run_ffmpeg(args)
+
+
+def encode(video_in: str, audio_in: Optional[str], out_path: str, profile: str = "balanced",
+           workers: Optional[int] = None, duration: Optional[float] = None, media: Optional[dict] = None,
+           chunk_seconds: float = CHUNK_SECONDS, audio_bitrate: str = "160k",
+           progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """Re-encode the video of `video_in` to H.264 and mux `audio_in` (AAC) as its track.
+
+    The timeline is split at input keyframes into ~`chunk_seconds` chunks
+    that are encoded by up to `workers` ffmpeg processes at once (each with
+    its share of the cores), stitched with the concat demuxer and muxed with
+    the audio in one final stream-copy pass. `duration` encodes only the
+    first seconds (previews). `media` is a probe of `video_in` if the caller
+    has one. `progress(frames_done, frames_total)` is called from this thread
+    as chunks finish.
+    """
+    settings = PROFILES[profile]
+    workers = workers or default_workers()
+    info = media or probe(video_in)
+    total = min(duration, info["duration"]) if duration else info["duration"]
+    chunks = plan_chunks(info.get("keyframes") or [], total, chunk_seconds)
+    if len(chunks) > 1 and workers > 1:
+        threads = max(1, (os.cpu_count() or 1) // min(workers, len(chunks)))
+    else:
+        threads = 0  # libx264 picks
+    work = tempfile.mkdtemp(prefix="encode_", dir=os.path.dirname(os.path.abspath(out_path)))
+    try:
+        parts = [os.path.join(work, f"part{i:04d}.mp4") for i in range(len(chunks))]
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            futures = {
+                pool.submit(_encode_chunk, video_in, st, en if (i < len(chunks) - 1 or duration) else None,
+                            info.get("fps"), part, settings, threads): en - st
+                for i, ((st, en), part) in enumerate(zip(chunks, parts))
+            }
+            fps = info.get("fps") or 30.0
+            frames_total, frames_done = int(round(total * fps)), 0
+            for fut in as_completed(futures):
+                fut.result()
+                frames_done = min(frames_total, frames_done + int(round(futures[fut] * fps)))
+                if progress is not None:
+                    progress(frames_done, frames_total)
+        list_path = os.path.join(work, "parts.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.writelines(f"file '{part}'\n" for part in parts)
+        args = ["-f", "concat", "-safe", "0", "-i", list_path]
+        if audio_in:
+            args += ["-i", audio_in, "-map", "0:v:0", "-map", "1:a:0",
+                     "-af", "apad", "-c:a", "aac", "-b:a", audio_bitrate, "-shortest"]
+        else:
+            args += ["-map", "0:v:0"]
+        args += ["-c:v", "copy", "-movflags", "+faststart", out_path]
+        run_ffmpeg(args)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return out_path
@@ -0,0 +1,80 @@
+import os
+import shutil
+import subprocess
+from typing import List, Optional
+
+_FFMPEG: Optional[str] = None
+
+
+def ffmpeg_exe() -> str:
+    """Path to ffmpeg: FFMPEG_BINARY, then PATH, then the imageio-ffmpeg bundle moviepy uses."""
+    global _FFMPEG
+    if _FFMPEG is None:
+        exe = os.getenv("FFMPEG_BINARY") or shutil.which("ffmpeg")
+        if not exe:
+            import imageio_ffmpeg
+            exe = imageio_ffmpeg.get_ffmpeg_exe()
+        _FFMPEG = exe
+    return _FFMPEG
+
+
+def run_ffmpeg(args: List[str]) -> None:
+    """Run ffmpeg quietly, overwriting outputs; raise RuntimeError with stderr on failure."""
+    cmd = [ffmpeg_exe(), "-hide_banner", "-nostdin", "-loglevel", "error", "-y", *args]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {err[-500:]}")
+
+
+def remux_audio(video_path: str, audio_path: str, out_path: str, audio_bitrate: str = "160k",
+                duration: Optional[float] = None) -> str:
+    """Replace the audio track of `video_path` without touching the video stream.
+
+    The video is stream-copied; only the new track is encoded to AAC. Audio
+    shorter than the video is padded with silence, longer audio is cut at the
+    end of the video. `duration` keeps only the first seconds of the output
+    (end it on a keyframe for an exact cut).
+    """
+    run_ffmpeg([
+        "-i", video_path,
+        "-i", audio_path,
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c:v", "copy",
+        "-af", "apad", "-c:a", "aac", "-b:a", audio_bitrate,
+        "-shortest",
+        *(["-t", f"{duration:.3f}"] if duration else []),
+        "-movflags", "+faststart",
+        out_path,
+    ])
+    return out_path
+
+
+def cut_copy(src_path: str, out_path: str, start: float = 0.0, duration: Optional[float] = None) -> str:
+    """Cut [start, start + duration) without re-encoding.
+
+    `start` should be a keyframe time (0 always is); otherwise the cut snaps
+    to the preceding keyframe.
+    """
+    args = []
+    if start > 0:
+        args += ["-ss", f"{start:.3f}"]
+    args += ["-i", src_path]
+    if duration is not None:
+        args += ["-t", f"{duration:.3f}"]
+    args += ["-map", "0:v?", "-map", "0:a?", "-c", "copy", "-avoid_negative_ts", "make_zero", "-movflags", "+faststart", out_path]
+    run_ffmpeg(args)
+    return out_path
+
+
+def decode_pcm(path: str, sr: int = 16000):
+    """Decode any audio/video file to a mono float32 NumPy array at `sr`."""
+    import numpy as np
+
+    cmd = [ffmpeg_exe(), "-hide_banner", "-nostdin", "-loglevel", "error", "-i", path,
+           "-vn", "-ac", "1", "-ar", str(sr), "-f", "f32le", "pipe:1"]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg decode failed ({proc.returncode}): {err[-500:]}")
+    return np.frombuffer(proc.stdout, dtype=np.float32)
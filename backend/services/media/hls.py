@@ -0,0 +1,147 @@
+import bisect
+import math
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from services.media.ffmpeg import run_ffmpeg
+
+PLAYLIST_NAME = "index.m3u8"
+
+
+def plan_windows(media: dict, window_seconds: float) -> List[Tuple[float, float]]:
+    """Split the probed source into (start, end) windows of about `window_seconds`.
+
+    Every boundary is a keyframe, so each window's video can be stream-copied
+    on its own and the windows concatenate back without a re-encode. Without
+    a keyframe index the source is one window.
+    """
+    duration = float(media.get("duration") or 0.0)
+    keys: List[float] = media.get("keyframes") or []
+    bounds = [0.0]
+    while keys:
+        # First keyframe at or past the next target, but never an empty window
+        i = bisect.bisect_left(keys, bounds[-1] + window_seconds)
+        if i >= len(keys) or keys[i] >= duration - 0.5:
+            break
+        bounds.append(keys[i])
+    bounds.append(duration)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def segment_name(index: int) -> str:
+    return f"seg_{index:05d}.ts"
+
+
+def window_name(index: int) -> str:
+    return f"w{index:05d}.mp4"
+
+
+# Probed keyframe times are rounded to the millisecond; seeking a hair past one
+# makes sure ffmpeg lands on it rather than on the keyframe before
+_SEEK_EPSILON = 0.001
+
+
+def render_window(source: str, audio_path: str, start: float, duration: float, out_path: str,
+                  audio_bitrate: str = "160k") -> str:
+    """Mux one window: source video [start, start + duration) stream-copied from its
+    keyframe, `audio_path` (timed from the window start) encoded as the AAC track.
+
+    The MP4 is the window's master copy: the HLS segment is remuxed from it
+    and the windows concatenate into the final video without a re-encode.
+    """
+    tmp = out_path + ".part.mp4"
+    run_ffmpeg([
+        *(["-ss", f"{start + _SEEK_EPSILON:.3f}"] if start > 0 else []), "-i", source,
+        "-i", audio_path,
+        "-t", f"{duration:.3f}",
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c:v", "copy",
+        "-af", "apad", "-c:a", "aac", "-b:a", audio_bitrate,
+        "-shortest",
+        "-movflags", "+faststart",
+        tmp,
+    ])
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def publish_segment(window_path: str, start: float, out_path: str) -> str:
+    """Remux a rendered window into an MPEG-TS segment (stream copy). Timestamps are
+    shifted to the window's place in the full video so the segments play as one stream."""
+    tmp = out_path + ".part"
+    run_ffmpeg(["-i", window_path, "-map", "0", "-c", "copy",
+                "-output_ts_offset", f"{start:.3f}", "-f", "mpegts", tmp])
+    os.replace(tmp, out_path)
+    return out_path
+
+
+class Playlist:
+    """An HLS EVENT playlist that grows as windows finish.
+
+    Windows may finish out of order; a segment is listed once every earlier
+    one is, since players read the playlist strictly in order. The file is
+    rewritten atomically on every change.
+    """
+
+    def __init__(self, directory: str, windows: List[Tuple[float, float]]):
+        self.directory = directory
+        self.windows = windows
+        self.target = max(1, math.ceil(max((en - st for st, en in windows), default=1.0)))
+        self._done: Dict[int, str] = {}
+        self._listed = 0
+        self._ended = False
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._write()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, PLAYLIST_NAME)
+
+    @property
+    def listed(self) -> int:
+        return self._listed
+
+    def add(self, index: int, name: str):
+        with self._lock:
+            self._done[index] = name
+            while self._listed in self._done:
+                self._listed += 1
+            self._write()
+
+    def end(self):
+        with self._lock:
+            self._ended = True
+            self._write()
+
+    def _write(self):
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-PLAYLIST-TYPE:EVENT",
+                 f"#EXT-X-TARGETDURATION:{self.target}", "#EXT-X-MEDIA-SEQUENCE:0"]
+        for i in range(self._listed):
+            st, en = self.windows[i]
+            lines += [f"#EXTINF:{en - st:.3f},", self._done[i]]
+        if self._ended:
+            lines.append("#EXT-X-ENDLIST")
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.path)
+
+
+def concat_windows(windows: List[str], out_path: str, work_dir: Optional[str] = None) -> str:
+    """Join rendered window MP4s into one MP4 with the concat demuxer (no re-encode)."""
+    list_path = os.path.join(work_dir or os.path.dirname(out_path), "concat.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for seg in windows:
+            f.write("file '{}'\n".format(os.path.abspath(seg).replace("'", "'\\''")))
+    tmp = out_path + ".part.mp4"
+    try:
+        run_ffmpeg([
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-map", "0:v?", "-map", "0:a?", "-c", "copy", "-movflags", "+faststart", tmp,
+        ])
+        os.replace(tmp, out_path)
+    finally:
+        os.remove(list_path)
+    return out_path
@@ -0,0 +1,130 @@
+import bisect
+import json
+import os
+import re
+import shutil
+import subprocess
+from typing import List, Optional
+
+from services.media.ffmpeg import ffmpeg_exe
+
+
+def ffprobe_exe() -> Optional[str]:
+    """Path to ffprobe if one is installed (the imageio-ffmpeg bundle ships ffmpeg only)."""
+    exe = os.getenv("FFPROBE_BINARY") or shutil.which("ffprobe")
+    if exe:
+        return exe
+    sibling = os.path.join(os.path.dirname(ffmpeg_exe()), "ffprobe")
+    return sibling if os.path.exists(sibling) else None
+
+
+def _fps(rate: Optional[str]) -> Optional[float]:
+    try:
+        num, _, den = (rate or "").partition("/")
+        value = float(num) / float(den or 1)
+        return round(value, 3) if value > 0 else None
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _probe_ffprobe(exe: str, path: str) -> dict:
+    proc = subprocess.run(
+        [exe, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+    )
+    data = json.loads(proc.stdout or b"{}")
+    video = next((s for s in data.get("streams", []) if s.get("codec_type") == "video"), None)
+    audio = next((s for s in data.get("streams", []) if s.get("codec_type") == "audio"), None)
+    info = _empty()
+    info["duration"] = float((data.get("format") or {}).get("duration") or 0.0)
+    if video:
+        info.update(has_video=True, video_codec=video.get("codec_name"), width=video.get("width"),
+                    height=video.get("height"), fps=_fps(video.get("avg_frame_rate") or video.get("r_frame_rate")))
+    if audio:
+        info.update(has_audio=True, audio_codec=audio.get("codec_name"),
+                    sample_rate=int(audio.get("sample_rate") or 0) or None, channels=audio.get("channels"))
+    if video:
+        # Packet flags only: no decoding
+        proc = subprocess.run(
+            [exe, "-v", "error", "-select_streams", "v:0", "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", path],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        keys = []
+        for line in proc.stdout.decode("utf-8", "replace").splitlines():
+            pts, _, flags = line.partition(",")
+            if "K" in flags and pts not in ("", "N/A"):
+                keys.append(round(float(pts), 3))
+        info["keyframes"] = sorted(keys)
+    info["probed_with"] = "ffprobe"
+    return info
+
+
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_VIDEO_RE = re.compile(r"Stream #\S+.*?: Video: (\w+)(.*)")
+_AUDIO_RE = re.compile(r"Stream #\S+.*?: Audio: (\w+)(.*)")
+
+
+def _probe_ffmpeg(path: str) -> dict:
+    """Fallback without ffprobe: parse `ffmpeg -i` and list keyframes via showinfo on keyframes only."""
+    proc = subprocess.run([ffmpeg_exe(), "-hide_banner", "-nostdin", "-i", path],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    text = proc.stderr.decode("utf-8", "replace")
+    info = _empty()
+    m = _DURATION_RE.search(text)
+    if m:
+        info["duration"] = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+    m = _VIDEO_RE.search(text)
+    if m:
+        rest = m.group(2)
+        size = re.search(r"\b(\d{2,5})x(\d{2,5})\b", rest)
+        fps = re.search(r"([\d.]+) fps", rest)
+        info.update(has_video=True, video_codec=m.group(1),
+                    width=int(size.group(1)) if size else None, height=int(size.group(2)) if size else None,
+                    fps=float(fps.group(1)) if fps else None)
+    m = _AUDIO_RE.search(text)
+    if m:
+        rate = re.search(r"(\d+) Hz", m.group(2))
+        channels = 1 if "mono" in m.group(2) else 2 if "stereo" in m.group(2) else None
+        info.update(has_audio=True, audio_codec=m.group(1),
+                    sample_rate=int(rate.group(1)) if rate else None, channels=channels)
+    if info["has_video"]:
+        # -skip_frame nokey makes the decoder touch keyframes only, so this stays cheap
+        proc = subprocess.run(
+            [ffmpeg_exe(), "-hide_banner", "-nostdin", "-skip_frame", "nokey", "-i", path,
+             "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        keys = re.findall(r"pts_time:\s*([\d.]+)", proc.stderr.decode("utf-8", "replace"))
+        info["keyframes"] = sorted(round(float(k), 3) for k in keys)
+    info["probed_with"] = "ffmpeg"
+    return info
+
+
+def _empty() -> dict:
+    return {
+        "duration": 0.0, "has_video": False, "has_audio": False,
+        "video_codec": None, "width": None, "height": None, "fps": None,
+        "audio_codec": None, "sample_rate": None, "channels": None,
+        "keyframes": [],
+    }
+
+
+def probe(path: str) -> dict:
+    """Media info for `path`: duration, fps, resolution, codecs, audio presence and keyframe times.
+
+    One probe per upload; the result is stored on the job and read by every
+    later stage instead of reopening the file.
+    """
+    exe = ffprobe_exe()
+    info = _probe_ffprobe(exe, path) if exe else _probe_ffmpeg(path)
+    info["size_bytes"] = os.path.getsize(path)
+    return info
+
+
+def keyframe_at_or_after(media: Optional[dict], t: float, max_shift: float = 2.0) -> float:
+    """First keyframe time >= `t` if one lies within `max_shift` seconds; otherwise `t`."""
+    keys: List[float] = (media or {}).get("keyframes") or []
+    i = bisect.bisect_left(keys, t)
+    if i < len(keys) and keys[i] - t <= max_shift:
+        return keys[i]
+    return t
@@ -0,0 +1 @@
+# Pipeline runtime helpers (stage executors, scheduling) used by main.py.
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+MANIFEST_NAME = "manifest.json"
+
+
+def digest_file(path: str, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+def fingerprint(inputs: dict) -> str:
+    """Stable hash of a stage's inputs (artifact digests, languages, settings)."""
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def write_json(path: str, obj) -> str:
+    tmp = path + ".part"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return path
+
+
+def read_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StageManifest:
+    """Completed pipeline stages of one job, persisted as `manifest.json` in the job directory.
+
+    Each entry keeps the fingerprint of the stage's inputs and, per output
+    file, its path, size, mtime and content digest. A stage is reusable when
+    its inputs fingerprint the same and its files are still there unchanged;
+    downstream stages fingerprint upstream output digests, so a stage whose
+    output changed makes everything after it stale.
+    """
+
+    def __init__(self, job_dir: str):
+        self.path = os.path.join(job_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        try:
+            self.stages: Dict[str, dict] = read_json(self.path)["stages"]
+        except (OSError, ValueError, KeyError):
+            self.stages = {}
+
+    @staticmethod
+    def _describe(path: str) -> dict:
+        st = os.stat(path)
+        return {"path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest_file(path)}
+
+    @staticmethod
+    def _unchanged(f: dict) -> bool:
+        try:
+            st = os.stat(f["path"])
+        except OSError:
+            return False
+        return st.st_size == f["size"] and st.st_mtime_ns == f["mtime_ns"]
+
+    def _intact(self, entry: dict) -> bool:
+        return all(self._unchanged(f) for f in entry["files"].values())
+
+    def lookup(self, stage: str, inputs: dict) -> Optional[dict]:
+        """The entry for `stage` if it completed with these inputs and its files are intact, else None."""
+        entry = self.stages.get(stage)
+        if entry is None or entry["inputs"] != fingerprint(inputs) or not self._intact(entry):
+            return None
+        return entry
+
+    def record(self, stage: str, inputs: dict, files: Optional[Dict[str, str]] = None,
+               seconds: Optional[float] = None) -> dict:
+        """Mark `stage` complete. Digests its files, so blocking."""
+        entry = {
+            "inputs": fingerprint(inputs),
+            "files": {name: self._describe(p) for name, p in (files or {}).items() if p},
+            "completed_at": time.time(),
+            "seconds": round(seconds, 2) if seconds is not None else None,
+        }
+        with self._lock:
+            self.stages[stage] = entry
+            self._save()
+        return entry
+
+    def file(self, stage: str, name: str) -> Optional[str]:
+        f = self.stages.get(stage, {}).get("files", {}).get(name)
+        return f["path"] if f else None
+
+    def digest(self, stage: str, name: str) -> Optional[str]:
+        f = self.stages.get(stage, {}).get("files", {}).get(name)
+        return f["sha256"] if f else None
+
+    def invalidate(self, stages: Iterable[str]):
+        """Forget `stages`, whose outputs are about to be rewritten outside the pipeline."""
+        with self._lock:
+            for stage in stages:
+                self.stages.pop(stage, None)
+            self._save()
+
+    def first_stale(self, order: Iterable[str]) -> Optional[str]:
+        """First stage of `order` without an intact entry (input changes show up only when the job runs)."""
+        for stage in order:
+            entry = self.stages.get(stage)
+            if entry is None or not self._intact(entry):
+                return stage
+        return None
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            stage: {"completed_at": e["completed_at"], "seconds": e["seconds"], "intact": self._intact(e)}
+            for stage, e in self.stages.items()
+        }
+
+    def _save(self):
+        write_json(self.path, {"stages": self.stages})
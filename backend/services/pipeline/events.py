@@ -0,0 +1,118 @@
+import asyncio
+import itertools
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# (event id, event name, data)
+Event = Tuple[int, str, dict]
+
+
+class _Topic:
+    def __init__(self, history: int):
+        self.log: Deque[Event] = deque(maxlen=history)
+        # Progress only matters as its latest value, so it is kept apart and coalesced
+        self.progress: Optional[Event] = None
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+
+
+class Subscription:
+    """One listener on a topic; registered on creation, so nothing published after that is missed."""
+
+    def __init__(self, hub: "EventHub", topic: str, topic_state: _Topic, after: int):
+        self._hub = hub
+        self._name = topic
+        self._topic = topic_state
+        self._seen = after
+
+    async def next(self, timeout: Optional[float] = None) -> List[Event]:
+        """Events newer than the last call, oldest first (at most one progress event, the
+        latest); an empty list when `timeout` passes first."""
+        while True:
+            events = [e for e in self._topic.log if e[0] > self._seen]
+            progress = self._topic.progress
+            if progress is not None and progress[0] > self._seen:
+                events.append(progress)
+                events.sort(key=lambda e: e[0])
+            if events:
+                self._seen = events[-1][0]
+                return events
+            changed = self._topic.changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+
+    def close(self):
+        self._hub._release(self._name)
+
+
+class EventHub:
+    """In-process publish/subscribe for job events (server-sent events fan-out).
+
+    Publishing is a dict lookup when nobody listens and O(1) otherwise,
+    whatever the number of subscribers: an event is appended to its topic's
+    short log (progress events replace each other) and one asyncio.Event
+    wakes every subscriber, each reading what it has not seen yet. A slow
+    subscriber therefore skips intermediate progress but never a stage or
+    status event still in the log. `publish` may be called from worker
+    threads; it hops onto the event loop.
+    """
+
+    def __init__(self, history: int = 64):
+        self.history = history
+        self._topics: Dict[str, _Topic] = {}
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.published = 0
+
+    def subscribe(self, topic: str) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        state = self._topics.get(topic)
+        if state is None:
+            state = self._topics[topic] = _Topic(self.history)
+        state.subscribers += 1
+        return Subscription(self, topic, state, after=next(self._ids))
+
+    def _release(self, topic: str):
+        state = self._topics.get(topic)
+        if state is not None:
+            state.subscribers -= 1
+            if state.subscribers <= 0:
+                del self._topics[topic]
+
+    def subscribers(self, topic: str) -> int:
+        state = self._topics.get(topic)
+        return state.subscribers if state else 0
+
+    def publish(self, topic: str, event: str, data: dict):
+        if topic not in self._topics:
+            return
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            self._loop.call_soon_threadsafe(self._publish, topic, event, data)
+        else:
+            self._publish(topic, event, data)
+
+    def _publish(self, topic: str, event: str, data: dict):
+        state = self._topics.get(topic)
+        if state is None:
+            return
+        entry = (next(self._ids), event, data)
+        if event == "progress":
+            state.progress = entry
+        else:
+            state.log.append(entry)
+        self.published += 1
+        # Wake everyone waiting on the current Event; later waiters get a fresh one
+        changed, state.changed = state.changed, asyncio.Event()
+        changed.set()
+
+    def stats(self) -> dict:
+        return {
+            "topics": len(self._topics),
+            "subscribers": sum(t.subscribers for t in self._topics.values()),
+            "published": self.published,
+        }
@@ -0,0 +1,78 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Default concurrency per stage type. Each stage gets its own pool so a burst of
+# encodes can never starve transcription (and vice versa), and the event loop
+# only ever awaits futures.
+DEFAULT_STAGE_LIMITS: Dict[str, int] = {
+    "probe": 2,      # ffprobe / metadata reads
+    "extract": 2,    # audio decode from the source video
+    "stt": 1,        # faster-whisper (already multi-threaded internally)
+    "tts": 4,        # gTTS is network bound, XTTS is serialized by the model lock
+    "stretch": max(1, (os.cpu_count() or 2) - 1),
+    "encode": 2,     # ffmpeg / moviepy encodes
+    "lipsync": 1,    # Wav2Lip
+    "io": 4,         # misc blocking file work (hashing, copies)
+}
+
+
+def _env_limit(stage: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(f"STAGE_WORKERS_{stage.upper()}", str(default))))
+    except ValueError:
+        return default
+
+
+class StageExecutor:
+    """Runs blocking pipeline work on per-stage bounded pools.
+
+    Thread pools are used by default: moviepy, ffmpeg, ctranslate2 and numpy
+    all release the GIL for the heavy parts. Stages listed in `process_stages`
+    get a process pool instead; callables sent there must be picklable
+    (module-level functions).
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, process_stages: Optional[set] = None):
+        base = dict(DEFAULT_STAGE_LIMITS)
+        base.update(limits or {})
+        self.limits = {stage: _env_limit(stage, n) for stage, n in base.items()}
+        self.process_stages = set(process_stages or ())
+        self._pools: Dict[str, Executor] = {}
+
+    def _pool(self, stage: str) -> Executor:
+        pool = self._pools.get(stage)
+        if pool is None:
+            workers = self.limits.get(stage) or _env_limit(stage, 1)
+            self.limits[stage] = workers
+            if stage in self.process_stages:
+                pool = ProcessPoolExecutor(max_workers=workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"stage-{stage}")
+            self._pools[stage] = pool
+        return pool
+
+    async def run(self, stage: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on the pool for `stage` and await the result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(stage), functools.partial(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, dict]:
+        out = {}
+        for stage, limit in self.limits.items():
+            pool = self._pools.get(stage)
+            queued = 0
+            if isinstance(pool, ThreadPoolExecutor):
+                queued = pool._work_queue.qsize()
+            out[stage] = {"limit": limit, "started": pool is not None, "queued": queued}
+        return out
+
+    def shutdown(self, wait: bool = False):
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+        self._pools.clear()
+
+
+STAGES = StageExecutor()
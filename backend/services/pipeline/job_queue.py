@@ -0,0 +1,182 @@
+import asyncio
+import itertools
+import math
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.admit when no more jobs may be queued."""
+
+    def __init__(self, position: int, eta_seconds: float):
+        super().__init__(f"Queue is full (position {position}, eta {int(eta_seconds)}s)")
+        self.position = position
+        self.eta_seconds = eta_seconds
+
+
+class JobQueue:
+    """Bounded job queue with a fixed worker pool, priorities and per-user fairness.
+
+    Jobs are the same dicts stored in `db.jobs`; the queue only adds
+    `priority`/`queued_at` and persists status transitions through
+    `db.save_job`, so a SQLite-backed DB re-queues unfinished work on start.
+    `on_change(job)`, if given, is called after each of those transitions.
+
+    Ordering: higher priority first; within a priority, users are served
+    round-robin (a user's Nth waiting job ranks behind every other user's
+    first), then FIFO.
+    """
+
+    def __init__(
+        self,
+        db,
+        run_job: Callable[[str], Awaitable[None]],
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        on_change: Optional[Callable[[dict], None]] = None,
+    ):
+        self.db = db
+        self.run_job = run_job
+        self.on_change = on_change
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "2"))
+        self.max_pending = max_pending or int(os.getenv("JOB_QUEUE_MAX", "20"))
+        self.default_job_seconds = float(os.getenv("JOB_ETA_DEFAULT_SECONDS", "120"))
+        self._pending: Dict[str, dict] = {}
+        # Slots admitted but not yet submitted (the upload is still being stored)
+        self._reserved = 0
+        self._running: Dict[str, float] = {}
+        self._durations: deque = deque(maxlen=20)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    # -- admission / ordering -------------------------------------------------
+
+    def _order(self) -> List[dict]:
+        per_user: Dict[str, int] = {}
+        for job_id in self._running:
+            uid = self.db.jobs.get(job_id, {}).get("user_id") or "guest"
+            per_user[uid] = per_user.get(uid, 0) + 1
+        ranked = []
+        for entry in sorted(self._pending.values(), key=lambda e: e["seq"]):
+            uid = entry["user_id"]
+            rnd = per_user.get(uid, 0)
+            per_user[uid] = rnd + 1
+            ranked.append((-entry["priority"], rnd, entry["seq"], entry))
+        ranked.sort(key=lambda r: r[:3])
+        return [r[3] for r in ranked]
+
+    def avg_job_seconds(self) -> float:
+        if not self._durations:
+            return self.default_job_seconds
+        return sum(self._durations) / len(self._durations)
+
+    def eta_seconds(self, position: int) -> float:
+        """Rough wait for a job at 1-based `position` in the pending order."""
+        waves = math.ceil((position + len(self._running)) / self.workers)
+        return round(max(waves - 1, 0) * self.avg_job_seconds() + self.avg_job_seconds(), 1)
+
+    def position(self, job_id: str) -> Optional[int]:
+        for idx, entry in enumerate(self._order(), start=1):
+            if entry["job_id"] == job_id:
+                return idx
+        return None
+
+    def admit(self, count: int = 1):
+        """Reserve `count` pending slots, or raise QueueFull when they would exceed the limit.
+        Each reserved slot is used by `submit(..., reserved=True)` or handed back with `release`."""
+        if len(self._pending) + self._reserved + count > self.max_pending:
+            position = len(self._pending) + self._reserved + 1
+            raise QueueFull(position, self.eta_seconds(position))
+        self._reserved += count
+
+    def release(self, count: int = 1):
+        self._reserved = max(0, self._reserved - count)
+
+    def submit(self, job: dict, priority: int = 0, force: bool = False, reserved: bool = False) -> int:
+        if reserved:
+            self.release()
+        elif not force:
+            self.admit()
+            self.release()
+        job["status"] = "queued"
+        job["priority"] = int(priority)
+        job.setdefault("queued_at", time.time())
+        self._save(job)
+        self._pending[job["job_id"]] = {
+            "job_id": job["job_id"],
+            "user_id": job.get("user_id") or "guest",
+            "priority": int(priority),
+            "seq": next(self._seq),
+        }
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return self.position(job["job_id"]) or len(self._pending)
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": len(self._pending),
+            "reserved": self._reserved,
+            "running": len(self._running),
+            "avg_job_seconds": round(self.avg_job_seconds(), 1),
+        }
+
+    # -- workers --------------------------------------------------------------
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        # Re-queue anything a previous process accepted but never finished
+        recovered = [j for j in self.db.jobs.values() if j.get("status") in ("queued", "processing")]
+        for job in sorted(recovered, key=lambda j: j.get("queued_at") or 0):
+            job["progress"] = 0.0
+            job["message"] = "Re-queued after restart"
+            self.submit(job, priority=job.get("priority", 0), force=True)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            order = self._order()
+            if not order:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            entry = order[0]
+            job_id = entry["job_id"]
+            self._pending.pop(job_id, None)
+            job = self.db.jobs.get(job_id)
+            if job is None:
+                continue
+            started = time.time()
+            self._running[job_id] = started
+            job["status"] = "processing"
+            self._save(job)
+            try:
+                await self.run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job["status"] = "failed"
+                job["message"] = str(e)
+            finally:
+                self._running.pop(job_id, None)
+            self._durations.append(time.time() - started)
+            self._save(job)
+
+    def _save(self, job: dict):
+        self.db.save_job(job)
+        if self.on_change is not None:
+            self.on_change(job)
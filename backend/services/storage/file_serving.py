@@ -0,0 +1,194 @@
+import os
+import stat
+import threading
+from email.utils import formatdate
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from services.pipeline.checkpoint import digest_file
+
+# Read size when the server cannot send the file itself: the per-connection buffer
+CHUNK_SIZE = 256 * 1024
+# Cache-Control for a URL that names one exact version of a file (?v=<etag>)
+IMMUTABLE = "private, max-age=31536000, immutable"
+# Everything else may change under the same URL (retry, segment edits): cache, but revalidate
+REVALIDATE = "no-cache"
+
+
+class ContentHashes:
+    """Content digests of served files, keyed by path and valid while size and mtime match.
+
+    Outputs are registered as they are produced (the stage manifest already
+    digests them), so a request normally only stats the file; `digest` hashes
+    on a miss and is blocking.
+    """
+
+    def __init__(self):
+        self._known: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def remember(self, path: str, size: int, mtime_ns: int, sha256: str):
+        with self._lock:
+            self._known[os.path.abspath(path)] = (size, mtime_ns, sha256)
+
+    def known(self, path: str) -> Optional[str]:
+        entry = self._known.get(os.path.abspath(path))
+        if entry is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return entry[2] if (st.st_size, st.st_mtime_ns) == entry[:2] else None
+
+    def digest(self, path: str) -> str:
+        sha = self.known(path)
+        if sha is None:
+            st = os.stat(path)
+            sha = digest_file(path)
+            self.remember(path, st.st_size, st.st_mtime_ns, sha)
+        return sha
+
+    def forget(self, prefix: str):
+        prefix = os.path.abspath(prefix)
+        with self._lock:
+            for path in [p for p in self._known if p.startswith(prefix)]:
+                del self._known[path]
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+
+def etag_for(sha256: str) -> str:
+    return f'"{sha256[:32]}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single `bytes=` range, None to serve the whole file
+    (no header, several ranges, other units, or a syntactically invalid range such as
+    last < first, which RFC 9110 says to ignore). Raises ValueError when unsatisfiable:
+    the range starts at or past the end, or asks for a zero-length suffix."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[6:].strip().partition("-")
+    if not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    try:
+        if first:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+class FileRangeResponse(Response):
+    """A file, or one byte range of it, sent without a userspace copy when the server allows.
+
+    Order of preference: the `http.response.zerocopy` ASGI extension
+    (sendfile(2) of exactly the requested range), `http.response.pathsend` for
+    whole files, otherwise CHUNK_SIZE reads on a worker thread.
+    """
+
+    def __init__(self, path: str, st: os.stat_result, status_code: int, headers: Mapping[str, str],
+                 media_type: str, span: Optional[Tuple[int, int]] = None):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.offset, end = span if span else (0, st.st_size - 1)
+        self.count = end - self.offset + 1
+        self.headers["content-length"] = str(self.count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope["method"].upper() == "HEAD" or self.count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopy" in extensions:
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopy", "file": f, "offset": self.offset,
+                            "count": self.count, "more_body": False})
+        elif "http.response.pathsend" in extensions and self.offset == 0 and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as f:
+                await f.seek(self.offset)
+                remaining = self.count
+                while remaining > 0:
+                    chunk = await f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    # File shrank under us; end the body rather than hang the client
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def serve_file(request: Request, path: str, sha256: str, media_type: str, filename: Optional[str] = None,
+               cache_control: Optional[str] = None, accel_root: Optional[str] = None,
+               accel_prefix: Optional[str] = None) -> Response:
+    """Conditional and range-aware response for `path`, whose content digest is `sha256`.
+
+    Answers If-None-Match with 304, a single `Range` with 206 (416 when past
+    the end; If-Range falls back to the whole file once the ETag moved), and
+    otherwise the whole file. `cache_control` defaults to IMMUTABLE when the
+    request names this version (`?v=` equal to the ETag) and REVALIDATE
+    otherwise. With `accel_prefix` set and `path` under `accel_root`, the body
+    is left to the front proxy (nginx X-Accel-Redirect), which sends it with
+    sendfile and handles ranges itself.
+    """
+    st = os.stat(path)
+    if not stat.S_ISREG(st.st_mode):
+        raise FileNotFoundError(path)
+    etag = etag_for(sha256)
+    if cache_control is None:
+        cache_control = IMMUTABLE if request.query_params.get("v") == etag.strip('"') else REVALIDATE
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(st.st_mtime, usegmt=True),
+        "cache-control": cache_control,
+        "accept-ranges": "bytes",
+    }
+    if filename:
+        quoted = quote(filename)
+        headers["content-disposition"] = (f'attachment; filename="{filename}"' if quoted == filename
+                                          else f"attachment; filename*=utf-8''{quoted}")
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    root = os.path.abspath(accel_root) + os.sep if accel_root else None
+    if accel_prefix and root and os.path.abspath(path).startswith(root):
+        rel = os.path.abspath(path)[len(root):].replace(os.sep, "/")
+        headers["x-accel-redirect"] = accel_prefix.rstrip("/") + "/" + quote(rel)
+        return Response(status_code=200, headers=headers, media_type=media_type)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and if_range and if_range.strip() != etag:
+        range_header = None
+    try:
+        span = parse_range(range_header, st.st_size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "content-range": f"bytes */{st.st_size}"})
+    if span is None:
+        return FileRangeResponse(path, st, 200, headers, media_type)
+    headers["content-range"] = f"bytes {span[0]}-{span[1]}/{st.st_size}"
+    return FileRangeResponse(path, st, 206, headers, media_type, span)
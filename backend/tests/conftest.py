@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+@pytest.fixture(scope="session")
+def media(tmp_path_factory):
+    """A 2 s test-pattern video with a tone, and a 2 s replacement tone as WAV."""
+    from services.media.ffmpeg import run_ffmpeg
+
+    root = tmp_path_factory.mktemp("media")
+    video, audio = str(root / "source.mp4"), str(root / "speech.wav")
+    run_ffmpeg(["-f", "lavfi", "-i", "testsrc=size=96x96:rate=25", "-f", "lavfi", "-i", "sine=frequency=220:sample_rate=44100",
+                "-t", "2", "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest", video])
+    run_ffmpeg(["-f", "lavfi", "-i", "sine=frequency=440:sample_rate=16000", "-t", "2", audio])
+    return video, audio
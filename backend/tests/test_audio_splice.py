@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from services.media.audio_splice import replace_audio_span
+from services.media.ffmpeg import decode_pcm, run_ffmpeg
+
+SR = 24000
+
+
+def _tone(freq: float, seconds: float) -> np.ndarray:
+    return (0.3 * np.sin(2 * np.pi * freq * np.arange(int(seconds * SR)) / SR)).astype(np.float32)
+
+
+@pytest.fixture
+def muxed(tmp_path):
+    """A 4 s video whose mono AAC track is a 220 Hz tone, as the pipeline muxes TTS."""
+    old = _tone(220, 4)
+    wav, video = str(tmp_path / "track.wav"), str(tmp_path / "in.mp4")
+    sf.write(wav, old, SR)
+    run_ffmpeg(["-f", "lavfi", "-i", "testsrc=size=96x96:rate=25", "-i", wav, "-t", "4",
+                "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-b:a", "160k", "-ac", "1", "-shortest", video])
+    return video, old
+
+
+def test_splice_round_trip(muxed, tmp_path):
+    video, old = muxed
+    # Change one second in the middle to a different tone
+    a, b = int(1.5 * SR), int(2.5 * SR)
+    new = old.copy()
+    new[a:b] = _tone(330, 4)[a:b]
+
+    out = replace_audio_span(video, old, new, SR, str(tmp_path / "out.mp4"))
+    assert out == str(tmp_path / "out.mp4")
+
+    before, after = decode_pcm(video, SR), decode_pcm(out, SR)
+    # Same length and still in sync: no priming frame gained or lost
+    assert len(after) == len(before)
+    after = after[:len(new)]
+    outside = np.ones(len(new), dtype=bool)
+    outside[a:b] = False
+    assert np.abs(after - new)[outside].max() < 0.01
+    assert np.abs(after - new)[a:b].max() < 0.01
+    assert np.abs(after - old)[a:b].max() > 0.1
+
+
+def test_unsupported_track_is_left_to_the_caller(muxed, tmp_path):
+    video, old = muxed
+    out = str(tmp_path / "out.mp4")
+    # Track is 24 kHz; a 16 kHz splice cannot reuse its frames
+    assert replace_audio_span(video, old, old, 16000, out) is None
+    assert not os.path.exists(out)
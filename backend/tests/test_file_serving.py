@@ -0,0 +1,111 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services.pipeline.checkpoint import digest_file
+from services.storage.file_serving import IMMUTABLE, REVALIDATE, etag_for, parse_range, serve_file
+
+BODY = bytes(range(256)) * 4
+
+
+@pytest.mark.parametrize("header, span", [
+    ("bytes=0-4", (0, 4)),
+    ("bytes=5-", (5, 9)),
+    ("bytes=-3", (7, 9)),
+    ("bytes=8-200", (8, 9)),
+    # Whole file: no range, several ranges, other units, invalid syntax
+    (None, None),
+    ("bytes=0-1,4-5", None),
+    ("items=0-4", None),
+    ("bytes=5-3", None),
+    ("bytes=a-b", None),
+    ("bytes=--5", None),
+    ("bytes=-", None),
+])
+def test_parse_range(header, span):
+    assert parse_range(header, 10) == span
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=10-20", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 10)
+
+
+@pytest.fixture
+def served(tmp_path):
+    """A client for a 1 KiB file under `tmp_path`, served as /file and as /accel (X-Accel-Redirect)."""
+    path = tmp_path / "out" / "final.mp4"
+    path.parent.mkdir()
+    path.write_bytes(BODY)
+    sha = digest_file(str(path))
+    app = FastAPI()
+
+    @app.get("/file")
+    def file(request: Request):
+        return serve_file(request, str(path), sha, "video/mp4", filename="final.mp4")
+
+    @app.get("/accel")
+    def accel(request: Request):
+        return serve_file(request, str(path), sha, "video/mp4", accel_root=str(tmp_path), accel_prefix="/_files/")
+
+    return TestClient(app), etag_for(sha)
+
+
+def test_serve_whole_file(served):
+    client, etag = served
+    r = client.get("/file")
+    assert r.status_code == 200
+    assert r.content == BODY
+    assert r.headers["etag"] == etag
+    assert r.headers["last-modified"].endswith(" GMT")
+    assert r.headers["accept-ranges"] == "bytes"
+    assert r.headers["content-length"] == str(len(BODY))
+    assert r.headers["cache-control"] == REVALIDATE
+    assert r.headers["content-disposition"] == 'attachment; filename="final.mp4"'
+    assert client.get("/file", params={"v": etag.strip('"')}).headers["cache-control"] == IMMUTABLE
+
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"other", {etag}', "*"])
+def test_serve_not_modified(served, if_none_match):
+    client, etag = served
+    r = client.get("/file", headers={"if-none-match": if_none_match.format(etag=etag)})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+    assert client.get("/file", headers={"if-none-match": '"other"'}).status_code == 200
+
+
+def test_serve_range(served):
+    client, etag = served
+    r = client.get("/file", headers={"range": "bytes=100-199"})
+    assert r.status_code == 206
+    assert r.content == BODY[100:200]
+    assert r.headers["content-range"] == f"bytes 100-199/{len(BODY)}"
+    assert r.headers["content-length"] == "100"
+    assert r.headers["etag"] == etag
+    # A matching If-Range keeps the range; a stale one gets the whole (changed) file
+    assert client.get("/file", headers={"range": "bytes=-24", "if-range": etag}).content == BODY[-24:]
+    r = client.get("/file", headers={"range": "bytes=100-199", "if-range": '"stale"'})
+    assert r.status_code == 200
+    assert r.content == BODY
+    assert "content-range" not in r.headers
+
+
+def test_serve_range_not_satisfiable(served):
+    client, _ = served
+    r = client.get("/file", headers={"range": f"bytes={len(BODY)}-"})
+    assert r.status_code == 416
+    assert r.headers["content-range"] == f"bytes */{len(BODY)}"
+
+
+def test_serve_accel_redirect(served):
+    client, etag = served
+    r = client.get("/accel", headers={"range": "bytes=0-9"})
+    # nginx sends the body and handles the range itself
+    assert r.status_code == 200
+    assert r.content == b""
+    assert r.headers["x-accel-redirect"] == "/_files/out/final.mp4"
+    assert r.headers["etag"] == etag
+    assert r.headers["content-type"] == "video/mp4"
+    assert client.get("/accel", headers={"if-none-match": etag}).status_code == 304
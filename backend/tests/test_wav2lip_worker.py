@@ -0,0 +1,72 @@
+import asyncio
+import os
+
+import pytest
+
+from services.ai.wav2lip_worker import Wav2LipWorker
+
+
+@pytest.fixture
+def worker():
+    w = Wav2LipWorker("stub")
+    assert w.wait_ready(timeout=60)
+    yield w
+    w.shutdown()
+
+
+def test_requests_are_served_in_order(worker, media, tmp_path):
+    video, audio = media
+    events = []
+
+    async def run():
+        outs = [str(tmp_path / f"out{i}.mp4") for i in range(3)]
+        jobs = [worker.apply(video, audio, out, progress=lambda stage, frac, i=i: events.append((i, frac)))
+                for i, out in enumerate(outs)]
+        return outs, await asyncio.gather(*jobs)
+
+    outs, results = asyncio.run(run())
+    assert results == outs
+    assert all(os.path.getsize(out) > 0 for out in outs)
+    # One request at a time, first come first served
+    assert [i for i, _ in events] == [0, 0, 1, 1, 2, 2]
+    assert worker.completed == 3
+
+
+def test_progress_events_reach_the_callback(worker, media, tmp_path):
+    video, audio = media
+    seen = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+
+        def progress(stage, frac):
+            # Delivered on the caller's event loop, not the listener thread
+            assert asyncio.get_running_loop() is loop
+            seen.append((stage, frac))
+
+        await worker.apply(video, audio, str(tmp_path / "out.mp4"), progress=progress)
+
+    asyncio.run(run())
+    assert seen == [("inference", 0.0), ("inference", 1.0)]
+
+
+def test_error_reaches_the_caller(worker, media, tmp_path):
+    _, audio = media
+    with pytest.raises(RuntimeError, match="ffmpeg failed"):
+        asyncio.run(worker.apply(str(tmp_path / "missing.mp4"), audio, str(tmp_path / "out.mp4")))
+    # The worker survives a failed request
+    assert worker.ready
+    assert worker.stats()["pending"] == 0
+
+
+def test_restarts_after_the_worker_is_killed(worker, media, tmp_path):
+    video, audio = media
+    first = worker._proc
+    first.kill()
+    first.join(timeout=10)
+    assert not worker.ready
+
+    out = str(tmp_path / "out.mp4")
+    assert asyncio.run(asyncio.wait_for(worker.apply(video, audio, out), timeout=60)) == out
+    assert worker._proc is not first and worker.ready
+    assert os.path.getsize(out) > 0
@@ -0,0 +1,111 @@
+// Streams the current tab's audio to /live_translate/ws as 16 kHz PCM16 and
+// plays the translated phrases back, in order, as they arrive.
+const SAMPLE_RATE = 16000;
+
+let ws = null;
+let stream = null;
+let ctx = null;
+let playCtx = null;
+let playAt = 0;
+let nextPhrase = null;
+
+const $ = (id) => document.getElementById(id);
+
+function setStatus(text) {
+  $("status").textContent = text;
+}
+
+function toPcm16(float32) {
+  const out = new Int16Array(float32.length);
+  for (let i = 0; i < float32.length; i++) {
+    const s = Math.max(-1, Math.min(1, float32[i]));
+    out[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+  }
+  return out.buffer;
+}
+
+async function playMp3(bytes) {
+  const buffer = await playCtx.decodeAudioData(bytes);
+  const src = playCtx.createBufferSource();
+  src.buffer = buffer;
+  src.connect(playCtx.destination);
+  // Queue back-to-back so consecutive phrases never overlap
+  playAt = Math.max(playAt, playCtx.currentTime);
+  src.start(playAt);
+  playAt += buffer.duration;
+}
+
+function showPhrase(msg) {
+  const li = document.createElement("li");
+  // Text comes from transcribing arbitrary page audio: never parse it as HTML
+  const detail = document.createElement("small");
+  detail.textContent = `${msg.source} · ${msg.timings.glass_to_ear_ms} ms`;
+  li.append(document.createTextNode(msg.text), document.createElement("br"), detail);
+  $("phrases").prepend(li);
+}
+
+async function start() {
+  const api = $("api").value.replace(/\/$/, "");
+  const lang = $("lang").value;
+  chrome.storage.local.set({ api, lang });
+
+  stream = await new Promise((resolve, reject) =>
+    chrome.tabCapture.capture({ audio: true, video: false }, (s) =>
+      s ? resolve(s) : reject(chrome.runtime.lastError)
+    )
+  );
+  ctx = new AudioContext({ sampleRate: SAMPLE_RATE });
+  playCtx = new AudioContext();
+  const source = ctx.createMediaStreamSource(stream);
+  const proc = ctx.createScriptProcessor(2048, 1, 1);
+  source.connect(proc);
+  proc.connect(ctx.destination);
+
+  ws = new WebSocket(`${api.replace(/^http/, "ws")}/live_translate/ws?lang=${encodeURIComponent(lang)}`);
+  ws.binaryType = "arraybuffer";
+  ws.onopen = () => setStatus("Listening…");
+  ws.onclose = () => stop();
+  ws.onmessage = (ev) => {
+    if (typeof ev.data !== "string") {
+      if (nextPhrase) {
+        playMp3(ev.data);
+        nextPhrase = null;
+      }
+      return;
+    }
+    const msg = JSON.parse(ev.data);
+    if (msg.type === "phrase") {
+      showPhrase(msg);
+      if (msg.audio_bytes > 0) nextPhrase = msg;
+    } else if (msg.type === "error") {
+      setStatus(msg.message);
+    }
+  };
+  proc.onaudioprocess = (e) => {
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      ws.send(toPcm16(e.inputBuffer.getChannelData(0)));
+    }
+  };
+  $("toggle").textContent = "Stop";
+}
+
+function stop() {
+  if (ws && ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify({ type: "stop" }));
+  ws = null;
+  if (stream) stream.getTracks().forEach((t) => t.stop());
+  stream = null;
+  if (ctx) ctx.close();
+  ctx = null;
+  $("toggle").textContent = "Start";
+  setStatus("Idle");
+}
+
+$("toggle").addEventListener("click", () => {
+  if (ws) stop();
+  else start().catch((err) => setStatus(`Capture failed: ${err && err.message ? err.message : err}`));
+});
+
+chrome.storage.local.get(["api", "lang"], (saved) => {
+  if (saved.api) $("api").value = saved.api;
+  if (saved.lang) $("lang").value = saved.lang;
+});
@@ -19,19 +19,23 @@ export const uploadVideo = async (
   targetLanguage: string,
   userId: string,
   voiceSample?: File | null,
+  onProgress?: (fraction: number) => void,
 ) => {
   const form = new FormData()
   form.append('file', file)
   form.append('target_language', targetLanguage)
   form.append('user_id', userId)
   if (voiceSample) form.append('voice_sample', voiceSample)
-  const { data } = await api.post('/upload', form, { headers: { 'Content-Type': 'multipart/form-data' } })
+  const { data } = await api.post('/upload', form, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+    onUploadProgress: (e) => { if (onProgress && e.total) onProgress(e.loaded / e.total) },
+  })
   return data as { job_id: string; message: string }
 }
 
 export const jobStatus = async (jobId: string) => {
   const { data } = await api.get(`/jobs/${jobId}`)
-  return data as { job_id: string; status: string; progress: number; message?: string }
+  return data as { job_id: string; status: string; progress: number; message?: string; preview_ready?: boolean }
 }
 
 export const getDashboard = async (userId: string) => {
@@ -0,0 +1,57 @@
+import { API_BASE } from '../config'
+import { jobStatus } from './endpoints'
+
+export type JobSnapshot = { job_id: string; status: string; progress: number; message?: string; preview_ready?: boolean }
+export type StageEvent = { stage: string; state: 'started' | 'completed' | 'reused' | 'failed'; seconds?: number }
+export type ProgressEvent = { status: string; progress: number; message?: string; stage?: string; done?: number; total?: number; frames?: number }
+
+export type JobHandlers = {
+  onStatus: (job: JobSnapshot) => void
+  onProgress?: (ev: ProgressEvent) => void
+  onStage?: (ev: StageEvent) => void
+  onPreview?: () => void
+  onDone?: (job: JobSnapshot) => void
+}
+
+const FINISHED = ['completed', 'failed']
+
+// Server-sent events from GET /jobs/{id}/events; polls GET /jobs/{id} only where EventSource is missing.
+// Returns an unsubscribe function.
+export const subscribeJob = (jobId: string, handlers: JobHandlers): (() => void) => {
+  if (typeof EventSource === 'undefined') {
+    const timer = setInterval(async () => {
+      const resp = await jobStatus(jobId)
+      handlers.onStatus(resp)
+      if (FINISHED.includes(resp.status)) {
+        clearInterval(timer)
+        handlers.onDone?.(resp)
+      }
+    }, 2000)
+    return () => clearInterval(timer)
+  }
+  const source = new EventSource(`${API_BASE}/jobs/${jobId}/events`)
+  const parse = (e: Event) => JSON.parse((e as MessageEvent).data)
+  source.addEventListener('status', (e) => handlers.onStatus(parse(e)))
+  source.addEventListener('progress', (e) => handlers.onProgress?.(parse(e)))
+  source.addEventListener('stage', (e) => handlers.onStage?.(parse(e)))
+  source.addEventListener('preview', () => handlers.onPreview?.())
+  source.addEventListener('done', (e) => {
+    // Closed here, otherwise EventSource reconnects when the server ends the stream
+    source.close()
+    const job = parse(e)
+    handlers.onStatus(job)
+    handlers.onDone?.(job)
+  })
+  return () => source.close()
+}
+
+// Status changes of a user's jobs (GET /dashboard/{user}/events); `onChange` runs on each.
+export const subscribeDashboard = (userId: string, onChange: () => void): (() => void) => {
+  if (typeof EventSource === 'undefined') {
+    const timer = setInterval(onChange, 10000)
+    return () => clearInterval(timer)
+  }
+  const source = new EventSource(`${API_BASE}/dashboard/${userId}/events`)
+  source.addEventListener('job', onChange)
+  return () => source.close()
+}
@@ -2,6 +2,7 @@ import { useEffect, useMemo, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import HelpButton from '../components/HelpButton'
 import { getDashboard, getLanguages, type LanguageOption } from '../api/endpoints'
+import { subscribeDashboard } from '../api/events'
 import {
   PieChart, Pie, Cell, Tooltip as RTooltip, ResponsiveContainer,
   LineChart, Line, XAxis, YAxis, CartesianGrid, BarChart, Bar,
@@ -167,15 +168,15 @@ export default function Dashboard() {
     }
   }
 
-  // Initial load and live updates (polling)
+  // Initial load and live updates (refetch when one of the user's jobs changes status)
   useEffect(() => { 
     fetchAll() 
   }, [])
   
   useEffect(() => {
     if (!autoRefresh) return
-    const id = setInterval(() => { fetchAll() }, 10000)
-    return () => clearInterval(id)
+    const userId = localStorage.getItem('user_id') || 'guest'
+    return subscribeDashboard(userId, () => { fetchAll() })
   }, [autoRefresh])
 
   // NEW FEATURE: Load favorites from localStorage
@@ -1,6 +1,6 @@
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
-import { jobStatus } from '../api/endpoints'
+import { subscribeJob } from '../api/events'
 import { motion } from 'framer-motion'
 import HelpButton from '../components/HelpButton'
 
@@ -13,6 +13,7 @@ export default function Status() {
   const [elapsedTime, setElapsedTime] = useState(0)
   const [showCompletion, setShowCompletion] = useState(false)
   const [logs, setLogs] = useState<string[]>([])
+  const lastStep = useRef(0)
 
   // Format time for display
   const formatTime = (seconds: number) => {
@@ -62,12 +63,8 @@ export default function Status() {
     }
   }
 
-  // Simulate AI log messages
   const addLogMessage = (message: string) => {
-    setLogs(prev => [...prev, `> ${message}`])
-    if (logs.length > 6) {
-      setLogs(prev => prev.slice(1))
-    }
+    setLogs(prev => [...prev, `> ${message}`].slice(-7))
   }
 
   // Get current step based on progress
@@ -113,62 +110,55 @@ export default function Status() {
   ]
 
   useEffect(() => {
+    if (!jobId) return
     const startTime = Date.now()
-    let logInterval: number | undefined
 
-    // Initialize logs
     addLogMessage('Starting AI video translation process...')
     addLogMessage('Initializing neural processing modules...')
-    
-    const timer = setInterval(async () => {
-      if (!jobId) return
-      const resp = await jobStatus(jobId)
-      setData(resp)
-      setElapsedTime(Math.floor((Date.now() - startTime) / 1000))
 
-      // Add log messages based on progress
-      const currentStep = getCurrentStep(resp.progress || 0)
-      if (currentStep > getCurrentStep(data?.progress || 0)) {
-        const step = steps[currentStep - 1]
-        if (step) {
-          addLogMessage(step.logMessage)
-        }
-      }
+    // Local clock only; job state is pushed by the server
+    const clock = setInterval(() => setElapsedTime(Math.floor((Date.now() - startTime) / 1000)), 1000)
 
-      if (resp.status === 'completed') {
-        clearInterval(timer)
-        if (logInterval) clearInterval(logInterval)
-        addLogMessage('Translation completed successfully!')
-        setTimeout(() => setShowCompletion(true), 1000)
-      }
-      if (resp.status === 'failed') {
-        clearInterval(timer)
-        if (logInterval) clearInterval(logInterval)
-        addLogMessage('Process failed - please check configuration')
+    const track = (progress: number) => {
+      const step = getCurrentStep(progress)
+      if (step > lastStep.current) {
+        lastStep.current = step
+        addLogMessage(steps[step - 1].logMessage)
       }
-    }, 1200)
+    }
 
-    // Simulate occasional log updates
-    logInterval = window.setInterval(() => {
-      if (data?.status === 'processing') {
-        const messages = [
-          'Processing audio waveforms...',
-          'Analyzing facial features...',
-          'Optimizing voice parameters...',
-          'Neural network processing...',
-          'Encoding video streams...',
-          'Applying temporal alignment...'
-        ]
-        const randomMessage = messages[Math.floor(Math.random() * messages.length)]
-        addLogMessage(randomMessage)
-      }
-    }, 4000)
+    const unsubscribe = subscribeJob(jobId, {
+      onStatus: (resp) => {
+        setData(resp)
+        track(resp.progress || 0)
+      },
+      onProgress: (ev) => {
+        setData(prev => ({ ...(prev ?? { job_id: jobId }), status: ev.status, progress: ev.progress, message: ev.message }))
+        track(ev.progress || 0)
+      },
+      onStage: (ev) => {
+        const name = ev.stage.replace(/_/g, ' ')
+        if (ev.state === 'reused') addLogMessage(`Reusing ${name} from a previous run`)
+        else if (ev.state === 'completed') addLogMessage(`${name} done${ev.seconds != null ? ` in ${ev.seconds}s` : ''}`)
+        else if (ev.state === 'failed') addLogMessage(`${name} failed`)
+      },
+      onPreview: () => addLogMessage('Preview ready'),
+      onDone: (resp) => {
+        clearInterval(clock)
+        if (resp.status === 'completed') {
+          addLogMessage('Translation completed successfully!')
+          setTimeout(() => setShowCompletion(true), 1000)
+        } else {
+          addLogMessage('Process failed - please check configuration')
+        }
+      },
+    })
 
     return () => {
-      clearInterval(timer)
-      if (logInterval) clearInterval(logInterval)
+      clearInterval(clock)
+      unsubscribe()
     }
-  }, [jobId, navigate, data?.progress, data?.status])
+  }, [jobId])
 
   const statusInfo = getStatusInfo(data?.status || 'queued')
   const currentStep = getCurrentStep(data?.progress || 0)
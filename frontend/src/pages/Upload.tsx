@@ -123,29 +123,19 @@ export default function Upload() {
       voiceMatch: voiceSample ? '94%' : '89%'
     }
 
-    // Simulate upload progress (replace with actual progress tracking if API supports it)
-    const progressInterval = setInterval(() => {
-      setUploadProgress(prev => {
-        if (prev >= 90) {
-          clearInterval(progressInterval)
-          return 90
-        }
-        return prev + 10
-      })
-    }, 200)
-    
     try {
       const userId = localStorage.getItem('user_id') || ''
-      const { job_id } = await uploadVideo(file, lang, userId, voiceSample)
+      // Bytes sent so far; held at 99% until the server has accepted the job
+      const { job_id } = await uploadVideo(file, lang, userId, voiceSample, (fraction) => {
+        setUploadProgress(Math.min(99, Math.round(fraction * 100)))
+      })
       
       // Store translation data with job ID
       localStorage.setItem(`translation_${job_id}`, JSON.stringify(translationData))
       
       setUploadProgress(100)
-      clearInterval(progressInterval)
       setTimeout(() => navigate(`/status/${job_id}`), 500)
     } catch (err: any) {
-      clearInterval(progressInterval)
       setUploadProgress(0)
       setError('Failed to start translation. Is the server running at http://localhost:8000?')
       console.error(err)